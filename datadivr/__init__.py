@@ -7,4 +7,4 @@ from datadivr.transport.client import WebSocketClient
 from datadivr.transport.models import WebSocketMessage
 from datadivr.transport.server import app
 
-__all__ = ["WebSocketClient", "WebSocketMessage", "app", "BackgroundTasks"]
+__all__ = ["BackgroundTasks", "WebSocketClient", "WebSocketMessage", "app"]
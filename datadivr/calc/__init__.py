@@ -1,5 +1,6 @@
 """Calculation and data generation utilities for DataDiVR."""
 
 from datadivr.calc.sample_data import create_sample_data
+from datadivr.calc.spatial import SpatialGrid, haversine_km
 
-__all__ = ["create_sample_data"]
+__all__ = ["SpatialGrid", "create_sample_data", "haversine_km"]
@@ -0,0 +1,140 @@
+"""Spatial interest management for entities on the globe.
+
+Finding which entities are near each other by checking all pairs is quadratic. `SpatialGrid`
+buckets entity positions (latitude / longitude in degrees) in grid cells about as large as the
+interest radius, so every entity only needs to be compared with the entities of the neighboring
+cells. Distances are computed with vectorized haversine math per cell.
+"""
+
+import math
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+"""Length of one degree of latitude (and of longitude at the equator)."""
+
+
+def haversine_km(
+    lat1: npt.ArrayLike, lon1: npt.ArrayLike, lat2: npt.ArrayLike, lon2: npt.ArrayLike
+) -> npt.NDArray[np.float64]:
+    """Great-circle distances in kilometers between points given in degrees.
+
+    The arguments are broadcast against each other, e.g. a column of points against a row of
+    points gives the distance matrix.
+    """
+    phi1, lambda1, phi2, lambda2 = (
+        np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2)
+    )
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lambda2 - lambda1) / 2) ** 2
+    distances: npt.NDArray[np.float64] = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return distances
+
+
+class SpatialGrid:
+    """Entities bucketed in a latitude / longitude grid for neighbor queries.
+
+    Args:
+        radius_km: Interest radius, entities within this distance are neighbors
+
+    Example:
+        ```python
+        grid = SpatialGrid(radius_km=100.0)
+        grid.update(["a", "b", "c"], [48.2, 48.3, 52.5], [16.4, 16.5, 13.4])
+        grid.neighbors()  # {"a": ["b"], "b": ["a"], "c": []}
+        ```
+    """
+
+    def __init__(self, radius_km: float = 100.0):
+        self.radius_km = radius_km
+        # cells are at least the radius high, so neighbors are at most one row apart; rows and
+        # columns divide the globe evenly, so the grid wraps around the antimeridian
+        radius_degrees = radius_km / KM_PER_DEGREE
+        self.rows = max(1, int(180.0 / radius_degrees))
+        self.columns = max(1, int(360.0 / radius_degrees))
+        self.row_degrees = 180.0 / self.rows
+        self.column_degrees = 360.0 / self.columns
+        self.ids: list[str] = []
+        self._id_array = np.empty(0, dtype=object)
+        self.latitudes = np.empty(0, dtype=np.float64)
+        self.longitudes = np.empty(0, dtype=np.float64)
+        self._cells: dict[tuple[int, int], npt.NDArray[np.intp]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def update(self, ids: Sequence[str], latitudes: npt.ArrayLike, longitudes: npt.ArrayLike) -> None:
+        """Replace all entities and rebuild the grid.
+
+        Args:
+            ids: Entity IDs
+            latitudes: Latitude of each entity in degrees
+            longitudes: Longitude of each entity in degrees
+        """
+        self.ids = list(ids)
+        self._id_array = np.array(self.ids, dtype=object)
+        self.latitudes = np.clip(np.asarray(latitudes, dtype=np.float64), -90.0, 90.0)
+        self.longitudes = (np.asarray(longitudes, dtype=np.float64) + 180.0) % 360.0 - 180.0
+
+        self._cells = {}
+        if not self.ids:
+            return
+
+        rows = np.minimum(((self.latitudes + 90.0) / self.row_degrees).astype(np.intp), self.rows - 1)
+        columns = np.minimum(((self.longitudes + 180.0) / self.column_degrees).astype(np.intp), self.columns - 1)
+        keys = rows * self.columns + columns
+        order = np.argsort(keys, kind="stable")
+        unique_keys, starts = np.unique(keys[order], return_index=True)
+        self._cells = {
+            (int(key) // self.columns, int(key) % self.columns): members
+            for key, members in zip(unique_keys, np.split(order, starts[1:]), strict=True)
+        }
+
+    def neighbors(self) -> dict[str, list[str]]:
+        """Other entities within the interest radius of each entity."""
+        result: dict[str, list[str]] = {entity_id: [] for entity_id in self.ids}
+        for (row, column), members in self._cells.items():
+            candidates = self._candidates(row, column)
+            distances = haversine_km(
+                self.latitudes[members, None],
+                self.longitudes[members, None],
+                self.latitudes[None, candidates],
+                self.longitudes[None, candidates],
+            )
+            within = (distances <= self.radius_km) & (members[:, None] != candidates[None, :])
+            candidate_ids = self._id_array[candidates]
+            for member, mask in zip(members, within, strict=True):
+                result[self.ids[member]] = candidate_ids[mask].tolist()
+        return result
+
+    def within(self, latitude: float, longitude: float) -> list[str]:
+        """Entities within the interest radius of a position."""
+        row = min(int((min(max(latitude, -90.0), 90.0) + 90.0) / self.row_degrees), self.rows - 1)
+        column = min(int(((longitude + 180.0) % 360.0) / self.column_degrees), self.columns - 1)
+        candidates = self._candidates(row, column)
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        ids: list[str] = self._id_array[candidates[distances <= self.radius_km]].tolist()
+        return ids
+
+    def _candidates(self, row: int, column: int) -> npt.NDArray[np.intp]:
+        """Entities in the cells that can hold neighbors of an entity in cell (row, column)."""
+        first_row, last_row = max(row - 1, 0), min(row + 1, self.rows - 1)
+        # a degree of longitude shrinks towards the poles, so more columns are needed there
+        pole_latitude = max(abs(first_row * self.row_degrees - 90.0), abs((last_row + 1) * self.row_degrees - 90.0))
+        sin_radius = math.sin(min(self.radius_km / EARTH_RADIUS_KM, math.pi / 2))
+        cos_latitude = math.cos(math.radians(min(pole_latitude, 90.0)))
+        if sin_radius >= cos_latitude:  # the interest circle may contain a pole
+            columns = range(self.columns)
+        else:
+            span = math.ceil(math.degrees(math.asin(sin_radius / cos_latitude)) / self.column_degrees)
+            columns = range(self.columns) if 2 * span + 1 >= self.columns else range(column - span, column + span + 1)
+
+        cells = [
+            members
+            for r in range(first_row, last_row + 1)
+            for c in columns
+            if (members := self._cells.get((r, c % self.columns))) is not None
+        ]
+        return np.concatenate(cells) if cells else np.empty(0, dtype=np.intp)
@@ -3,7 +3,15 @@
 import typer
 
 from datadivr.commandlineinterface.client import start_client_app
+from datadivr.commandlineinterface.loadtest import (
+    LoadTestConfig,
+    parse_mix,
+    start_loadtest_app,
+    validate_encoding,
+)
 from datadivr.commandlineinterface.server import start_server_app
+from datadivr.transport.dispatch import DEFAULT_MAX_CONCURRENCY
+from datadivr.transport.outbound import DEFAULT_QUEUE_SIZE
 
 app_cli = typer.Typer()
 
@@ -15,9 +23,41 @@ def start_server(
     static_dir: str | None = "./static",
     log_level: str = "INFO",
     pretty: bool = True,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    overflow_policy: str = "drop_oldest",
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    handler_timeout: float = 0.0,
+    ordering: str = "client",
+    thread_workers: int | None = None,
+    process_workers: int | None = None,
+    workers: int = 1,
 ) -> None:
-    """Start the WebSocket and static file server."""
-    start_server_app(host, port, static_dir, log_level, pretty)
+    """Start the WebSocket and static file server.
+
+    Every client has an outbound queue of `queue_size` messages; `overflow_policy` (block,
+    drop_oldest, coalesce or disconnect) decides what happens when a slow client's queue is full.
+    At most `max_concurrency` handlers run at once (0 for no limit), handlers without a timeout of
+    their own are cancelled after `handler_timeout` seconds (0 for no timeout), and `ordering`
+    (client or event) decides which messages of a client are handled in order.
+    `thread_workers` and `process_workers` size the pools running off-loop handlers (default:
+    the `concurrent.futures` defaults).
+    With more than one worker, the server runs `workers` processes sharing message routing.
+    """
+    start_server_app(
+        host,
+        port,
+        static_dir,
+        log_level,
+        pretty,
+        queue_size=queue_size,
+        overflow_policy=overflow_policy,
+        max_concurrency=max_concurrency,
+        handler_timeout=handler_timeout,
+        ordering=ordering,
+        thread_workers=thread_workers,
+        process_workers=process_workers,
+        workers=workers,
+    )
 
 
 @app_cli.command()
@@ -26,5 +66,39 @@ def start_client(port: int = 8765, host: str = "127.0.0.1", log_level: str = "IN
     start_client_app(host, port, log_level)
 
 
+@app_cli.command()
+def loadtest(
+    clients: int = 10,
+    duration: float = 10.0,
+    rate: float = 10.0,
+    mix: str = "request=1",
+    payload_size: int = 64,
+    encoding: str = "json",
+    request_timeout: float = 5.0,
+    url: str | None = None,
+    server_workers: int = 1,
+    output: str | None = None,
+) -> None:
+    """Load test a WebSocket server and report the results as JSON.
+
+    Starts `clients` simulated clients, each sending `rate` messages per second for `duration`
+    seconds. `mix` weighs the message kinds, e.g. "request=0.8,broadcast=0.2". Without `url`, a
+    local server with `server_workers` workers is started and its CPU and memory use reported
+    (requires psutil). The report is printed, or written to the file `output`.
+    """
+    config = LoadTestConfig(
+        clients=clients,
+        duration=duration,
+        rate=rate,
+        mix=parse_mix(mix),
+        payload_size=payload_size,
+        encoding=validate_encoding(encoding),
+        request_timeout=request_timeout,
+        url=url,
+        server_workers=server_workers,
+    )
+    start_loadtest_app(config, output)
+
+
 if __name__ == "__main__":
     app_cli()
@@ -0,0 +1,372 @@
+"""Load testing of the WebSocket server.
+
+`run_loadtest` connects simulated `WebSocketClient`s to a server, by default one it starts in a
+subprocess, and has every client send messages at a fixed rate for a while. The message mix
+weighs two kinds of messages:
+
+``request``
+    A ``sum_event`` sent with `WebSocketClient.request`; its round-trip time is measured until
+    the correlated response arrives. Requests are pipelined, a slow response does not delay the
+    next request.
+``broadcast``
+    A message to all other clients; receipts are counted to measure fan-out throughput and
+    dropped messages.
+
+The result is a JSON-serializable report with throughput, round-trip percentiles, dropped
+messages and, with ``psutil`` installed (``pip install datadivr[loadtest]``), the CPU and memory
+use of a server started by the load test.
+"""
+
+import asyncio
+import contextlib
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, cast
+
+import numpy as np
+
+from datadivr.exceptions import (
+    DataDivrError,
+    InvalidLoadTestMixError,
+    InvalidLoadTestOptionError,
+    LoadTestServerError,
+    RequestTimeoutError,
+    UnknownEncodingError,
+)
+from datadivr.handlers.registry import HandlerType, get_handlers
+from datadivr.transport.client import WebSocketClient
+from datadivr.transport.codec import ENCODINGS, Encoding
+from datadivr.transport.models import WebSocketMessage
+from datadivr.utils.logging import get_logger, setup_logging
+
+try:
+    import psutil
+except ImportError:  # optional, only needed for server resource usage
+    psutil = None
+
+logger = get_logger(__name__)
+
+MESSAGE_KINDS = ("request", "broadcast")
+BROADCAST_EVENT = "loadtest_broadcast"
+SERVER_STARTUP_TIMEOUT = 15.0
+"""Seconds to wait for a server started by the load test to accept connections."""
+
+
+@dataclass
+class LoadTestConfig:
+    """Settings of a load test.
+
+    Attributes:
+        clients: Number of simulated clients
+        duration: Seconds the clients send messages
+        rate: Messages per second sent by each client
+        mix: Weight of each message kind, e.g. ``{"request": 0.8, "broadcast": 0.2}``
+        payload_size: Bytes of padding in every message payload
+        encoding: Wire encoding of the clients
+        request_timeout: Seconds after which a request counts as dropped
+        url: Server to test; None to start a local server
+        server_workers: Worker processes of a local server
+
+    Raises:
+        InvalidLoadTestOptionError: If a count, duration, rate or timeout is not positive
+    """
+
+    clients: int = 10
+    duration: float = 10.0
+    rate: float = 10.0
+    mix: dict[str, float] = field(default_factory=lambda: {"request": 1.0})
+    payload_size: int = 64
+    encoding: Encoding = "json"
+    request_timeout: float = 5.0
+    url: str | None = None
+    server_workers: int = 1
+
+    def __post_init__(self) -> None:
+        for option in ("clients", "duration", "rate", "request_timeout", "server_workers"):
+            value = getattr(self, option)
+            if value <= 0:
+                raise InvalidLoadTestOptionError(option, value)
+        if self.payload_size < 0:
+            raise InvalidLoadTestOptionError("payload_size", self.payload_size)
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse a message mix like ``request=0.8,broadcast=0.2``; a kind without weight weighs 1.
+
+    Raises:
+        InvalidLoadTestMixError: If the mix names an unknown kind or has no positive weight
+    """
+    weights: dict[str, float] = {}
+    for part in filter(None, (part.strip() for part in mix.split(","))):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in MESSAGE_KINDS:
+            raise InvalidLoadTestMixError(mix, MESSAGE_KINDS)
+        try:
+            weights[kind] = float(weight) if weight else 1.0
+        except ValueError:
+            raise InvalidLoadTestMixError(mix, MESSAGE_KINDS) from None
+    if not weights or min(weights.values()) < 0 or sum(weights.values()) <= 0:
+        raise InvalidLoadTestMixError(mix, MESSAGE_KINDS)
+    return weights
+
+
+def validate_encoding(encoding: str) -> Encoding:
+    """Check that `encoding` names a message encoding."""
+    if encoding not in ENCODINGS:
+        raise UnknownEncodingError(encoding, ENCODINGS)
+    return cast(Encoding, encoding)
+
+
+def latency_summary(rtts: list[float]) -> dict[str, float | None]:
+    """Round-trip time percentiles in milliseconds."""
+    if not rtts:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    values = np.asarray(rtts) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(values.mean()), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+@dataclass
+class _Counters:
+    requests_sent: int = 0
+    requests_completed: int = 0
+    requests_failed: int = 0
+    requests_timed_out: int = 0
+    broadcasts_sent: int = 0
+    broadcasts_received: int = 0
+    send_errors: int = 0
+    rtts: list[float] = field(default_factory=list)
+
+
+class _SimulatedClient:
+    """One client sending the message mix at the configured rate."""
+
+    def __init__(self, index: int, url: str, config: LoadTestConfig, counters: _Counters):
+        self.index = index
+        self.config = config
+        self.counters = counters
+        self.client = WebSocketClient(url, encoding=config.encoding)
+        # per-client handler table, so the broadcast counter does not leak into the global registry
+        self.client.handlers = {**get_handlers(HandlerType.CLIENT), BROADCAST_EVENT: self._on_broadcast}
+        self.padding = "x" * config.payload_size
+        self.requests: set[asyncio.Task[None]] = set()
+
+    async def _on_broadcast(self, message: WebSocketMessage) -> None:
+        self.counters.broadcasts_received += 1
+
+    async def run(self, start: float, end: float) -> None:
+        kinds = list(self.config.mix)
+        weights = [self.config.mix[kind] for kind in kinds]
+        interval = 1.0 / self.config.rate
+        # spread the clients' sends over the first interval
+        next_send = start + interval * self.index / max(self.config.clients, 1)
+        while next_send < end:
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            next_send += interval
+            try:
+                if random.choices(kinds, weights)[0] == "request":  # noqa: S311
+                    task = asyncio.create_task(self._request())
+                    self.requests.add(task)
+                    task.add_done_callback(self.requests.discard)
+                else:
+                    await self._broadcast()
+            except Exception as e:
+                self.counters.send_errors += 1
+                logger.debug("loadtest_send_error", error=str(e), client=self.index)
+        await asyncio.gather(*self.requests, return_exceptions=True)
+
+    async def _request(self) -> None:
+        self.counters.requests_sent += 1
+        sent = time.perf_counter()
+        try:
+            await self.client.request(
+                "sum_event", {"numbers": [1, 2, 3], "padding": self.padding}, timeout=self.config.request_timeout
+            )
+        except asyncio.CancelledError:
+            raise
+        except RequestTimeoutError:
+            self.counters.requests_timed_out += 1
+            return
+        except DataDivrError:
+            self.counters.requests_failed += 1
+            return
+        self.counters.requests_completed += 1
+        self.counters.rtts.append(time.perf_counter() - sent)
+
+    async def _broadcast(self) -> None:
+        await self.client.send_message(payload={"padding": self.padding}, event_name=BROADCAST_EVENT, to="others")
+        self.counters.broadcasts_sent += 1
+
+
+async def run_loadtest(config: LoadTestConfig) -> dict[str, Any]:
+    """Run a load test and return its report.
+
+    Args:
+        config: The load test settings; without a `url`, a local server is started for the test
+    """
+    if config.url:
+        return await _run_clients(config.url, config, None)
+    server = _LocalServer(config.server_workers)
+    try:
+        await server.start()
+        return await _run_clients(server.url, config, server)
+    finally:
+        server.stop()
+
+
+async def _run_clients(url: str, config: LoadTestConfig, server: "_LocalServer | None") -> dict[str, Any]:
+    counters = _Counters()
+    simulated = [_SimulatedClient(index, url, config, counters) for index in range(config.clients)]
+    await asyncio.gather(*(client.client.connect() for client in simulated))
+    receivers = [asyncio.create_task(client.client.receive_messages()) for client in simulated]
+
+    if server is not None:
+        server.sample()  # starts the CPU time measurement
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.run(start, start + config.duration) for client in simulated))
+        elapsed = time.perf_counter() - start
+        # give broadcasts in flight a moment to arrive
+        expected = counters.broadcasts_sent * (config.clients - 1)
+        deadline = time.perf_counter() + min(config.request_timeout, 2.0)
+        while counters.broadcasts_received < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        server_usage = server.sample() if server is not None else None
+    finally:
+        for client in simulated:
+            await client.client.disconnect()
+        await asyncio.gather(*receivers, return_exceptions=True)
+
+    sent = counters.requests_sent + counters.broadcasts_sent
+    received = counters.requests_completed + counters.broadcasts_received
+    return {
+        "config": asdict(config),
+        "elapsed_s": round(elapsed, 3),
+        "messages_sent": sent,
+        "messages_received": received,
+        "throughput": {
+            "sent_per_s": round(sent / elapsed, 2),
+            "received_per_s": round(received / elapsed, 2),
+        },
+        "requests": {
+            "sent": counters.requests_sent,
+            "completed": counters.requests_completed,
+            "failed": counters.requests_failed,
+            "timed_out": counters.requests_timed_out,
+        },
+        "rtt_ms": latency_summary(counters.rtts),
+        "broadcasts": {
+            "sent": counters.broadcasts_sent,
+            "expected": expected,
+            "received": counters.broadcasts_received,
+            "dropped": max(0, expected - counters.broadcasts_received),
+        },
+        "dropped": counters.requests_timed_out + max(0, expected - counters.broadcasts_received),
+        "send_errors": counters.send_errors,
+        "server": server_usage,
+    }
+
+
+class _LocalServer:
+    """Server subprocess started for a load test, with its resource usage."""
+
+    def __init__(self, workers: int = 1):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self.workers = workers
+        self.url = f"ws://127.0.0.1:{self.port}/ws"
+        self._static_dir = tempfile.TemporaryDirectory(prefix="datadivr_loadtest_")
+        self._process: subprocess.Popen[bytes] | None = None
+        self._cpu_start: float | None = None
+        self._time_start = 0.0
+        self._max_rss = 0
+
+    async def start(self) -> None:
+        command = [
+            sys.executable,
+            "-m",
+            "datadivr.cli",
+            "start-server",
+            "--port",
+            str(self.port),
+            "--static-dir",
+            self._static_dir.name,
+            "--log-level",
+            "WARNING",
+            "--workers",
+            str(self.workers),
+        ]
+        self._process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # noqa: S603
+        deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                break
+            with contextlib.suppress(OSError):
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                writer.close()
+                await asyncio.sleep(0.2 if self.workers > 1 else 0)  # let all workers come up
+                return
+            await asyncio.sleep(0.1)
+        self.stop()
+        raise LoadTestServerError(self.port)
+
+    def sample(self) -> dict[str, Any] | None:
+        """Resource usage since the first sample, None without psutil."""
+        if psutil is None or self._process is None:
+            return None
+        try:
+            parent = psutil.Process(self._process.pid)
+            processes = [parent, *parent.children(recursive=True)]
+            cpu = sum(sum(process.cpu_times()[:2]) for process in processes)
+            rss = sum(process.memory_info().rss for process in processes)
+        except psutil.Error:
+            return None
+        now = time.perf_counter()
+        self._max_rss = max(self._max_rss, rss)
+        if self._cpu_start is None:
+            self._cpu_start, self._time_start = cpu, now
+            return None
+        elapsed = max(now - self._time_start, 1e-9)
+        return {
+            "pid": self._process.pid,
+            "processes": len(processes),
+            "cpu_percent": round(100.0 * (cpu - self._cpu_start) / elapsed, 1),
+            "rss_mb": round(rss / 2**20, 1),
+            "max_rss_mb": round(self._max_rss / 2**20, 1),
+        }
+
+    def stop(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._static_dir.cleanup()
+
+
+def start_loadtest_app(config: LoadTestConfig, output: str | None = None) -> dict[str, Any]:
+    """Run a load test and print its JSON report, or write it to `output`."""
+    setup_logging(level="WARNING", pretty=False)
+    report = asyncio.run(run_loadtest(config))
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return report
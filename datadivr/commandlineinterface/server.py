@@ -1,16 +1,71 @@
 """Server-side CLI functionality."""
 
 import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
 
 import uvicorn
 from fastapi import FastAPI
 
+from datadivr.core.executors import configure_executors
+from datadivr.transport.broker import BROKER_ENV, UnixSocketHub
+from datadivr.transport.dispatch import configure_dispatch
+from datadivr.transport.outbound import configure_queues
 from datadivr.transport.server import app as websocket_app
 from datadivr.transport.web_server import add_static_routes
 from datadivr.utils.logging import get_logger, setup_logging
 
 logger = get_logger(__name__)
 
+# settings handed to the worker processes in multi-worker mode
+STATIC_DIR_ENV = "DATADIVR_STATIC_DIR"
+LOG_LEVEL_ENV = "DATADIVR_LOG_LEVEL"
+PRETTY_ENV = "DATADIVR_PRETTY"
+QUEUE_SIZE_ENV = "DATADIVR_QUEUE_SIZE"
+OVERFLOW_POLICY_ENV = "DATADIVR_OVERFLOW_POLICY"
+MAX_CONCURRENCY_ENV = "DATADIVR_MAX_CONCURRENCY"
+HANDLER_TIMEOUT_ENV = "DATADIVR_HANDLER_TIMEOUT"
+ORDERING_ENV = "DATADIVR_ORDERING"
+THREAD_WORKERS_ENV = "DATADIVR_THREAD_WORKERS"
+PROCESS_WORKERS_ENV = "DATADIVR_PROCESS_WORKERS"
+
+
+def create_app(static_dir: str | None) -> FastAPI:
+    """Create the app serving the WebSocket endpoint and the static files."""
+    # get fastapi instance
+    app = FastAPI()
+
+    # websocket routes; copied rather than included, as include_router also merges the router's
+    # lifespan into the app's in newer FastAPI versions, which would run the server lifespan twice
+    app.router.lifespan_context = websocket_app.router.lifespan_context
+    app.router.routes.extend(websocket_app.router.routes)
+
+    # webserver static file server
+    add_static_routes(app, static_dir=static_dir or "./static")
+    return app
+
+
+def create_worker_app() -> FastAPI:
+    """App factory of a worker process in multi-worker mode, configured by environment variables."""
+    setup_logging(level=os.environ.get(LOG_LEVEL_ENV, "INFO"), pretty=os.environ.get(PRETTY_ENV) == "1")
+    queue_size = os.environ.get(QUEUE_SIZE_ENV)
+    configure_queues(int(queue_size) if queue_size else None, os.environ.get(OVERFLOW_POLICY_ENV))
+    max_concurrency = os.environ.get(MAX_CONCURRENCY_ENV)
+    handler_timeout = os.environ.get(HANDLER_TIMEOUT_ENV)
+    configure_dispatch(
+        int(max_concurrency) if max_concurrency else None,
+        float(handler_timeout) if handler_timeout else None,
+        os.environ.get(ORDERING_ENV),
+    )
+    thread_workers = os.environ.get(THREAD_WORKERS_ENV)
+    process_workers = os.environ.get(PROCESS_WORKERS_ENV)
+    configure_executors(
+        int(thread_workers) if thread_workers else None, int(process_workers) if process_workers else None
+    )
+    return create_app(os.environ.get(STATIC_DIR_ENV))
+
 
 def start_server_app(
     host: str,
@@ -18,19 +73,44 @@ def start_server_app(
     static_dir: str | None,
     log_level: str,
     pretty: bool,
+    queue_size: int | None = None,
+    overflow_policy: str | None = None,
+    max_concurrency: int | None = None,
+    handler_timeout: float | None = None,
+    ordering: str | None = None,
+    thread_workers: int | None = None,
+    process_workers: int | None = None,
+    workers: int = 1,
 ) -> None:
-    """Start WebSocket and static file server."""
-    setup_logging(level=log_level, pretty=pretty)
+    """Start WebSocket and static file server.
 
-    # get fastapi instance
-    app = FastAPI()
+    With more than one worker, the workers are separate processes that route messages to each
+    other's clients through a broker hub on a Unix socket, run in a separate process.
+    """
+    setup_logging(level=log_level, pretty=pretty)
+    configure_queues(queue_size, overflow_policy)
+    configure_dispatch(max_concurrency, handler_timeout, ordering)
+    configure_executors(thread_workers, process_workers)
 
-    # websocket router
-    app.router.lifespan_context = websocket_app.router.lifespan_context
-    app.include_router(websocket_app.router)
+    if workers > 1:
+        start_workers(
+            host,
+            port,
+            static_dir,
+            log_level,
+            pretty,
+            queue_size=queue_size,
+            overflow_policy=overflow_policy,
+            max_concurrency=max_concurrency,
+            handler_timeout=handler_timeout,
+            ordering=ordering,
+            thread_workers=thread_workers,
+            process_workers=process_workers,
+            workers=workers,
+        )
+        return
 
-    # webserver static file server
-    add_static_routes(app, static_dir=static_dir or "./static")
+    app = create_app(static_dir)
 
     logger.info("server_starting", host=host, port=port)
 
@@ -39,3 +119,61 @@ def start_server_app(
     config = uvicorn.Config(app, host=host, port=port)
     config.log_config = None
     asyncio.run(uvicorn.Server(config).serve())
+
+
+def start_workers(
+    host: str,
+    port: int,
+    static_dir: str | None,
+    log_level: str,
+    pretty: bool,
+    queue_size: int | None = None,
+    overflow_policy: str | None = None,
+    max_concurrency: int | None = None,
+    handler_timeout: float | None = None,
+    ordering: str | None = None,
+    thread_workers: int | None = None,
+    process_workers: int | None = None,
+    workers: int = 2,
+) -> None:
+    """Run `workers` server processes connected by a broker hub.
+
+    The hub runs in a process of its own, so it keeps routing while single workers exit or are
+    restarted; it is stopped together with the workers.
+    """
+    socket_path = Path(tempfile.mkdtemp(prefix="datadivr_")) / "broker.sock"
+    hub = UnixSocketHub(socket_path).run_in_process()
+
+    os.environ[BROKER_ENV] = f"unix:{socket_path}"
+    os.environ[STATIC_DIR_ENV] = static_dir or "./static"
+    os.environ[LOG_LEVEL_ENV] = log_level
+    os.environ[PRETTY_ENV] = "1" if pretty else "0"
+    if queue_size is not None:
+        os.environ[QUEUE_SIZE_ENV] = str(queue_size)
+    if overflow_policy is not None:
+        os.environ[OVERFLOW_POLICY_ENV] = overflow_policy
+    if max_concurrency is not None:
+        os.environ[MAX_CONCURRENCY_ENV] = str(max_concurrency)
+    if handler_timeout is not None:
+        os.environ[HANDLER_TIMEOUT_ENV] = str(handler_timeout)
+    if ordering is not None:
+        os.environ[ORDERING_ENV] = ordering
+    if thread_workers is not None:
+        os.environ[THREAD_WORKERS_ENV] = str(thread_workers)
+    if process_workers is not None:
+        os.environ[PROCESS_WORKERS_ENV] = str(process_workers)
+
+    logger.info("server_starting", host=host, port=port, workers=workers, broker=str(socket_path))
+    try:
+        uvicorn.run(
+            "datadivr.commandlineinterface.server:create_worker_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            log_config=None,
+        )
+    finally:
+        hub.terminate()
+        hub.join()
+        shutil.rmtree(socket_path.parent, ignore_errors=True)
@@ -0,0 +1,143 @@
+"""Executor pools running handlers off the event loop.
+
+Handlers doing CPU-bound work (NumPy queries, layout math) block the event loop and with it all
+connections. A handler registered with ``execution="thread"`` or ``execution="process"`` (see
+`datadivr.handlers.registry.websocket_handler`) is run in a worker thread or process instead:
+
+``inline``
+    On the event loop (default), for handlers that mostly wait on I/O.
+``thread``
+    In a thread pool. Suits NumPy work, which releases the GIL, and handlers that need the
+    server's state (e.g. the loaded projects); that state must then not be modified concurrently.
+``process``
+    In a process pool, for pure Python CPU work. The message is copied into the worker process
+    and the response copied back, so the handler only sees its message and must be a module-level
+    function; server state such as client lists or projects is not shared.
+
+Each worker runs the handler coroutine on an event loop of its own, so off-loop handlers should
+return their response instead of sending on the message's websocket. The pools are created on
+first use with the sizes set by `configure_executors` and shut down with the server.
+"""
+
+import asyncio
+import importlib
+import inspect
+import multiprocessing
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal, cast
+
+from datadivr.exceptions import UnknownExecutionModeError
+from datadivr.transport.models import WebSocketMessage
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+ExecutionMode = Literal["inline", "thread", "process"]
+"""Where a handler runs, see the module documentation."""
+
+EXECUTION_MODES: tuple[ExecutionMode, ...] = ("inline", "thread", "process")
+
+Handler = Callable[[WebSocketMessage], Awaitable[WebSocketMessage | None]]
+
+
+@dataclass
+class ExecutorConfig:
+    """Sizes of the executor pools, None for the `concurrent.futures` defaults.
+
+    Attributes:
+        thread_workers: Number of threads running ``thread`` handlers
+        process_workers: Number of processes running ``process`` handlers
+    """
+
+    thread_workers: int | None = None
+    process_workers: int | None = None
+
+
+executor_config = ExecutorConfig()
+_executors: dict[ExecutionMode, Executor] = {}
+_worker_state = threading.local()
+
+
+def configure_executors(thread_workers: int | None = None, process_workers: int | None = None) -> ExecutorConfig:
+    """Change the pool sizes; applies to pools created from now on, e.g. after `shutdown_executors`."""
+    if thread_workers is not None:
+        executor_config.thread_workers = max(1, thread_workers)
+    if process_workers is not None:
+        executor_config.process_workers = max(1, process_workers)
+    return executor_config
+
+
+def validate_execution_mode(mode: str) -> ExecutionMode:
+    """Check that `mode` names an execution mode."""
+    if mode not in EXECUTION_MODES:
+        raise UnknownExecutionModeError(mode, EXECUTION_MODES)
+    return cast(ExecutionMode, mode)
+
+
+def get_executor(mode: ExecutionMode) -> Executor:
+    """The pool of an off-loop execution mode, created on first use."""
+    executor = _executors.get(mode)
+    if executor is None:
+        if mode == "thread":
+            executor = ThreadPoolExecutor(executor_config.thread_workers, thread_name_prefix="datadivr_handler")
+        else:
+            # forking a process running an event loop and threads is unsafe, so workers are spawned
+            executor = ProcessPoolExecutor(executor_config.process_workers, multiprocessing.get_context("spawn"))
+        _executors[mode] = executor
+        logger.info("executor_started", mode=mode, workers=getattr(executor, "_max_workers", None))
+    return executor
+
+
+def shutdown_executors() -> None:
+    """Shut down the pools, cancelling handlers that did not start yet."""
+    for mode, executor in list(_executors.items()):
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("executor_stopped", mode=mode)
+    _executors.clear()
+
+
+async def run_handler(
+    handler: Handler, message: WebSocketMessage, mode: ExecutionMode = "inline"
+) -> WebSocketMessage | None:
+    """Run a handler coroutine function in the given execution mode.
+
+    Args:
+        handler: The handler; for ``process``, a module-level function
+        message: The message to handle
+        mode: Where the handler runs
+    """
+    if mode == "inline":
+        return await handler(message)
+    loop = asyncio.get_running_loop()
+    if mode == "thread":
+        return await loop.run_in_executor(get_executor("thread"), _run_in_worker, handler, message)
+
+    response_data = await loop.run_in_executor(
+        get_executor("process"), _run_marshalled, handler.__module__, handler.__qualname__, message.model_dump()
+    )
+    if response_data is None:
+        return None
+    response = WebSocketMessage.model_validate(response_data)
+    response.websocket = message.websocket
+    return response
+
+
+def _run_in_worker(handler: Handler, message: WebSocketMessage) -> WebSocketMessage | None:
+    """Run a handler on the event loop of the current worker thread."""
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None:
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(handler(message))
+
+
+def _run_marshalled(module_name: str, qualname: str, message_data: dict[str, Any]) -> dict[str, Any] | None:
+    """Run a handler in a worker process, given by its import path, on a copied message."""
+    handler: Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        handler = getattr(handler, name)
+    # the registered handler is a wrapper that would send the message to the pool again
+    response = _run_in_worker(inspect.unwrap(handler), WebSocketMessage.model_validate(message_data))
+    return None if response is None else response.model_dump()
@@ -0,0 +1,104 @@
+"""Delta compression of periodically broadcast snapshots.
+
+Periodic tasks (see `BackgroundTasks.periodic`) often send every client the full state it can
+see, e.g. the nearby players, on every tick. `SnapshotTracker` remembers the last snapshot each
+recipient acknowledged and turns the next snapshot into a `SnapshotDelta` holding only the
+entities that entered, changed or left, so unchanged ticks send nothing at all.
+
+Snapshots are mappings of entity ID to a comparable value (e.g. a dict of the entity's state).
+
+Example:
+    ```python
+    tracker = SnapshotTracker()
+
+    @BackgroundTasks.periodic(interval=0.2)
+    async def send_updates() -> None:
+        for client_id in clients:
+            delta = tracker.update(client_id, visible_entities(client_id))
+            if delta:
+                await broadcast(WebSocketMessage(event_name="delta", payload=delta.to_payload(), to=client_id))
+    ```
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class SnapshotDelta:
+    """Difference between a snapshot and the last one acknowledged by a recipient.
+
+    Attributes:
+        entered: Entities that are new, by ID
+        changed: Entities whose value changed, by ID
+        left: IDs of entities that are gone
+        full: Whether this is a keyframe: `entered` holds the whole snapshot and replaces the
+            recipient's state
+    """
+
+    entered: dict[str, Any] = field(default_factory=dict)
+    changed: dict[str, Any] = field(default_factory=dict)
+    left: list[str] = field(default_factory=list)
+    full: bool = False
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.entered or self.changed or self.left)
+
+    def to_payload(self) -> dict[str, Any]:
+        """The delta as a message payload."""
+        return {"entered": self.entered, "changed": self.changed, "left": self.left, "full": self.full}
+
+
+class SnapshotTracker:
+    """Last acknowledged snapshot per recipient.
+
+    Args:
+        keyframe_interval: Send a full snapshot to each recipient every this many updates, so
+            recipients recover from deltas that were lost (e.g. dropped by a full outbound
+            queue); None for deltas only
+    """
+
+    def __init__(self, keyframe_interval: int | None = None):
+        self.keyframe_interval = keyframe_interval
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        self._updates: dict[str, int] = {}
+
+    def diff(self, recipient: str, snapshot: Mapping[str, Any]) -> SnapshotDelta:
+        """Difference between `snapshot` and the last snapshot acknowledged by `recipient`."""
+        previous = self._snapshots.get(recipient, {})
+        delta = SnapshotDelta(left=[entity_id for entity_id in previous if entity_id not in snapshot])
+        for entity_id, value in snapshot.items():
+            if entity_id not in previous:
+                delta.entered[entity_id] = value
+            elif previous[entity_id] != value:
+                delta.changed[entity_id] = value
+        return delta
+
+    def acknowledge(self, recipient: str, snapshot: Mapping[str, Any]) -> None:
+        """Record `snapshot` as the state `recipient` has now.
+
+        The values must not be modified afterwards, they are compared with the next snapshot.
+        """
+        self._snapshots[recipient] = dict(snapshot)
+
+    def update(self, recipient: str, snapshot: Mapping[str, Any]) -> SnapshotDelta:
+        """Diff `snapshot` for `recipient` and acknowledge it, as a keyframe every `keyframe_interval` updates."""
+        updates = self._updates.get(recipient, 0) + 1
+        self._updates[recipient] = updates
+        if self.keyframe_interval and updates % self.keyframe_interval == 0:
+            delta = SnapshotDelta(entered=dict(snapshot), full=True)
+        else:
+            delta = self.diff(recipient, snapshot)
+        self.acknowledge(recipient, snapshot)
+        return delta
+
+    def forget(self, recipient: str) -> None:
+        """Drop the state of a recipient, e.g. when it disconnects; its next delta holds everything."""
+        self._snapshots.pop(recipient, None)
+        self._updates.pop(recipient, None)
+
+    def retain(self, recipients: set[str] | Mapping[str, Any]) -> None:
+        """Forget all recipients not in `recipients`, e.g. the currently connected clients."""
+        for recipient in [recipient for recipient in self._snapshots if recipient not in recipients]:
+            self.forget(recipient)
@@ -53,7 +53,7 @@ class LayoutNotFoundError(ValueError):
     def __init__(self, layout_name: str, available_layouts: list[str]):
         self.layout_name = layout_name
         self.available_layouts = available_layouts
-        super().__init__(f"Layout '{layout_name}' not found. " f"Available layouts: {available_layouts}")
+        super().__init__(f"Layout '{layout_name}' not found. Available layouts: {available_layouts}")
 
 
 class StaticDirectoryNotFoundError(DataDivrError):
@@ -75,3 +75,192 @@ class NodeIndexOutOfBoundsError(DataDivrError):
 
     def __init__(self, index: int, length: int):
         super().__init__(f"Index {index} is out of bounds for node data with length {length}")
+
+
+class MissingNodeDataError(DataDivrError):
+    """Raised when an operation requires node data but the project has none."""
+
+    def __init__(self) -> None:
+        super().__init__("Project has no node data")
+
+
+class UnknownIdStrategyError(DataDivrError):
+    """Raised when an unknown ID strategy is requested for combining projects."""
+
+    def __init__(self, strategy: str):
+        super().__init__(f"Unknown ID strategy '{strategy}', expected 'offset' or 'union'")
+
+
+class AttributeKindConflictError(DataDivrError):
+    """Raised when combined projects store an attribute with different kinds."""
+
+    def __init__(self, attribute: str, kind: str, other_kind: str):
+        super().__init__(f"Attribute '{attribute}' is stored as {kind} and as {other_kind} in the combined projects")
+
+
+class IdOverflowError(DataDivrError):
+    """Raised when shifted node IDs do not fit into 32-bit integers."""
+
+    def __init__(self, low: int, high: int):
+        super().__init__(f"Shifted node IDs {low}..{high} do not fit into int32")
+
+
+class SelectionNotFoundError(DataDivrError):
+    """Raised when a requested selection is not found in the project."""
+
+    def __init__(self, selection_name: str):
+        super().__init__(f"Selection '{selection_name}' not found")
+
+
+class ProjectNotFoundError(DataDivrError):
+    """Raised when a requested project is not registered with the project manager."""
+
+    def __init__(self, project_name: str):
+        super().__init__(f"Project '{project_name}' not found")
+
+
+class ProjectPathNotAllowedError(DataDivrError):
+    """Raised when a client requests a project file outside the projects directory."""
+
+    def __init__(self, path: str):
+        super().__init__(f"Project path '{path}' is not inside the projects directory")
+
+
+class StreamProtocolError(WebSocketError):
+    """Base exception for binary array stream errors."""
+
+    pass
+
+
+class InvalidStreamFrameError(StreamProtocolError):
+    """Raised when a binary frame is not a valid array stream frame."""
+
+    def __init__(self) -> None:
+        super().__init__("Not a binary array stream frame")
+
+
+class UnknownStreamError(StreamProtocolError):
+    """Raised when a frame refers to a stream that was not started."""
+
+    def __init__(self, stream_id: int):
+        super().__init__(f"Unknown stream {stream_id}")
+
+
+class InvalidStreamAckError(StreamProtocolError):
+    """Raised when a stream acknowledgement does not grant a positive number of chunks."""
+
+    def __init__(self, stream_id: int, chunks: object):
+        super().__init__(f"Invalid acknowledgement of {chunks!r} chunks for stream {stream_id}")
+
+
+class StreamAlreadyActiveError(StreamProtocolError):
+    """Raised when a stream ID is reused while the stream is still being sent."""
+
+    def __init__(self, stream_id: int):
+        super().__init__(f"Stream {stream_id} is already active")
+
+
+class IncompleteStreamError(StreamProtocolError):
+    """Raised when a stream ends before all of its chunks were received."""
+
+    def __init__(self, stream_id: int, received: int, expected: int):
+        super().__init__(f"Stream {stream_id} ended after {received} of {expected} chunks")
+
+
+class StreamFailedError(StreamProtocolError):
+    """Raised on the receiving side when the sender reports a failed stream."""
+
+    def __init__(self, stream_id: int, error: str):
+        super().__init__(f"Stream {stream_id} failed: {error}")
+
+
+class UnstreamableArrayError(StreamProtocolError):
+    """Raised when an array cannot be streamed, e.g. an object array or an unknown array path."""
+
+    def __init__(self, array: str):
+        self.array = array
+        super().__init__(f"Array '{array}' cannot be streamed")
+
+
+class UnsupportedPayloadTypeError(DataDivrError):
+    """Raised when a message payload holds a value the binary encoding cannot represent."""
+
+    def __init__(self, type_name: str):
+        super().__init__(f"Cannot encode value of type '{type_name}' in a binary message")
+
+
+class UnknownOverflowPolicyError(DataDivrError):
+    """Raised when an outbound queue is configured with an unknown overflow policy."""
+
+    def __init__(self, policy: str, available: tuple[str, ...]):
+        super().__init__(f"Unknown overflow policy '{policy}'. Available policies: {', '.join(available)}")
+
+
+class UnknownBrokerError(DataDivrError):
+    """Raised when a broker URL names no known broker."""
+
+    def __init__(self, url: str):
+        super().__init__(f"Unknown broker '{url}', expected 'local' or 'unix:<socket path>'")
+
+
+class BrokerHubError(DataDivrError):
+    """Raised when the broker hub process fails to start."""
+
+    def __init__(self, path: str):
+        super().__init__(f"Broker hub on '{path}' did not start")
+
+
+class UnknownOrderingError(DataDivrError):
+    """Raised when the message dispatch is configured with an unknown ordering."""
+
+    def __init__(self, ordering: str, available: tuple[str, ...]):
+        super().__init__(f"Unknown ordering '{ordering}'. Available orderings: {', '.join(available)}")
+
+
+class UnknownExecutionModeError(DataDivrError):
+    """Raised when a handler is registered with an unknown execution mode."""
+
+    def __init__(self, mode: str, available: tuple[str, ...]):
+        super().__init__(f"Unknown execution mode '{mode}'. Available modes: {', '.join(available)}")
+
+
+class RequestTimeoutError(WebSocketError):
+    """Raised when the server does not answer a request in time."""
+
+    def __init__(self, event_name: str, timeout: float):
+        super().__init__(f"Request '{event_name}' timed out after {timeout:g}s")
+
+
+class RequestFailedError(WebSocketError):
+    """Raised when the server answers a request with an error message."""
+
+    def __init__(self, event_name: str, error: str | None):
+        super().__init__(f"Request '{event_name}' failed: {error}")
+
+
+class InvalidLoadTestMixError(DataDivrError):
+    """Raised when a load test message mix cannot be parsed."""
+
+    def __init__(self, mix: str, available: tuple[str, ...]):
+        super().__init__(f"Invalid message mix '{mix}'. Expected weights like 'request=0.8,{available[-1]}=0.2'")
+
+
+class InvalidLoadTestOptionError(DataDivrError):
+    """Raised when a load test option is out of range."""
+
+    def __init__(self, option: str, value: float):
+        super().__init__(f"Load test option '{option}' must be positive, got {value:g}")
+
+
+class LoadTestServerError(DataDivrError):
+    """Raised when the server started for a load test does not accept connections."""
+
+    def __init__(self, port: int):
+        super().__init__(f"Load test server on port {port} did not start")
+
+
+class UnknownEncodingError(DataDivrError):
+    """Raised when a message encoding is not supported."""
+
+    def __init__(self, encoding: str, available: tuple[str, ...]):
+        super().__init__(f"Unknown encoding '{encoding}'. Available encodings: {', '.join(available)}")
@@ -1,15 +1,32 @@
 """Message handlers for DataDivr."""
 
+from datadivr.handlers.builtin.room_handlers import join_room_handler, leave_room_handler
+from datadivr.handlers.builtin.stream_handlers import stream_ack_handler
 from datadivr.handlers.builtin.sum_handler import handle_sum_result, msg_handler, sum_handler
-from datadivr.handlers.custom_handlers import get_node_info_handler  # Import your custom handler
+from datadivr.handlers.custom_handlers import (  # Import your custom handler
+    combine_selections_handler,
+    get_node_info_handler,
+    get_selection_handler,
+    list_projects_handler,
+    load_project_handler,
+    stream_array_handler,
+)
 from datadivr.handlers.registry import HandlerType, get_handlers, websocket_handler
 
 __all__ = [
     "HandlerType",
+    "combine_selections_handler",
     "get_handlers",
+    "get_node_info_handler",
+    "get_selection_handler",
     "handle_sum_result",
+    "join_room_handler",
+    "leave_room_handler",
+    "list_projects_handler",
+    "load_project_handler",
     "msg_handler",
+    "stream_ack_handler",
+    "stream_array_handler",
     "sum_handler",
     "websocket_handler",
-    "get_node_info_handler",
 ]
@@ -0,0 +1,47 @@
+from datadivr.handlers.registry import HandlerType, websocket_handler
+from datadivr.transport.messages import create_error_message
+from datadivr.transport.models import WebSocketMessage
+
+
+@websocket_handler("join_room", HandlerType.SERVER)
+async def join_room_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests to join a room.
+
+    Members of a room receive the messages sent with ``to="room:<room>"``.
+
+    Example payload:
+        {"room": "project_a"}
+    """
+    # imported here as the server module imports the handlers
+    from datadivr.transport.server import get_room_members, join_room
+
+    room = _requested_room(message)
+    if room is None:
+        return create_error_message("Payload must contain a room name", message.from_id)
+    join_room(message.from_id, room)
+    return WebSocketMessage(
+        event_name="room_joined",
+        payload={"room": room, "members": sorted(get_room_members(room))},
+        to=message.from_id,
+    )
+
+
+@websocket_handler("leave_room", HandlerType.SERVER)
+async def leave_room_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests to leave a room.
+
+    Example payload:
+        {"room": "project_a"}
+    """
+    from datadivr.transport.server import leave_room
+
+    room = _requested_room(message)
+    if room is None:
+        return create_error_message("Payload must contain a room name", message.from_id)
+    leave_room(message.from_id, room)
+    return WebSocketMessage(event_name="room_left", payload={"room": room}, to=message.from_id)
+
+
+def _requested_room(message: WebSocketMessage) -> str | None:
+    room = message.payload.get("room") if isinstance(message.payload, dict) else None
+    return room if isinstance(room, str) and room else None
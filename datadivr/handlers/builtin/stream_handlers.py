@@ -0,0 +1,26 @@
+from datadivr.exceptions import InvalidStreamAckError
+from datadivr.handlers.registry import HandlerType, websocket_handler
+from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.streaming import ack_stream
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@websocket_handler("stream_ack", HandlerType.SERVER)
+async def stream_ack_handler(message: WebSocketMessage) -> None:
+    """Handle acknowledgements of received array stream chunks.
+
+    Each acknowledged chunk grants the stream one more chunk in flight (see `datadivr.transport.streaming`).
+    Acknowledgements with an invalid ``chunks`` count are logged and ignored.
+
+    Example payload:
+        {"stream_id": 1, "chunks": 1}
+    """
+    payload = message.payload if isinstance(message.payload, dict) else {}
+    stream_id = payload.get("stream_id")
+    if isinstance(stream_id, int):
+        try:
+            ack_stream(message.from_id, stream_id, payload.get("chunks", 1))
+        except InvalidStreamAckError as e:
+            logger.warning("invalid_stream_ack", client_id=message.from_id, error=str(e))
@@ -1,12 +1,32 @@
+import base64
+from functools import partial
+
 import numpy as np
+import numpy.typing as npt
 
+from datadivr.exceptions import (
+    AttributeNotFoundError,
+    ProjectNotFoundError,
+    ProjectPathNotAllowedError,
+    SelectionNotFoundError,
+    StreamProtocolError,
+    UnstreamableArrayError,
+)
 from datadivr.handlers.registry import HandlerType, websocket_handler
+from datadivr.project.async_io import AsyncProgressCallback, get_project, load_project
+from datadivr.project.model import Project
 from datadivr.project.project_manager import ProjectManager
 from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.streaming import DEFAULT_CHUNK_BYTES, ArrayStream, start_stream
 from datadivr.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+LINK_ARRAYS = ("start_ids", "end_ids", "colors", "weights")
+"""`LinkData` fields available to `stream_array_handler`."""
+LAYOUT_ARRAYS = ("node_ids", "positions", "colors")
+"""`LayoutData` fields available to `stream_array_handler`."""
+
 
 @websocket_handler("client_overview", HandlerType.CLIENT)
 async def handle_client_overview(message: WebSocketMessage) -> None:
@@ -25,9 +45,15 @@ async def handle_client_overview(message: WebSocketMessage) -> None:
 
 @websocket_handler("get_node_info", HandlerType.SERVER)
 async def get_node_info_handler(message: WebSocketMessage) -> WebSocketMessage:
-    """Handle requests to get information about a specific node."""
+    """Handle requests to get information about a specific node.
+
+    The payload holds the node ``index`` and optionally the ``project`` name (default: current project).
+    """
     node_index = message.payload.get("index") if message.payload else None
-    current_project = ProjectManager.get_current_project()
+    try:
+        current_project = await _requested_project(message)
+    except ProjectNotFoundError as e:
+        return WebSocketMessage(event_name="get_node_info_result", payload={"error": str(e)}, to=message.from_id)
 
     if current_project is None:
         return WebSocketMessage(
@@ -57,3 +83,241 @@ async def get_node_info_handler(message: WebSocketMessage) -> WebSocketMessage:
         return WebSocketMessage(event_name="get_node_info_result", payload={"error": str(e)}, to=message.from_id)
     except Exception as e:
         return WebSocketMessage(event_name="get_node_info_result", payload={"error": str(e)}, to=message.from_id)
+
+
+@websocket_handler("get_selection", HandlerType.SERVER)
+async def get_selection_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests for the nodes of a selection.
+
+    The payload names the selection and an optional ``encoding``: ``"ids"`` (default) returns the
+    sorted node IDs as base64 little-endian int32, ``"bitmap"`` returns a base64 bitmap (``np.packbits``)
+    over the rows of the project's nodes. An optional ``project`` names the project (default: current project).
+    """
+    payload = message.payload or {}
+    try:
+        current_project = await _requested_project(message)
+    except ProjectNotFoundError as e:
+        return _selection_error("get_selection_result", str(e), message)
+
+    if current_project is None:
+        return _selection_error("get_selection_result", "No project is currently open", message)
+
+    try:
+        selection = current_project.get_selection(payload["name"])
+        encoding = payload.get("encoding", "ids")
+        if encoding == "ids":
+            data = selection.node_ids.astype("<i4").tobytes()
+        elif encoding == "bitmap":
+            if current_project.nodes_data is None:
+                return _selection_error("get_selection_result", "No node data available", message)
+            data = np.packbits(selection.to_mask(current_project.nodes_data.ids)).tobytes()
+        else:
+            return _selection_error("get_selection_result", f"Unknown encoding '{encoding}'", message)
+    except KeyError:
+        return _selection_error("get_selection_result", "Selection name not provided", message)
+    except SelectionNotFoundError as e:
+        return _selection_error("get_selection_result", str(e), message)
+
+    return WebSocketMessage(
+        event_name="get_selection_result",
+        payload={
+            "name": selection.name,
+            "encoding": encoding,
+            "count": len(selection.node_ids),
+            "data": base64.b64encode(data).decode("ascii"),
+        },
+        to=message.from_id,
+    )
+
+
+@websocket_handler("combine_selections", HandlerType.SERVER)
+async def combine_selections_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests to combine two selections into a new one stored in the project.
+
+    The payload names the selections ``a`` and ``b``, the ``op`` (``union``, ``intersection`` or
+    ``difference``), the ``name`` of the resulting selection and optionally the ``project`` name.
+    """
+    payload = message.payload or {}
+    try:
+        current_project = await _requested_project(message)
+    except ProjectNotFoundError as e:
+        return _selection_error("combine_selections_result", str(e), message)
+
+    if current_project is None:
+        return _selection_error("combine_selections_result", "No project is currently open", message)
+
+    op = payload.get("op")
+    if op not in ("union", "intersection", "difference"):
+        return _selection_error("combine_selections_result", f"Unknown operation '{op}'", message)
+
+    try:
+        first = current_project.get_selection(payload["a"])
+        second = current_project.get_selection(payload["b"])
+        combined = getattr(first, op)(second, name=payload["name"])
+    except KeyError as e:
+        return _selection_error("combine_selections_result", f"Missing field {e}", message)
+    except SelectionNotFoundError as e:
+        return _selection_error("combine_selections_result", str(e), message)
+
+    current_project.set_selection(combined)
+    return WebSocketMessage(
+        event_name="combine_selections_result",
+        payload={"name": combined.name, "count": len(combined.node_ids)},
+        to=message.from_id,
+    )
+
+
+@websocket_handler("load_project", HandlerType.SERVER)
+async def load_project_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests to load a project file in the background.
+
+    The payload holds either the ``name`` of a project file registered with
+    `ProjectManager.register_project_file`, or a ``path`` inside the projects directory (see
+    `ProjectManager.set_projects_dir`) and optionally the registry ``name``; other paths are
+    rejected. ``current`` makes it the current project. The requesting client receives
+    ``project_progress`` events while the project loads; other clients keep being served meanwhile.
+    """
+    payload = message.payload or {}
+
+    def result(result_payload: dict) -> WebSocketMessage:
+        return WebSocketMessage(event_name="load_project_result", payload=result_payload, to=message.from_id)
+
+    if "path" not in payload and "name" not in payload:
+        return result({"error": "Project path not provided"})
+
+    name = payload.get("name")
+    requested = str(payload.get("path", name))
+    try:
+        if "path" in payload:
+            path = ProjectManager.resolve_project_path(payload["path"])
+        else:
+            path = ProjectManager.project_file(str(name))
+    except (ProjectPathNotAllowedError, ProjectNotFoundError) as e:
+        logger.warning("load_project_rejected", error=str(e), path=requested, client_id=message.from_id)
+        return result({"error": str(e)})
+
+    try:
+        project = await load_project(
+            path,
+            name=name,
+            current=payload.get("current", False),
+            progress=_progress_sender(requested, message.from_id),
+        )
+    except Exception as e:
+        logger.exception("load_project_error", error=str(e), path=str(path))
+        return result({"error": str(e)})
+
+    name = name or project.name
+    return result({"name": name, "memory_usage": ProjectManager.memory_usage(name)})
+
+
+@websocket_handler("stream_array", HandlerType.SERVER)
+async def stream_array_handler(message: WebSocketMessage) -> WebSocketMessage | None:
+    """Handle requests to stream a project array as binary frames (see `datadivr.transport.streaming`).
+
+    The payload holds the ``stream_id`` chosen by the client and the ``array`` path: ``nodes/ids``,
+    ``nodes/attributes/<name>``, ``links/<start_ids|end_ids|colors|weights>`` or
+    ``layouts/<layout>/<node_ids|positions|colors>``. Optional fields are a ``start``/``stop`` row
+    range, ``chunk_bytes`` and the ``project`` name.
+    """
+    payload = message.payload or {}
+    stream_id = payload.get("stream_id")
+    websocket = message.websocket
+
+    def stream_error(error: str) -> WebSocketMessage:
+        return WebSocketMessage(
+            event_name="stream_error", payload={"stream_id": stream_id, "error": error}, to=message.from_id
+        )
+
+    if not isinstance(stream_id, int) or websocket is None:
+        return stream_error("A stream_id is required and must be sent over a WebSocket connection")
+    start, stop = payload.get("start"), payload.get("stop")
+    if not all(row is None or _is_int(row) for row in (start, stop)):
+        return stream_error("start and stop must be integers")
+    chunk_bytes = payload.get("chunk_bytes", DEFAULT_CHUNK_BYTES)
+    if not _is_int(chunk_bytes) or chunk_bytes < 1:
+        return stream_error("chunk_bytes must be a positive integer")
+
+    try:
+        project = await _requested_project(message)
+        if project is None:
+            return stream_error("No project is currently open")
+        array = _project_array(project, payload.get("array", ""))[start:stop]
+        send_frame = partial(_send_stream_frame, message.from_id)
+        stream = ArrayStream(stream_id, array, send_frame, _broadcast, to=message.from_id, chunk_bytes=chunk_bytes)
+        start_stream(message.from_id, stream)
+    except (ProjectNotFoundError, AttributeNotFoundError, StreamProtocolError) as e:
+        return stream_error(str(e))
+    return None
+
+
+@websocket_handler("list_projects", HandlerType.SERVER)
+async def list_projects_handler(message: WebSocketMessage) -> WebSocketMessage:
+    """Handle requests for the projects registered with the project manager."""
+    return WebSocketMessage(
+        event_name="list_projects_result",
+        payload={"projects": ProjectManager.list_projects(), "memory_usage": ProjectManager.memory_usage()},
+        to=message.from_id,
+    )
+
+
+def _progress_sender(path: str, to: str | None) -> AsyncProgressCallback | None:
+    """Progress callback sending ``project_progress`` events to client `to`."""
+    if to is None:
+        return None
+
+    async def send(stage: str, fraction: float) -> None:
+        payload = {"path": path, "stage": stage, "progress": fraction}
+        await _broadcast(WebSocketMessage(event_name="project_progress", payload=payload, to=to))
+
+    return send
+
+
+async def _broadcast(message: WebSocketMessage) -> None:
+    """Send a message through the server, in the wire encoding of its recipients."""
+    # imported here as the server module imports the handlers
+    from datadivr.transport.server import broadcast
+
+    await broadcast(message)
+
+
+async def _send_stream_frame(client_id: str, frame: bytes) -> None:
+    """Queue a binary stream frame on the outbound queue of client `client_id`."""
+    # imported here as the server module imports the handlers
+    from datadivr.transport.server import send_stream_frame
+
+    await send_stream_frame(client_id, frame)
+
+
+def _is_int(value: object) -> bool:
+    """Whether a payload value is an integer (JSON booleans are not)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _project_array(project: Project, path: str) -> npt.NDArray:
+    """Resolve an array path of `stream_array_handler`."""
+    parts = path.split("/")
+    array = None
+    if parts[0] == "nodes" and project.nodes_data is not None:
+        if parts[1:] == ["ids"]:
+            array = project.nodes_data.ids
+        elif len(parts) == 3 and parts[1] == "attributes":
+            array = project.nodes_data.get_attribute(parts[2])
+    elif parts[0] == "links" and project.links_data is not None and len(parts) == 2 and parts[1] in LINK_ARRAYS:
+        array = getattr(project.links_data, parts[1])
+    elif parts[0] == "layouts" and len(parts) == 3 and parts[1] in project.layouts_data and parts[2] in LAYOUT_ARRAYS:
+        array = getattr(project.layouts_data[parts[1]], parts[2])
+
+    if array is None:
+        raise UnstreamableArrayError(path)
+    return array
+
+
+async def _requested_project(message: WebSocketMessage) -> Project | None:
+    """Project named by the optional ``project`` payload field, or the current project."""
+    name = message.payload.get("project") if isinstance(message.payload, dict) else None
+    return await get_project(name)
+
+
+def _selection_error(event_name: str, error: str, message: WebSocketMessage) -> WebSocketMessage:
+    return WebSocketMessage(event_name=event_name, payload={"error": error}, to=message.from_id)
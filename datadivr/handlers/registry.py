@@ -3,6 +3,7 @@ from enum import Enum, auto
 from functools import wraps
 from typing import Any, TypeVar
 
+from datadivr.core.executors import ExecutionMode, run_handler, validate_execution_mode
 from datadivr.transport.models import WebSocketMessage
 
 T = TypeVar("T", bound=Callable[..., Awaitable[WebSocketMessage | None]])
@@ -19,6 +20,10 @@ class HandlerType(Enum):
 # Separate registries for server and client handlers
 _server_handlers: dict[str, Callable[[WebSocketMessage], Awaitable[WebSocketMessage | None]]] = {}
 _client_handlers: dict[str, Callable[[WebSocketMessage], Awaitable[WebSocketMessage | None]]] = {}
+# Events whose pending messages are replaced by newer ones of the same sender (latest value wins)
+_coalesced_events: set[str] = set()
+# Seconds after which the server handler of an event is cancelled
+_handler_timeouts: dict[str, float] = {}
 
 
 def get_handlers(
@@ -35,8 +40,40 @@ def get_handlers(
     return _client_handlers
 
 
+def coalesce_event(event_name: str, coalesce: bool = True) -> None:
+    """
+    Declare whether messages of an event coalesce.
+
+    A message of a coalescing event replaces a message of the same event and sender that is
+    still waiting in the server's dispatcher or in a client's outbound queue, so only the
+    newest state update is processed and forwarded.
+
+    Args:
+        event_name: The event name.
+        coalesce: Whether pending messages of the event are replaced by newer ones.
+    """
+    if coalesce:
+        _coalesced_events.add(event_name)
+    else:
+        _coalesced_events.discard(event_name)
+
+
+def is_coalesced(event_name: str) -> bool:
+    """Whether messages of the event coalesce, see `coalesce_event`."""
+    return event_name in _coalesced_events
+
+
+def get_handler_timeout(event_name: str) -> float | None:
+    """Timeout of the server handler of an event in seconds, None if it has none of its own."""
+    return _handler_timeouts.get(event_name)
+
+
 def websocket_handler(
-    event_name: str, handler_type: HandlerType = HandlerType.SERVER
+    event_name: str,
+    handler_type: HandlerType = HandlerType.SERVER,
+    coalesce: bool = False,
+    timeout: float | None = None,
+    execution: ExecutionMode = "inline",
 ) -> Callable[[Callable[..., Awaitable[WebSocketMessage | None]]], Callable[..., Awaitable[WebSocketMessage | None]]]:
     """
     Decorator to register a websocket handler function.
@@ -44,24 +81,50 @@ def websocket_handler(
     Args:
         event_name: The event name to register the handler for.
         handler_type: Where this handler should be registered (SERVER, CLIENT, or BOTH)
+        coalesce: Only handle and forward the newest pending message of a sender (see `coalesce_event`),
+            for high-frequency state updates.
+        timeout: Seconds after which the server cancels the handler, instead of the default of
+            `datadivr.transport.dispatch.configure_dispatch`.
+        execution: Run the handler on the event loop (``inline``), in a thread pool (``thread``)
+            or in a process pool (``process``), see `datadivr.core.executors`.
+
+    Raises:
+        UnknownExecutionModeError: If `execution` is not an execution mode
 
     Example:
         @websocket_handler("sum_event", HandlerType.BOTH)
         async def sum_handler(message: WebSocketMessage) -> Optional[WebSocketMessage]:
             ...
+
+        @websocket_handler("position_update", coalesce=True)
+        async def position_handler(message: WebSocketMessage) -> None:
+            ...
+
+        @websocket_handler("layout_query", timeout=5.0, execution="thread")
+        async def query_handler(message: WebSocketMessage) -> Optional[WebSocketMessage]:
+            ...
     """
+    mode = validate_execution_mode(execution)
 
     def decorator(
         func: Callable[..., Awaitable[WebSocketMessage | None]],
     ) -> Callable[..., Awaitable[WebSocketMessage | None]]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> WebSocketMessage | None:
-            return await func(*args, **kwargs)
+            if mode == "inline":
+                return await func(*args, **kwargs)
+            return await run_handler(func, args[0], mode)  # handlers take the message only
 
         if handler_type in (HandlerType.SERVER, HandlerType.BOTH):
             _server_handlers[event_name] = wrapper
+            if timeout is not None:
+                _handler_timeouts[event_name] = timeout
+            else:
+                _handler_timeouts.pop(event_name, None)
         if handler_type in (HandlerType.CLIENT, HandlerType.BOTH):
             _client_handlers[event_name] = wrapper
+        if coalesce:
+            coalesce_event(event_name)
 
         return wrapper
 
@@ -0,0 +1,172 @@
+"""Asynchronous loading and saving of projects.
+
+Decoding a large project takes seconds, and doing it inside a handler would block the event
+loop and with it every connected client. These functions run the blocking work in an executor,
+forward its progress in order to an async callback, and register loaded projects with
+`ProjectManager` in a single step on the event loop, so handlers see either the previous or the
+complete new project. `get_project` likewise reloads projects unloaded by the memory budget in an
+executor.
+
+Example:
+    ```python
+    async def report(stage: str, fraction: float) -> None:
+        print(f"{stage}: {fraction:.0%}")
+
+    project = await load_project("big.datadivr", current=True, progress=report)
+    ```
+"""
+
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any
+
+from datadivr.project.model import ProgressCallback, Project
+from datadivr.project.project_manager import ProjectManager
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+AsyncProgressCallback = Callable[[str, float], Awaitable[None]]
+"""Awaited with a stage name and the completed fraction (0 to 1)."""
+
+_reloads: dict[str, asyncio.Future[Project | None]] = {}
+"""Reloads in progress by project name, shared by concurrent `get_project` calls."""
+
+
+async def get_project(name: str | None = None, executor: Executor | None = None) -> Project | None:
+    """Get a registered project like `ProjectManager.get_project` without blocking the event loop.
+
+    A project unloaded by the memory budget is reloaded in an executor; concurrent calls for the
+    same project share one reload.
+
+    Args:
+        name: Registry name, or None for the current project
+        executor: Executor to reload in, defaults to the event loop's default thread pool
+
+    Returns:
+        The project, or None if `name` is None and no project is current
+
+    Raises:
+        ProjectNotFoundError: If no project is registered under `name`
+    """
+    entry = ProjectManager.get_entry(name)
+    if entry is None:
+        return None
+    if entry.project is not None:
+        return entry.project
+
+    loop = asyncio.get_running_loop()
+    name = entry.name
+    reload = _reloads.get(name)
+    if reload is None or reload.get_loop() is not loop:
+        reload = _reloads[name] = loop.run_in_executor(executor, ProjectManager.get_project, name)
+
+        def forget(done: asyncio.Future[Project | None]) -> None:
+            if _reloads.get(name) is done:
+                del _reloads[name]
+
+        reload.add_done_callback(forget)
+    return await asyncio.shield(reload)
+
+
+async def load_project(
+    file_path: Path | str,
+    name: str | None = None,
+    current: bool = False,
+    progress: AsyncProgressCallback | None = None,
+    executor: Executor | None = None,
+) -> Project:
+    """Load a JSON (``.json``) or binary project file without blocking the event loop.
+
+    Once loaded, the project is registered with `ProjectManager`, replacing any project of the
+    same name. Its memory usage is computed and the memory budget applied in the executor too;
+    `ProjectManager.memory_usage(name)` returns the computed size.
+
+    Args:
+        file_path: Project file
+        name: Registry name, defaults to the project name
+        current: Make the project the current project
+        progress: Optional callback receiving the loading stages
+        executor: Executor to load in, defaults to the event loop's default thread pool
+    """
+    file_path = Path(file_path)
+    is_json = file_path.suffix == ".json"
+
+    def load(report: ProgressCallback | None) -> tuple[Project, int]:
+        if is_json:
+            project = Project.load_from_json_file(file_path, progress=report)
+        else:
+            project = Project.load_from_binary_file(file_path, progress=report)
+        return project, project.memory_usage()
+
+    loaded: tuple[Project, int] = await _run_with_progress(load, progress, executor)
+    project, nbytes = loaded
+    name = name or project.name
+    ProjectManager.add_project(
+        project, name=name, current=current, path=None if is_json else file_path, nbytes=nbytes, enforce_budget=False
+    )
+    logger.info("Project registered", project=name, current=current, nbytes=nbytes)
+    # downgrading other projects to meet the budget reloads them, which blocks as well
+    await asyncio.get_running_loop().run_in_executor(executor, ProjectManager.enforce_budget, name)
+    return project
+
+
+async def save_project(
+    project: Project,
+    file_path: Path | str,
+    progress: AsyncProgressCallback | None = None,
+    executor: Executor | None = None,
+) -> None:
+    """Save a project as JSON (``.json``) or binary file without blocking the event loop.
+
+    The file is written next to its destination and renamed into place when complete, so readers
+    never see a partially written project.
+    """
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f".{file_path.name}.tmp")
+
+    def save(report: ProgressCallback | None) -> None:
+        if file_path.suffix == ".json":
+            project.save_to_json_file(temp_path, progress=report)
+        else:
+            project.save_to_binary_file(temp_path, progress=report)
+        os.replace(temp_path, file_path)
+
+    try:
+        await _run_with_progress(save, progress, executor)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+async def _run_with_progress(
+    work: Callable[[ProgressCallback | None], Any],
+    progress: AsyncProgressCallback | None,
+    executor: Executor | None,
+) -> Any:
+    """Run `work` in an executor, forwarding its progress reports to `progress` on the event loop."""
+    loop = asyncio.get_running_loop()
+    if progress is None:
+        return await loop.run_in_executor(executor, work, None)
+
+    reports: asyncio.Queue[tuple[str, float] | None] = asyncio.Queue()
+
+    def report(stage: str, fraction: float) -> None:
+        loop.call_soon_threadsafe(reports.put_nowait, (stage, fraction))
+
+    async def forward() -> None:
+        while (item := await reports.get()) is not None:
+            try:
+                await progress(*item)
+            except Exception as e:
+                logger.exception("progress_callback_error", error=str(e))
+
+    forwarder = asyncio.create_task(forward())
+    try:
+        return await loop.run_in_executor(executor, work, report)
+    finally:
+        # reports scheduled by the worker run before the executor's completion callback
+        reports.put_nowait(None)
+        await forwarder
@@ -0,0 +1,123 @@
+"""Aggregation of nodes and links by node clusters.
+
+Dense link sets carry little visual information once many links overlap. Given a clustering
+of the nodes of a layout, links between the same pair of clusters are merged into a single
+weighted meta-link with the mean color of the merged links.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+DENSE_KEY_LIMIT = 1 << 26
+"""Key spaces up to this size are counted with a dense table instead of sorting."""
+DENSE_KEY_FACTOR = 4
+"""The dense table is only used if the key space is at most this many times the number of keys."""
+
+
+@dataclass
+class ClusteredNodes:
+    """Nodes grouped into clusters numbered ``0..C-1``."""
+
+    node_clusters: npt.NDArray[np.int32]  # Cluster of each node (N,)
+    sizes: npt.NDArray[np.int32]  # Number of nodes per cluster (C,)
+    positions: npt.NDArray[np.float32]  # Cluster centroids (C, 3)
+    colors: npt.NDArray[np.uint8]  # Mean RGBA color per cluster (C, 4)
+
+
+@dataclass
+class AggregatedLinks:
+    """Meta-links between clusters."""
+
+    start_ids: npt.NDArray[np.int32]  # Source cluster of each meta-link (L,)
+    end_ids: npt.NDArray[np.int32]  # Target cluster of each meta-link (L,)
+    colors: npt.NDArray[np.uint8]  # Mean RGBA color of the merged links (L, 4)
+    weights: npt.NDArray[np.int32]  # Number of merged links (L,)
+
+
+def cluster_nodes(
+    labels: npt.NDArray,
+    positions: npt.NDArray[np.float32],
+    colors: npt.NDArray[np.uint8],
+    num_labels: int | None = None,
+) -> ClusteredNodes:
+    """Group nodes by an arbitrary integer label per node.
+
+    Args:
+        labels: Cluster label of each node (N,); labels are renumbered to ``0..C-1`` in sorted order
+        positions: Node positions (N, 3)
+        colors: Node colors (N, 4)
+        num_labels: Upper bound of non-negative labels, enables counting instead of sorting
+    """
+    _, node_clusters, sizes = unique_keys(labels, num_labels)
+    num_clusters = len(sizes)
+    return ClusteredNodes(
+        node_clusters=node_clusters.astype(np.int32),
+        sizes=sizes.astype(np.int32),
+        positions=group_mean(node_clusters, positions, num_clusters).astype(np.float32),
+        colors=group_mean(node_clusters, colors, num_clusters).round().astype(np.uint8),
+    )
+
+
+def aggregate_links(
+    node_clusters: npt.NDArray,
+    start_rows: npt.NDArray,
+    end_rows: npt.NDArray,
+    colors: npt.NDArray[np.uint8],
+    directed: bool = False,
+    keep_internal: bool = False,
+) -> AggregatedLinks:
+    """Merge links between the same pair of clusters into weighted meta-links.
+
+    Args:
+        node_clusters: Cluster (``0..C-1``) of each node row (N,)
+        start_rows: Node row of each link's source (M,)
+        end_rows: Node row of each link's target (M,)
+        colors: Link colors (M, 4)
+        directed: Keep ``a -> b`` and ``b -> a`` apart; otherwise meta-links run from the lower cluster
+        keep_internal: Keep links within a cluster as self meta-links instead of dropping them
+
+    Returns:
+        AggregatedLinks: Meta-links sorted by (start, end) cluster
+    """
+    num_clusters = int(node_clusters.max()) + 1 if len(node_clusters) else 0
+    start = node_clusters[start_rows].astype(np.int64)
+    end = node_clusters[end_rows].astype(np.int64)
+    if not keep_internal:
+        between = start != end
+        start, end, colors = start[between], end[between], colors[between]
+    if not directed:
+        start, end = np.minimum(start, end), np.maximum(start, end)
+
+    keys, links, weights = unique_keys(start * num_clusters + end, num_clusters**2)
+    return AggregatedLinks(
+        start_ids=(keys // max(num_clusters, 1)).astype(np.int32),
+        end_ids=(keys % max(num_clusters, 1)).astype(np.int32),
+        colors=group_mean(links, colors, len(keys)).round().astype(np.uint8),
+        weights=weights.astype(np.int32),
+    )
+
+
+def unique_keys(keys: npt.NDArray, key_space: int | None = None) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Like ``np.unique(keys, return_inverse=True, return_counts=True)``.
+
+    If all keys are known to lie in ``[0, key_space)`` and the key space is small, both in
+    absolute terms and relative to the number of keys, the keys are counted with a dense table,
+    which avoids sorting.
+    """
+    if key_space is None or key_space > min(DENSE_KEY_LIMIT, DENSE_KEY_FACTOR * len(keys)):
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        return unique, inverse.reshape(-1), counts
+    counts = np.bincount(keys, minlength=key_space)
+    unique = np.flatnonzero(counts)
+    table = np.zeros(key_space, dtype=np.intp)
+    table[unique] = np.arange(len(unique))
+    return unique, table[keys], counts[unique]
+
+
+def group_mean(groups: npt.NDArray, values: npt.NDArray, num_groups: int) -> npt.NDArray[np.float64]:
+    """Mean of `values` (K, D) per group index in `groups` (K,)."""
+    counts = np.maximum(np.bincount(groups, minlength=num_groups), 1)
+    columns = [np.bincount(groups, weights=values[:, d], minlength=num_groups) for d in range(values.shape[1])]
+    return np.stack(columns, axis=1).reshape(num_groups, values.shape[1]) / counts[:, None]
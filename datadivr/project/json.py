@@ -1,42 +1,114 @@
-import json
+import gzip
 import os
+from collections.abc import Callable, Iterator
+from io import BufferedWriter
+from typing import Any
+
+import numpy as np
+import orjson
 
 from datadivr.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_CHUNK_SIZE = 100_000
+"""Number of nodes/links serialized per chunk by the streaming JSON writers."""
 
-def create_nodes_json(nodelist: list, node_names: list, project: str, prefix_path: str = "static/projects/") -> None:
-    # Create a list of nodes with the required structure
-    nodes = [{"id": int(idx), "n": name, "attrlist": []} for idx, name in zip(nodelist, node_names, strict=False)]
 
-    # Create the final structure
-    data = {"nodes": nodes}
+def create_nodes_json(
+    nodelist: Any,
+    node_names: Any | None,
+    project: str,
+    prefix_path: str = "static/projects/",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: bool = False,
+) -> None:
+    """Write ``nodes.json`` (``{"nodes": [{"id", "n", "attrlist"}, ...]}``) for a project.
 
-    # Define the file path
-    file_path = os.path.join(prefix_path, project, "nodes.json")
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    Args:
+        nodelist: Node IDs (array or sequence)
+        node_names: Node names in the same order, or None to use the string form of the IDs
+        project: Project name, used as sub directory of `prefix_path`
+        prefix_path: Output root directory
+        chunk_size: Number of nodes serialized at a time, bounds peak memory
+        compress: Write gzip-compressed ``nodes.json.gz`` instead
+    """
+    ids = np.asarray(nodelist)
+    names = ids.astype(str) if node_names is None else np.asarray(node_names, dtype=object)
 
-    # Write the JSON data to the file
-    with open(file_path, "w") as json_file:
-        json.dump(data, json_file, indent=4)
+    def encode(start: int, stop: int) -> bytes:
+        id_chunk = ids[start:stop].tolist()
+        name_chunk = names[start:stop].tolist()
+        return orjson.dumps([{"id": i, "n": n, "attrlist": []} for i, n in zip(id_chunk, name_chunk, strict=True)])
 
+    file_path = _write_json_array(project, prefix_path, "nodes", len(ids), encode, chunk_size, compress)
     logger.info(f"Saved nodes to {file_path}")
 
 
-def create_links_json(linklist: list, project: str, prefix_path: str = "static/projects/") -> None:
-    # Create a list of links with the required structure
-    links = [{"id": idx, "s": int(link[0]), "e": int(link[1])} for idx, link in enumerate(linklist)]
+def create_links_json(
+    start_ids: Any,
+    end_ids: Any,
+    project: str,
+    prefix_path: str = "static/projects/",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: bool = False,
+) -> None:
+    """Write ``links.json`` (``{"links": [{"id", "s", "e"}, ...]}``) for a project.
+
+    Args:
+        start_ids: Source node IDs (array or sequence)
+        end_ids: Target node IDs in the same order
+        project: Project name, used as sub directory of `prefix_path`
+        prefix_path: Output root directory
+        chunk_size: Number of links serialized at a time, bounds peak memory
+        compress: Write gzip-compressed ``links.json.gz`` instead
+    """
+    starts = np.asarray(start_ids)
+    ends = np.asarray(end_ids)
+
+    def encode(start: int, stop: int) -> bytes:
+        link_ids = range(start, stop)
+        start_chunk = starts[start:stop].tolist()
+        end_chunk = ends[start:stop].tolist()
+        return orjson.dumps([
+            {"id": i, "s": s, "e": e} for i, s, e in zip(link_ids, start_chunk, end_chunk, strict=True)
+        ])
+
+    file_path = _write_json_array(project, prefix_path, "links", len(starts), encode, chunk_size, compress)
+    logger.info(f"Saved links to {file_path}")
 
-    # Create the final structure
-    data = {"links": links}
 
-    # Define the file path
-    file_path = os.path.join(prefix_path, project, "links.json")
+def _write_json_array(
+    project: str,
+    prefix_path: str,
+    key: str,
+    length: int,
+    encode: Callable[[int, int], bytes],
+    chunk_size: int,
+    compress: bool,
+) -> str:
+    """Stream ``{"<key>": [...]}`` to ``<prefix_path>/<project>/<key>.json[.gz]`` chunk by chunk."""
+    file_path = os.path.join(prefix_path, project, f"{key}.json.gz" if compress else f"{key}.json")
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-    # Write the JSON data to the file
-    with open(file_path, "w") as json_file:
-        json.dump(data, json_file, indent=4)
+    with _open_output(file_path, compress) as f:
+        f.write(b'{"' + key.encode() + b'":[')
+        for index, chunk in enumerate(_encoded_chunks(length, encode, chunk_size)):
+            if index:
+                f.write(b",")
+            # strip the enclosing brackets of each encoded chunk
+            f.write(chunk[1:-1])
+        f.write(b"]}")
 
-    logger.info(f"Saved links to {file_path}")
+    return file_path
+
+
+def _encoded_chunks(length: int, encode: Callable[[int, int], bytes], chunk_size: int) -> Iterator[bytes]:
+    for start in range(0, length, chunk_size):
+        yield encode(start, min(start + chunk_size, length))
+
+
+def _open_output(file_path: str, compress: bool) -> gzip.GzipFile | BufferedWriter:
+    if compress:
+        return gzip.open(file_path, "wb", compresslevel=6)
+    return open(file_path, "wb")
@@ -0,0 +1,108 @@
+"""Level-of-detail (LOD) pyramids for large layouts.
+
+Nodes of a layout are clustered on successively finer regular grids spanning the layout's
+bounding box. Grid resolutions double from level to level, so every cell of a level is split
+into eight cells of the next one (an octree). Links are aggregated into weighted bundles
+between clusters.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from datadivr.project.bundling import aggregate_links, cluster_nodes
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class LODLevel:
+    """One level of a LOD pyramid.
+
+    Clusters are numbered ``0..C-1``; these numbers serve as node IDs of the level.
+    """
+
+    resolution: int  # Grid cells per axis
+    node_clusters: npt.NDArray[np.int32]  # Cluster of each layout node (N,)
+    sizes: npt.NDArray[np.int32]  # Number of nodes per cluster (C,)
+    positions: npt.NDArray[np.float32]  # Cluster centroids (C, 3)
+    colors: npt.NDArray[np.uint8]  # Mean RGBA color per cluster (C, 4)
+    link_start_ids: npt.NDArray[np.int32]  # Source cluster of each link bundle (L,)
+    link_end_ids: npt.NDArray[np.int32]  # Target cluster of each link bundle (L,)
+    link_colors: npt.NDArray[np.uint8]  # Mean RGBA color per link bundle (L, 4)
+    link_weights: npt.NDArray[np.int32]  # Number of original links per bundle (L,)
+
+
+def grid_clusters(positions: npt.NDArray[np.float32], resolution: int) -> npt.NDArray[np.int64]:
+    """Grid cell key of every position on a `resolution`^3 grid over the bounding box."""
+    low = positions.min(axis=0)
+    span = positions.max(axis=0) - low
+    span[span == 0] = 1
+    cells = np.floor((positions - low) / span * resolution).astype(np.int64)
+    np.clip(cells, 0, resolution - 1, out=cells)
+    keys: npt.NDArray[np.int64] = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+    return keys
+
+
+def build_lod_level(
+    resolution: int,
+    positions: npt.NDArray[np.float32],
+    colors: npt.NDArray[np.uint8],
+    link_start_rows: npt.NDArray[np.intp],
+    link_end_rows: npt.NDArray[np.intp],
+    link_colors: npt.NDArray[np.uint8],
+) -> LODLevel:
+    """Cluster a layout on one grid resolution and bundle its links.
+
+    Args:
+        resolution: Grid cells per axis
+        positions: Node positions (N, 3)
+        colors: Node colors (N, 4)
+        link_start_rows: Layout row of each link's source node (M,)
+        link_end_rows: Layout row of each link's target node (M,)
+        link_colors: Link colors (M, 4)
+    """
+    nodes = cluster_nodes(grid_clusters(positions, resolution), positions, colors, resolution**3)
+    links = aggregate_links(nodes.node_clusters, link_start_rows, link_end_rows, link_colors)
+
+    return LODLevel(
+        resolution=resolution,
+        node_clusters=nodes.node_clusters,
+        sizes=nodes.sizes,
+        positions=nodes.positions,
+        colors=nodes.colors,
+        link_start_ids=links.start_ids,
+        link_end_ids=links.end_ids,
+        link_colors=links.colors,
+        link_weights=links.weights,
+    )
+
+
+def build_lod_levels(
+    positions: npt.NDArray[np.float32],
+    colors: npt.NDArray[np.uint8],
+    link_start_rows: npt.NDArray[np.intp],
+    link_end_rows: npt.NDArray[np.intp],
+    link_colors: npt.NDArray[np.uint8],
+    num_levels: int = 4,
+    base_resolution: int = 4,
+) -> list[LODLevel]:
+    """Build a LOD pyramid, coarsest level first.
+
+    Level ``i`` uses a grid of ``base_resolution * 2**i`` cells per axis. See `build_lod_level`
+    for the arguments.
+    """
+    levels = []
+    for i in range(num_levels):
+        level = build_lod_level(base_resolution * 2**i, positions, colors, link_start_rows, link_end_rows, link_colors)
+        levels.append(level)
+        logger.debug(
+            "Built LOD level",
+            level=i,
+            resolution=level.resolution,
+            clusters=len(level.sizes),
+            link_bundles=len(level.link_weights),
+        )
+    return levels
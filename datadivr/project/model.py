@@ -1,18 +1,39 @@
 import json
+import sys
 import tempfile
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 from zipfile import ZIP_DEFLATED, ZipFile
 
 import numpy as np
 import numpy.typing as npt
 import orjson
-from pydantic import BaseModel, Field
-
-from datadivr.exceptions import AttributeNotFoundError, NodeIndexOutOfBoundsError
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
+
+from datadivr.exceptions import (
+    AttributeKindConflictError,
+    AttributeNotFoundError,
+    IdOverflowError,
+    MissingNodeDataError,
+    NodeIndexOutOfBoundsError,
+    SelectionNotFoundError,
+    UnknownIdStrategyError,
+)
+from datadivr.project.bundling import aggregate_links, cluster_nodes
 from datadivr.project.json import create_links_json, create_nodes_json
-from datadivr.project.textures import create_textures_from_project
+from datadivr.project.lod import LODLevel, build_lod_levels, grid_clusters
+from datadivr.project.textures import (
+    DEFAULT_MAX_TEXTURE_SIZE,
+    create_textures_from_project,
+    describe_project_textures,
+    layout_textures,
+    link_textures,
+    make_layout_tex,
+    make_link_tex,
+    project_texture_dir,
+)
 from datadivr.utils.logging import get_logger
 
 # Custom type for RGBA colors - list of 4 numbers: [r, g, b, a]
@@ -22,6 +43,27 @@ RGBAColor = tuple[int, int, int, int]
 
 logger = get_logger(__name__)
 
+ATTRIBUTE_DTYPES: dict[str, Any] = {"str": np.dtype("O"), "float": np.float32, "int": np.int32, "bool": np.bool_}
+"""Storage dtype of node attributes per attribute kind."""
+
+LOD_ARRAY_FIELDS = (
+    "node_clusters",
+    "sizes",
+    "positions",
+    "colors",
+    "link_start_ids",
+    "link_end_ids",
+    "link_colors",
+    "link_weights",
+)
+"""Array fields of `LODLevel` stored in binary project files."""
+
+ProgressCallback = Callable[[str, float], None]
+"""Called with a stage name and the completed fraction (0 to 1) while a project is loaded or saved."""
+
+MISSING_VALUES: dict[str, Any] = {"str": None, "float": np.nan, "int": -1, "bool": False}
+"""Fill value per attribute kind for nodes that lack an attribute when projects are concatenated."""
+
 
 @dataclass
 class NodeData:
@@ -42,16 +84,16 @@ class NodeData:
         self.int_attributes = {}
         self.bool_attributes = {}
 
-    def add_attribute(self, name: str, values: npt.NDArray, dtype: Any) -> None:
-        """Add a new attribute array of specified type"""
+    def add_attribute(self, name: str, values: npt.NDArray, dtype: Any, copy: bool = True) -> None:
+        """Add a new attribute array of specified type; `copy=False` keeps `values` if it already has that type"""
         if np.issubdtype(dtype, np.floating):
-            self.float_attributes[name] = values.astype(np.float32)
+            self.float_attributes[name] = values.astype(np.float32, copy=copy)
         elif np.issubdtype(dtype, np.integer):
-            self.int_attributes[name] = values.astype(np.int32)
+            self.int_attributes[name] = values.astype(np.int32, copy=copy)
         elif np.issubdtype(dtype, np.bool_):
-            self.bool_attributes[name] = values.astype(np.bool_)
+            self.bool_attributes[name] = values.astype(np.bool_, copy=copy)
         else:
-            self.str_attributes[name] = values.astype("O")
+            self.str_attributes[name] = values.astype("O", copy=copy)
 
     def get_attribute(self, name: str) -> npt.NDArray:
         """Get attribute array by name"""
@@ -67,6 +109,16 @@ class NodeData:
         # This point should not be reached due to the check above
         raise AttributeNotFoundError(name)
 
+    @property
+    def attributes_by_kind(self) -> dict[str, dict[str, npt.NDArray]]:
+        """Attribute dictionaries keyed by attribute kind (see `ATTRIBUTE_DTYPES`)."""
+        return {
+            "str": self.str_attributes,
+            "float": self.float_attributes,
+            "int": self.int_attributes,
+            "bool": self.bool_attributes,
+        }
+
     @property
     def attribute_names(self) -> set[str]:
         """Get all available attribute names"""
@@ -86,6 +138,15 @@ class NodeData:
                 attributes[name] = values[index]
         return attributes
 
+    def take(self, rows: npt.NDArray) -> "NodeData":
+        """Return a new NodeData with the given rows (boolean mask or index array) of every column."""
+        subset = NodeData(ids=self.ids[rows])
+        subset.str_attributes = {name: values[rows] for name, values in self.str_attributes.items()}
+        subset.float_attributes = {name: values[rows] for name, values in self.float_attributes.items()}
+        subset.int_attributes = {name: values[rows] for name, values in self.int_attributes.items()}
+        subset.bool_attributes = {name: values[rows] for name, values in self.bool_attributes.items()}
+        return subset
+
 
 @dataclass
 class LayoutData:
@@ -103,18 +164,95 @@ class LinkData:
     start_ids: npt.NDArray[np.int32]  # Array of source IDs (M,)
     end_ids: npt.NDArray[np.int32]  # Array of target IDs (M,)
     colors: npt.NDArray[np.uint8]  # Array of RGBA colors (M, 4)
+    weights: npt.NDArray[np.float32] | None = None  # Optional link weights, e.g. merged link counts (M,)
 
 
 class SelectionNodes(BaseModel):
-    node_ids: list[int]
+    """Node IDs of a selection, stored as a sorted int32 array without duplicates.
+
+    Lists are accepted on validation and produced on serialization, so the JSON format is unchanged.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    node_ids: np.ndarray
     create_clusternode: bool
 
+    @field_validator("node_ids", mode="before")
+    @classmethod
+    def _as_sorted_array(cls, value: Any) -> np.ndarray:
+        node_ids = np.asarray(value, dtype=np.int32).reshape(-1)
+        if np.all(node_ids[1:] > node_ids[:-1]):
+            return node_ids
+        return np.unique(node_ids)
+
+    @field_serializer("node_ids")
+    def _as_list(self, node_ids: np.ndarray) -> list[int]:
+        return node_ids.tolist()  # type: ignore[no-any-return]
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, SelectionNodes)
+            and self.create_clusternode == other.create_clusternode
+            and np.array_equal(self.node_ids, other.node_ids)
+        )
+
 
 class Selection(BaseModel):
+    """A named set of nodes with vectorized set algebra.
+
+    Example:
+        ```python
+        both = selection_a.intersection(selection_b, name="both")
+        mask = both.to_mask(project.nodes_data.ids)
+        ```
+    """
+
     name: str
     label_color: RGBAColor
     nodes: SelectionNodes
 
+    @property
+    def node_ids(self) -> np.ndarray:
+        """Sorted node IDs of the selection."""
+        return self.nodes.node_ids
+
+    def union(self, other: "Selection", name: str | None = None) -> "Selection":
+        """Nodes in either selection."""
+        return self._with_node_ids(np.union1d(self.node_ids, other.node_ids), name)
+
+    def intersection(self, other: "Selection", name: str | None = None) -> "Selection":
+        """Nodes in both selections."""
+        return self._with_node_ids(np.intersect1d(self.node_ids, other.node_ids, assume_unique=True), name)
+
+    def difference(self, other: "Selection", name: str | None = None) -> "Selection":
+        """Nodes in this selection but not in `other`."""
+        return self._with_node_ids(np.setdiff1d(self.node_ids, other.node_ids, assume_unique=True), name)
+
+    def to_mask(self, node_ids: npt.NDArray) -> npt.NDArray[np.bool_]:
+        """Boolean mask over `node_ids` (e.g. the rows of `NodeData.ids`) of the selected nodes."""
+        return IdIndex(self.node_ids).contains(node_ids)
+
+    @classmethod
+    def from_mask(
+        cls,
+        name: str,
+        mask: npt.NDArray[np.bool_],
+        node_ids: npt.NDArray,
+        label_color: RGBAColor = (255, 255, 255, 255),
+        create_clusternode: bool = False,
+    ) -> "Selection":
+        """Create a selection from a boolean mask over `node_ids`."""
+        return cls(
+            name=name,
+            label_color=label_color,
+            nodes=SelectionNodes(node_ids=node_ids[mask], create_clusternode=create_clusternode),
+        )
+
+    def _with_node_ids(self, node_ids: np.ndarray, name: str | None) -> "Selection":
+        nodes = SelectionNodes(node_ids=node_ids, create_clusternode=self.nodes.create_clusternode)
+        return Selection(name=name or self.name, label_color=self.label_color, nodes=nodes)
+
 
 class LayoutNotFoundError(ValueError):
     """Raised when a requested layout is not found in the project."""
@@ -122,6 +260,58 @@ class LayoutNotFoundError(ValueError):
     pass
 
 
+class IdIndex:
+    """Vectorized lookup of node IDs in a fixed set of IDs.
+
+    Non-negative IDs below `DENSE_LIMIT` use a dense position table (one gather per lookup) if
+    the table is at most `DENSE_FACTOR` times larger than the ID set; sparse ID sets fall back
+    to binary search. Positions refer to the order of the `ids` array the index was built from.
+    """
+
+    DENSE_LIMIT = 1 << 27
+    DENSE_FACTOR = 4
+
+    def __init__(self, ids: npt.NDArray):
+        self._table: npt.NDArray[np.int32] | None = None
+        if (
+            len(ids)
+            and ids.min() >= 0
+            and ids.max() < self.DENSE_LIMIT
+            and int(ids.max()) + 1 <= self.DENSE_FACTOR * len(ids)
+        ):
+            self._table = np.full(int(ids.max()) + 1, -1, dtype=np.int32)
+            self._table[ids] = np.arange(len(ids), dtype=np.int32)
+            self._member = self._table >= 0
+        else:
+            self._order = np.argsort(ids, kind="stable")
+            self._sorted = ids[self._order]
+
+    @staticmethod
+    def _in_range(values: npt.NDArray, size: int) -> npt.NDArray[np.bool_] | None:
+        """Mask of values within ``[0, size)``, or None if all of them are."""
+        if not len(values) or (values.min() >= 0 and values.max() < size):
+            return None
+        return (values >= 0) & (values < size)
+
+    def contains(self, values: npt.NDArray) -> npt.NDArray[np.bool_]:
+        """Boolean mask of which `values` are in the index."""
+        if self._table is not None:
+            in_range = self._in_range(values, len(self._table))
+            found: npt.NDArray[np.bool_] = self._member.take(values, mode="clip")
+            return found if in_range is None else found & in_range
+        if len(self._sorted) == 0:
+            return np.zeros(len(values), dtype=np.bool_)
+        pos = np.minimum(np.searchsorted(self._sorted, values), len(self._sorted) - 1)
+        found = self._sorted[pos] == values
+        return found
+
+    def positions(self, values: npt.NDArray) -> npt.NDArray:
+        """Position of each of `values` in the original ID array (values must be contained)."""
+        if self._table is not None:
+            return self._table.take(values, mode="clip")
+        return self._order[np.searchsorted(self._sorted, values)]
+
+
 class Project(BaseModel):
     """Root model representing a DataDiVR project.
 
@@ -136,6 +326,7 @@ class Project(BaseModel):
         links_data: Efficient storage for link data (start_ids, end_ids, and colors)
         layouts_data: Dictionary of layout configurations with efficient array storage
         selections: Optional list of node Selection groups
+        lod_data: Level-of-detail pyramids per layout name, coarsest level first (see `build_lod`)
 
     Example:
         ```python
@@ -167,6 +358,7 @@ class Project(BaseModel):
     links_data: LinkData | None = None
     layouts_data: dict[str, LayoutData] = Field(default_factory=dict)
     selections: list[Selection] | None = []
+    lod_data: dict[str, list[LODLevel]] = Field(default_factory=dict)
 
     def add_nodes_bulk(self, ids: npt.NDArray[np.int32], attributes: dict[str, npt.NDArray]) -> None:
         """Efficiently add multiple nodes at once with attribute arrays
@@ -195,6 +387,273 @@ class Project(BaseModel):
         """Efficiently add multiple links at once"""
         self.links_data = LinkData(start_ids=start_ids, end_ids=end_ids, colors=colors)
 
+    def build_lod(self, layout_name: str = "default", num_levels: int = 4, base_resolution: int = 4) -> list[LODLevel]:
+        """Build a level-of-detail pyramid for a layout and store it in `lod_data`.
+
+        Nodes are clustered on octree-nested grids of ``base_resolution * 2**i`` cells per axis
+        and links are aggregated into weighted bundles between clusters. Links with an endpoint
+        missing from the layout are ignored.
+
+        Returns:
+            list[LODLevel]: The levels, coarsest first
+        """
+        if layout_name not in self.layouts_data:
+            raise LayoutNotFoundError(layout_name)
+        layout = self.layouts_data[layout_name]
+        if not len(layout.node_ids):
+            self.lod_data[layout_name] = []
+            return []
+
+        start_rows = end_rows = np.empty(0, dtype=np.intp)
+        link_colors = np.empty((0, 4), dtype=np.uint8)
+        if self.links_data:
+            index = IdIndex(layout.node_ids)
+            valid = index.contains(self.links_data.start_ids) & index.contains(self.links_data.end_ids)
+            start_rows = index.positions(self.links_data.start_ids[valid])
+            end_rows = index.positions(self.links_data.end_ids[valid])
+            link_colors = self.links_data.colors[valid]
+
+        levels = build_lod_levels(
+            layout.positions, layout.colors, start_rows, end_rows, link_colors, num_levels, base_resolution
+        )
+        self.lod_data[layout_name] = levels
+        return levels
+
+    def aggregate_links(
+        self,
+        layout_name: str = "default",
+        resolution: int = 32,
+        node_clusters: npt.NDArray | None = None,
+        directed: bool = False,
+        name: str | None = None,
+    ) -> "Project":
+        """Merge links between the same pair of node clusters into weighted meta-links.
+
+        Nodes of the layout are clustered on a `resolution`^3 grid unless an explicit cluster
+        label per layout row is given (for example ``lod_data[layout][i].node_clusters``).
+        Links within a cluster are dropped.
+
+        Args:
+            layout_name: Layout whose node positions define the clusters
+            resolution: Grid cells per axis used when `node_clusters` is not given
+            node_clusters: Integer cluster label of every row of the layout
+            directed: Keep links of opposite direction apart
+            name: Name of the reduced project, defaults to ``<name>_aggregated``
+
+        Returns:
+            Project: Reduced project with one node per cluster (node attribute ``size``), the
+            cluster centroids as layout `layout_name` and the meta-links, whose ``weights`` hold
+            the number of merged links. Its `create_all_assets` writes the matching textures.
+        """
+        if layout_name not in self.layouts_data:
+            raise LayoutNotFoundError(layout_name)
+        layout = self.layouts_data[layout_name]
+
+        if node_clusters is None:
+            nodes = cluster_nodes(
+                grid_clusters(layout.positions, resolution), layout.positions, layout.colors, resolution**3
+            )
+        else:
+            nodes = cluster_nodes(np.asarray(node_clusters), layout.positions, layout.colors)
+        cluster_ids = np.arange(len(nodes.sizes), dtype=np.int32)
+
+        reduced = Project(name=name or f"{self.name}_aggregated", attributes=dict(self.attributes))
+        reduced.add_nodes_bulk(cluster_ids, {"size": nodes.sizes})
+        reduced.add_layout_bulk(layout_name, cluster_ids, nodes.positions, nodes.colors)
+
+        if self.links_data:
+            index = IdIndex(layout.node_ids)
+            valid = index.contains(self.links_data.start_ids) & index.contains(self.links_data.end_ids)
+            links = aggregate_links(
+                nodes.node_clusters,
+                index.positions(self.links_data.start_ids[valid]),
+                index.positions(self.links_data.end_ids[valid]),
+                self.links_data.colors[valid],
+                directed=directed,
+            )
+            reduced.links_data = LinkData(
+                start_ids=links.start_ids,
+                end_ids=links.end_ids,
+                colors=links.colors,
+                weights=links.weights.astype(np.float32),
+            )
+            logger.info(
+                "Aggregated links", project_name=self.name, links=int(valid.sum()), meta_links=len(links.weights)
+            )
+
+        return reduced
+
+    def subgraph(self, nodes: npt.NDArray, remap_ids: bool = False, name: str | None = None) -> "Project":
+        """Extract the subgraph induced by a set of nodes as a new project.
+
+        Every node attribute column and layout is sliced, only links with both endpoints in
+        the set are kept and selections are reduced to the remaining nodes. All steps are
+        vectorized, so the cost is dominated by a few sorts and binary searches.
+
+        Args:
+            nodes: Boolean mask over the rows of `nodes_data`, or an array of node IDs
+            remap_ids: Renumber the kept nodes to contiguous IDs ``0..k-1`` (in node row order)
+            name: Name of the new project, defaults to the name of this project
+
+        Returns:
+            Project: New project sharing no arrays with this one
+
+        Raises:
+            MissingNodeDataError: If the project has no node data
+        """
+        if self.nodes_data is None:
+            raise MissingNodeDataError()
+
+        nodes = np.asarray(nodes)
+        if nodes.dtype == np.bool_ and len(nodes) == len(self.nodes_data.ids):
+            row_mask = nodes
+        else:
+            row_mask = IdIndex(nodes).contains(self.nodes_data.ids)
+
+        node_subset = self.nodes_data.take(row_mask)
+        kept = IdIndex(node_subset.ids)
+
+        def new_ids(ids: npt.NDArray) -> npt.NDArray[np.int32]:
+            return kept.positions(ids).astype(np.int32) if remap_ids else ids.copy()
+
+        project = Project(name=name or self.name, attributes=dict(self.attributes))
+        project.nodes_data = node_subset
+        if remap_ids:
+            node_subset.ids = np.arange(len(node_subset.ids), dtype=np.int32)
+
+        if self.links_data:
+            links = self.links_data
+            # check end points only for links whose start survived, usually a small fraction
+            link_rows = np.flatnonzero(kept.contains(links.start_ids))
+            link_rows = link_rows[kept.contains(links.end_ids[link_rows])]
+            project.links_data = LinkData(
+                start_ids=new_ids(links.start_ids[link_rows]),
+                end_ids=new_ids(links.end_ids[link_rows]),
+                colors=links.colors[link_rows],
+                weights=links.weights[link_rows] if links.weights is not None else None,
+            )
+
+        for layout_name, layout in self.layouts_data.items():
+            layout_mask = kept.contains(layout.node_ids)
+            project.layouts_data[layout_name] = LayoutData(
+                node_ids=new_ids(layout.node_ids[layout_mask]),
+                positions=layout.positions[layout_mask],
+                colors=layout.colors[layout_mask],
+            )
+
+        selections = []
+        for selection in self.selections or []:
+            selected = selection.node_ids
+            selections.append(selection._with_node_ids(new_ids(selected[kept.contains(selected)]), None))
+        project.selections = selections
+
+        return project
+
+    @classmethod
+    def concat(
+        cls,
+        projects: list["Project"],
+        name: str | None = None,
+        id_strategy: Literal["offset", "union"] = "offset",
+        fill_values: dict[str, Any] | None = None,
+    ) -> "Project":
+        """Combine several projects into one.
+
+        Nodes, links, layouts (by layout name) and selections (by selection name) are
+        concatenated in project order into preallocated arrays.
+
+        Args:
+            projects: Projects to combine
+            name: Name of the combined project, defaults to the name of the first project
+            id_strategy: ``"offset"`` shifts the IDs of every project past the IDs of the previous
+                ones, ``"union"`` keeps IDs as they are and treats equal IDs as the same node
+                (the first project providing a node, layout position or link between two nodes
+                wins)
+            fill_values: Per attribute name, value for nodes of projects lacking that attribute.
+                Defaults to `MISSING_VALUES` of the attribute kind.
+
+        Returns:
+            Project: The combined project
+
+        Raises:
+            UnknownIdStrategyError: If `id_strategy` is not ``"offset"`` or ``"union"``
+            IdOverflowError: If the shifted IDs do not fit into int32
+            AttributeKindConflictError: If projects store an attribute with different kinds
+        """
+        if id_strategy not in ("offset", "union"):
+            raise UnknownIdStrategyError(id_strategy)
+        offsets = _id_offsets(projects) if id_strategy == "offset" else [0] * len(projects)
+
+        attributes: dict[str, str] = {}
+        for project in reversed(projects):
+            attributes.update(project.attributes)
+        result = cls(name=name or (projects[0].name if projects else "merged"), attributes=attributes)
+
+        node_parts = [(p.nodes_data, off) for p, off in zip(projects, offsets, strict=True) if p.nodes_data]
+        if node_parts:
+            result.nodes_data = _concat_node_data(node_parts, fill_values or {})
+
+        link_parts = [(p.links_data, off) for p, off in zip(projects, offsets, strict=True) if p.links_data]
+        if link_parts:
+            result.links_data = LinkData(
+                start_ids=_concat_shifted([links.start_ids for links, _ in link_parts], [o for _, o in link_parts]),
+                end_ids=_concat_shifted([links.end_ids for links, _ in link_parts], [o for _, o in link_parts]),
+                colors=np.concatenate([links.colors for links, _ in link_parts]),
+                weights=np.concatenate([
+                    links.weights if links.weights is not None else np.ones(len(links.start_ids), dtype=np.float32)
+                    for links, _ in link_parts
+                ]).astype(np.float32)
+                if any(links.weights is not None for links, _ in link_parts)
+                else None,
+            )
+
+        for layout_name in dict.fromkeys(n for p in projects for n in p.layouts_data):
+            layout_parts = [
+                (p.layouts_data[layout_name], off)
+                for p, off in zip(projects, offsets, strict=True)
+                if layout_name in p.layouts_data
+            ]
+            result.layouts_data[layout_name] = LayoutData(
+                node_ids=_concat_shifted([lay.node_ids for lay, _ in layout_parts], [o for _, o in layout_parts]),
+                positions=np.concatenate([lay.positions for lay, _ in layout_parts]),
+                colors=np.concatenate([lay.colors for lay, _ in layout_parts]),
+            )
+
+        if id_strategy == "union":
+            result._drop_duplicate_ids()
+
+        result.selections = _concat_selections(projects, offsets)
+        return result
+
+    def merge(
+        self,
+        *others: "Project",
+        id_strategy: Literal["offset", "union"] = "offset",
+        fill_values: dict[str, Any] | None = None,
+    ) -> "Project":
+        """Combine this project with others, see `Project.concat`."""
+        return Project.concat([self, *others], name=self.name, id_strategy=id_strategy, fill_values=fill_values)
+
+    def _drop_duplicate_ids(self) -> None:
+        """Keep only the first node and layout entry per node ID and the first link per node pair."""
+        if self.nodes_data is not None:
+            self.nodes_data = self.nodes_data.take(_first_occurrences(self.nodes_data.ids))
+        if self.links_data is not None:
+            links = self.links_data
+            pairs = (links.start_ids.astype(np.int64) << 32) | (links.end_ids.astype(np.int64) & 0xFFFFFFFF)
+            rows = _first_occurrences(pairs)
+            self.links_data = LinkData(
+                start_ids=links.start_ids[rows],
+                end_ids=links.end_ids[rows],
+                colors=links.colors[rows],
+                weights=links.weights[rows] if links.weights is not None else None,
+            )
+        for layout_name, layout in self.layouts_data.items():
+            rows = _first_occurrences(layout.node_ids)
+            self.layouts_data[layout_name] = LayoutData(
+                node_ids=layout.node_ids[rows], positions=layout.positions[rows], colors=layout.colors[rows]
+            )
+
     def model_dump(
         self,
         *,
@@ -233,6 +692,11 @@ class Project(BaseModel):
                 "start_ids": self.links_data.start_ids.astype(int).tolist() if self.links_data else [],
                 "end_ids": self.links_data.end_ids.astype(int).tolist() if self.links_data else [],
                 "colors": self.links_data.colors.tolist() if self.links_data else [],
+                **(
+                    {"weights": self.links_data.weights.tolist()}
+                    if self.links_data and self.links_data.weights is not None
+                    else {}
+                ),
             },
             "layouts": {
                 str(name): {  # Ensure layout names are strings
@@ -275,6 +739,7 @@ class Project(BaseModel):
                 start_ids=np.array(data["links"]["start_ids"], dtype=np.int32),
                 end_ids=np.array(data["links"]["end_ids"], dtype=np.int32),
                 colors=np.array(data["links"]["colors"], dtype=np.uint8),
+                weights=np.array(data["links"]["weights"], dtype=np.float32) if "weights" in data["links"] else None,
             )
 
         # Load layouts
@@ -293,11 +758,12 @@ class Project(BaseModel):
         return project
 
     @classmethod
-    def load_from_json_file(cls, file_path: Path | str) -> "Project":
+    def load_from_json_file(cls, file_path: Path | str, progress: ProgressCallback | None = None) -> "Project":
         """Load a project from a JSON file.
 
         Args:
             file_path: Path to the JSON file
+            progress: Optional callback receiving the loading stages
 
         Returns:
             Project: Loaded and validated Project instance
@@ -311,22 +777,27 @@ class Project(BaseModel):
 
         try:
             with file_path.open("r", encoding="utf-8") as f:
+                _report(progress, "read", 0.0)
                 data = json.load(f)
+                _report(progress, "validate", 0.5)
                 project = cls.model_validate(data)
+                _report(progress, "done", 1.0)
                 logger.info("Project loaded successfully", project_name=project.name)
                 return project
         except Exception as e:
             logger.exception("Failed to load project", error=str(e))
             raise
 
-    def save_to_json_file(self, file_path: Path | str) -> None:
+    def save_to_json_file(self, file_path: Path | str, progress: ProgressCallback | None = None) -> None:
         """Save the project to a JSON file with optimized performance."""
         file_path = Path(file_path)
         logger.debug("Saving project", file_path=str(file_path))
 
         try:
             # Convert to JSON-compatible dict first
+            _report(progress, "serialize", 0.0)
             data = self.model_dump()
+            _report(progress, "write", 0.5)
 
             # Use a faster JSON encoder
             import orjson  # Much faster than standard json
@@ -335,12 +806,13 @@ class Project(BaseModel):
             with file_path.open("wb") as f:
                 f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
+            _report(progress, "done", 1.0)
             logger.info("Project saved successfully", project_name=self.name)
         except Exception as e:
             logger.exception("Failed to save project", error=str(e))
             raise
 
-    def save_to_binary_file(self, file_path: Path | str) -> None:
+    def save_to_binary_file(self, file_path: Path | str, progress: ProgressCallback | None = None) -> None:
         """Save the project using numpy binary format for large arrays."""
         file_path = Path(file_path)
         logger.debug("Saving project in binary format", file_path=str(file_path))
@@ -348,9 +820,13 @@ class Project(BaseModel):
         try:
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
+                _report(progress, "arrays", 0.0)
                 self._save_arrays_to_temp(temp_path)
+                _report(progress, "metadata", 0.4)
                 self._save_metadata_to_temp(temp_path)
+                _report(progress, "archive", 0.5)
                 self._create_zip_archive(file_path, temp_path)
+                _report(progress, "done", 1.0)
                 logger.info("Project saved successfully in binary format", project_name=self.name)
         except Exception as e:
             logger.exception("Failed to save project in binary format", error=str(e))
@@ -371,6 +847,8 @@ class Project(BaseModel):
             np.save(arrays_dir / "link_start_ids.npy", self.links_data.start_ids)
             np.save(arrays_dir / "link_end_ids.npy", self.links_data.end_ids)
             np.save(arrays_dir / "link_colors.npy", self.links_data.colors)
+            if self.links_data.weights is not None:
+                np.save(arrays_dir / "link_weights.npy", self.links_data.weights)
 
         # Save layouts
         for name, layout in self.layouts_data.items():
@@ -380,6 +858,18 @@ class Project(BaseModel):
             np.save(layout_dir / "positions.npy", layout.positions)
             np.save(layout_dir / "colors.npy", layout.colors)
 
+        # Save selections
+        for i, selection in enumerate(self.selections or []):
+            np.save(arrays_dir / f"selection_{i}_node_ids.npy", selection.node_ids)
+
+        # Save LOD pyramids
+        for name, levels in self.lod_data.items():
+            for i, level in enumerate(levels):
+                level_dir = arrays_dir / f"lod_{name}" / f"level_{i}"
+                level_dir.mkdir(parents=True)
+                for field in LOD_ARRAY_FIELDS:
+                    np.save(level_dir / f"{field}.npy", getattr(level, field))
+
     def _save_node_attributes(self, arrays_dir: Path) -> None:
         """Save node attributes to arrays directory."""
         if self.nodes_data is None:
@@ -414,7 +904,9 @@ class Project(BaseModel):
                 else {}
             },
             "layouts": list(self.layouts_data.keys()),
-            "selections": [s.model_dump() for s in self.selections] if self.selections else [],
+            # node IDs are stored as arrays/selection_<i>_node_ids.npy
+            "selections": [s.model_dump(exclude={"nodes": {"node_ids"}}) for s in self.selections or []],
+            "lod": {name: [level.resolution for level in levels] for name, levels in self.lod_data.items()},
         }
 
         with open(temp_path / "metadata.json", "wb") as f:
@@ -428,66 +920,132 @@ class Project(BaseModel):
                     zf.write(file_path, file_path.relative_to(temp_path))
 
     @classmethod
-    def load_from_binary_file(cls, file_path: Path | str) -> "Project":
-        """Load a project from a binary format file."""
+    def load_from_binary_file(
+        cls, file_path: Path | str, mmap_dir: Path | str | None = None, progress: ProgressCallback | None = None
+    ) -> "Project":
+        """Load a project from a binary format file.
+
+        Args:
+            file_path: Path of the binary project file
+            mmap_dir: Extract the archive into this directory and memory-map the numeric arrays
+                instead of reading them into RAM. The directory must outlive the project.
+            progress: Optional callback receiving the loading stages
+        """
         file_path = Path(file_path)
-        logger.debug("Loading project from binary format", file_path=str(file_path))
+        logger.debug("Loading project from binary format", file_path=str(file_path), mmap=mmap_dir is not None)
 
         try:
+            if mmap_dir is not None:
+                return cls._load_extracted_archive(file_path, Path(mmap_dir), "r", progress)
             with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                # Extract zip archive
-                with ZipFile(file_path, "r") as zf:
-                    zf.extractall(temp_path)
-
-                # Load metadata
-                with open(temp_path / "metadata.json", "rb") as f:
-                    metadata = orjson.loads(f.read())
-
-                # Create project instance
-                project = cls(name=metadata["name"], attributes=metadata.get("attributes", {}))
-
-                # Load nodes
-                if (temp_path / "arrays/node_ids.npy").exists():
-                    node_ids = np.load(temp_path / "arrays/node_ids.npy")
-                    project.nodes_data = NodeData(ids=node_ids)
-
-                    # Load attributes from metadata
-                    if "nodes" in metadata and "attributes" in metadata["nodes"]:
-                        for name, _dtype_info in metadata["nodes"]["attributes"].items():
-                            attr_path = temp_path / f"arrays/node_attr_{name}.npy"
-                            if attr_path.exists():
-                                values = np.load(attr_path, allow_pickle=True)
-                                project.nodes_data.add_attribute(name, values, values.dtype)
-
-                # Load links if present
-                if (temp_path / "arrays/link_start_ids.npy").exists():
-                    project.links_data = LinkData(
-                        start_ids=np.load(temp_path / "arrays/link_start_ids.npy"),
-                        end_ids=np.load(temp_path / "arrays/link_end_ids.npy"),
-                        colors=np.load(temp_path / "arrays/link_colors.npy"),
-                    )
-
-                # Load layouts
-                for layout_name in metadata["layouts"]:
-                    layout_dir = temp_path / f"arrays/layout_{layout_name}"
-                    project.layouts_data[layout_name] = LayoutData(
-                        node_ids=np.load(layout_dir / "node_ids.npy"),
-                        positions=np.load(layout_dir / "positions.npy"),
-                        colors=np.load(layout_dir / "colors.npy"),
-                    )
-
-                # Load selections
-                if "selections" in metadata:
-                    project.selections = [Selection.model_validate(s) for s in metadata["selections"]]
-
-                return project
+                return cls._load_extracted_archive(file_path, Path(temp_dir), None, progress)
 
         except Exception as e:
             logger.exception("Failed to load project from binary format", error=str(e))
             raise
 
+    @classmethod
+    def _load_extracted_archive(
+        cls, file_path: Path, temp_path: Path, mmap_mode: Literal["r"] | None, progress: ProgressCallback | None
+    ) -> "Project":
+        def load(path: Path, allow_pickle: bool = False) -> npt.NDArray:
+            return _load_array(path, mmap_mode, allow_pickle)
+
+        # Extract zip archive
+        _report(progress, "extract", 0.0)
+        with ZipFile(file_path, "r") as zf:
+            zf.extractall(temp_path)
+
+        # Load metadata
+        with open(temp_path / "metadata.json", "rb") as f:
+            metadata = orjson.loads(f.read())
+
+        # Create project instance
+        project = cls(name=metadata["name"], attributes=metadata.get("attributes", {}))
+
+        # Load nodes
+        _report(progress, "nodes", 0.3)
+        if (temp_path / "arrays/node_ids.npy").exists():
+            project.nodes_data = NodeData(ids=load(temp_path / "arrays/node_ids.npy"))
+
+            # Load attributes from metadata
+            for name in metadata.get("nodes", {}).get("attributes", {}):
+                attr_path = temp_path / f"arrays/node_attr_{name}.npy"
+                if attr_path.exists():
+                    # string and other object attributes are stored pickled
+                    values = load(attr_path, allow_pickle=True)
+                    project.nodes_data.add_attribute(name, values, values.dtype, copy=False)
+
+        # Load links if present
+        _report(progress, "links", 0.5)
+        if (temp_path / "arrays/link_start_ids.npy").exists():
+            project.links_data = LinkData(
+                start_ids=load(temp_path / "arrays/link_start_ids.npy"),
+                end_ids=load(temp_path / "arrays/link_end_ids.npy"),
+                colors=load(temp_path / "arrays/link_colors.npy"),
+                weights=load(weights_path)
+                if (weights_path := temp_path / "arrays/link_weights.npy").exists()
+                else None,
+            )
+
+        # Load layouts
+        _report(progress, "layouts", 0.7)
+        for layout_name in metadata["layouts"]:
+            layout_dir = temp_path / f"arrays/layout_{layout_name}"
+            project.layouts_data[layout_name] = LayoutData(
+                node_ids=load(layout_dir / "node_ids.npy"),
+                positions=load(layout_dir / "positions.npy"),
+                colors=load(layout_dir / "colors.npy"),
+            )
+
+        # Load selections
+        project.selections = _load_selections(metadata.get("selections", []), temp_path / "arrays")
+
+        # Load LOD pyramids
+        _report(progress, "lod", 0.9)
+        for layout_name, resolutions in metadata.get("lod", {}).items():
+            lod_dir = temp_path / f"arrays/lod_{layout_name}"
+            project.lod_data[layout_name] = [
+                LODLevel(
+                    resolution=resolution,
+                    **{field: load(lod_dir / f"level_{i}" / f"{field}.npy") for field in LOD_ARRAY_FIELDS},
+                )
+                for i, resolution in enumerate(resolutions)
+            ]
+
+        _report(progress, "done", 1.0)
+        return project
+
+    def memory_usage(self) -> int:
+        """Bytes of array data held in RAM; memory-mapped arrays are not counted."""
+        arrays: list[npt.NDArray | None] = []
+        if self.nodes_data is not None:
+            arrays.append(self.nodes_data.ids)
+            for attributes in self.nodes_data.attributes_by_kind.values():
+                arrays.extend(attributes.values())
+        if self.links_data is not None:
+            links = self.links_data
+            arrays.extend((links.start_ids, links.end_ids, links.colors, links.weights))
+        for layout in self.layouts_data.values():
+            arrays.extend((layout.node_ids, layout.positions, layout.colors))
+        for selection in self.selections or []:
+            arrays.append(selection.node_ids)
+        for levels in self.lod_data.values():
+            arrays.extend(getattr(level, field) for level in levels for field in LOD_ARRAY_FIELDS)
+        return sum(_resident_nbytes(array) for array in arrays if array is not None)
+
+    def get_selection(self, name: str) -> Selection:
+        """Get a selection by name."""
+        for selection in self.selections or []:
+            if selection.name == name:
+                return selection
+        raise SelectionNotFoundError(name)
+
+    def set_selection(self, selection: Selection) -> None:
+        """Add a selection, replacing any selection of the same name."""
+        others = [s for s in self.selections or [] if s.name != selection.name]
+        self.selections = [*others, selection]
+
     def get_layout_positions(self, layout_name: str = "default") -> npt.NDArray[np.float32]:
         """Get node positions for a specific layout"""
         if layout_name not in self.layouts_data:
@@ -500,8 +1058,14 @@ class Project(BaseModel):
             raise LayoutNotFoundError(layout_name)
         return self.layouts_data[layout_name].colors
 
-    def create_textures(self, output_dir: str = "static/projects/") -> None:
-        """Create textures for the project."""
+    def create_textures(
+        self, output_dir: str = "static/projects/", max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE
+    ) -> None:
+        """Create textures for the project.
+
+        Textures are near-square; any texture whose side would exceed `max_texture_size`
+        is split into several tiles (see `create_project_summary`).
+        """
         create_textures_from_project(
             self.name,
             self.layouts_data,
@@ -513,25 +1077,79 @@ class Project(BaseModel):
             if self.links_data
             else None,
             output_dir,
+            max_texture_size,
         )
 
-    def create_json_files(self, output_dir: str = "static/projects/") -> None:
-        """Create JSON files for nodes and links."""
+    def create_lod_textures(
+        self, output_dir: str = "static/projects/", max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE
+    ) -> None:
+        """Create textures for every LOD level.
+
+        Level ``i`` of layout ``<name>`` is written as layout ``<name>_lod<i>`` (cluster numbers
+        as node IDs) with link textures ``links_<name>_lod<i>``.
+        """
+        texture_dir = project_texture_dir(output_dir, self.name)
+        for layout_name, levels in self.lod_data.items():
+            for i, level in enumerate(levels):
+                make_layout_tex(
+                    self.name,
+                    f"{layout_name}_lod{i}",
+                    np.arange(len(level.sizes), dtype=np.int32),
+                    level.positions,
+                    level.colors,
+                    texture_dir,
+                    max_texture_size,
+                )
+                make_link_tex(
+                    self.name,
+                    level.link_start_ids,
+                    level.link_end_ids,
+                    level.link_colors,
+                    texture_dir,
+                    max_texture_size,
+                    name=f"links_{layout_name}_lod{i}",
+                )
+
+    def create_json_files(self, output_dir: str = "static/projects/", compress: bool = False) -> None:
+        """Create JSON files for nodes and links.
+
+        The files are streamed in chunks straight from the numpy arrays; with `compress`
+        they are written as ``nodes.json.gz`` and ``links.json.gz``.
+        """
         if self.nodes_data:
-            create_nodes_json(
-                self.nodes_data.ids.tolist(),  # Convert ndarray to list
-                [str(i) for i in self.nodes_data.ids],  # Assuming node names are string representations of IDs
-                self.name,
-                output_dir,
-            )
+            # Node names are the string representations of the IDs
+            create_nodes_json(self.nodes_data.ids, None, self.name, output_dir, compress=compress)
 
         if self.links_data:
             create_links_json(
-                list(zip(self.links_data.start_ids, self.links_data.end_ids, strict=False)), self.name, output_dir
+                self.links_data.start_ids, self.links_data.end_ids, self.name, output_dir, compress=compress
             )
 
-    def create_project_summary(self, output_dir: str = "static/projects/") -> None:
-        """Create a project summary JSON file."""
+    def create_project_summary(
+        self, output_dir: str = "static/projects/", max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE
+    ) -> None:
+        """Create a project summary JSON file.
+
+        The ``textures`` entry lists, per texture, the tiles (file, pixel offset and count,
+        width and height) so clients can stream large textures page by page.
+        """
+        textures = describe_project_textures(
+            self.layouts_data, len(self.links_data.start_ids) if self.links_data else 0, max_texture_size
+        )
+        lod_summary: dict[str, list[dict[str, Any]]] = {}
+        for layout_name, levels in self.lod_data.items():
+            lod_summary[layout_name] = []
+            for i, level in enumerate(levels):
+                lod_layout, lod_links = f"{layout_name}_lod{i}", f"links_{layout_name}_lod{i}"
+                textures.update(layout_textures(lod_layout, len(level.sizes), max_texture_size))
+                textures.update(link_textures(len(level.link_weights), max_texture_size, lod_links))
+                lod_summary[layout_name].append({
+                    "resolution": level.resolution,
+                    "layout": lod_layout,
+                    "links": lod_links,
+                    "nodecount": len(level.sizes),
+                    "linkcount": len(level.link_weights),
+                })
         project_summary = {
             "name": self.name,
             "layouts": list(self.layouts_data.keys()),
@@ -542,6 +1160,11 @@ class Project(BaseModel):
             "linkcount": len(self.links_data.start_ids) if self.links_data else 0,
             "labelcount": 0,  # Placeholder, adjust as needed
             "annotationTypes": False,  # Placeholder, adjust as needed
+            "lod": lod_summary,
+            "textures": {
+                "maxSize": max_texture_size,
+                "tiles": {name: [asdict(tile) for tile in tiles] for name, tiles in textures.items()},
+            },
         }
 
         file_path = Path(output_dir) / self.name / "project.json"
@@ -552,9 +1175,167 @@ class Project(BaseModel):
 
         logger.info(f"Project summary saved to {file_path}")
 
-    def create_all_assets(self, output_dir: str = "static/projects/") -> None:
+    def create_all_assets(
+        self, output_dir: str = "static/projects/", max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE
+    ) -> None:
         """Create all project assets including textures, JSON files, and project summary."""
-        self.create_textures(output_dir)
+        self.create_textures(output_dir, max_texture_size)
+        self.create_lod_textures(output_dir, max_texture_size)
         self.create_json_files(output_dir)
-        self.create_project_summary(output_dir)
+        self.create_project_summary(output_dir, max_texture_size)
         logger.info("All project assets created successfully", project_name=self.name)
+
+
+def _id_offsets(projects: list[Project]) -> list[int]:
+    """ID offsets that place the IDs of each project after those of all previous projects."""
+    offsets = []
+    next_id = 0
+    for project in projects:
+        id_arrays = [a for a in _id_arrays(project) if len(a)]
+        if not id_arrays:
+            offsets.append(next_id)
+            continue
+        low = min(int(a.min()) for a in id_arrays)
+        high = max(int(a.max()) for a in id_arrays)
+        offsets.append(next_id - low)
+        next_id += high - low + 1
+    return offsets
+
+
+def _id_arrays(project: Project) -> list[npt.NDArray]:
+    arrays = [layout.node_ids for layout in project.layouts_data.values()]
+    if project.nodes_data:
+        arrays.append(project.nodes_data.ids)
+    if project.links_data:
+        arrays.extend([project.links_data.start_ids, project.links_data.end_ids])
+    return arrays
+
+
+def _concat_shifted(arrays: list[npt.NDArray], offsets: list[int]) -> npt.NDArray[np.int32]:
+    """Concatenate ID arrays into one preallocated int32 array, adding an offset per array.
+
+    Raises:
+        IdOverflowError: If a shifted ID does not fit into int32
+    """
+    limits = np.iinfo(np.int32)
+    for array, offset in zip(arrays, offsets, strict=True):
+        if len(array):
+            low, high = int(array.min()) + offset, int(array.max()) + offset
+            if low < limits.min or high > limits.max:
+                raise IdOverflowError(low, high)
+
+    result = np.empty(sum(len(a) for a in arrays), dtype=np.int32)
+    start = 0
+    for array, offset in zip(arrays, offsets, strict=True):
+        np.add(array, offset, out=result[start : start + len(array)], casting="unsafe")
+        start += len(array)
+    return result
+
+
+def _concat_node_data(parts: list[tuple[NodeData, int]], fill_values: dict[str, Any]) -> NodeData:
+    """Concatenate node data, aligning attribute columns by name.
+
+    Raises:
+        AttributeKindConflictError: If an attribute has different kinds in different parts
+    """
+    total = sum(len(nodes.ids) for nodes, _ in parts)
+    kinds: dict[str, str] = {}
+    for nodes, _ in parts:
+        for kind, attrs in nodes.attributes_by_kind.items():
+            for attr_name in attrs:
+                if kinds.setdefault(attr_name, kind) != kind:
+                    raise AttributeKindConflictError(attr_name, kinds[attr_name], kind)
+
+    result = NodeData(ids=_concat_shifted([nodes.ids for nodes, _ in parts], [offset for _, offset in parts]))
+    columns = result.attributes_by_kind
+    for attr_name, kind in kinds.items():
+        fill = fill_values.get(attr_name, MISSING_VALUES[kind])
+        columns[kind][attr_name] = np.full(total, fill, dtype=ATTRIBUTE_DTYPES[kind])
+
+    start = 0
+    for nodes, _ in parts:
+        stop = start + len(nodes.ids)
+        for attrs in nodes.attributes_by_kind.values():
+            for attr_name, values in attrs.items():
+                columns[kinds[attr_name]][attr_name][start:stop] = values
+        start = stop
+    return result
+
+
+def _concat_selections(projects: list[Project], offsets: list[int]) -> list[Selection]:
+    """Concatenate selections, merging the node sets of selections with the same name."""
+    merged: dict[str, tuple[Selection, list[npt.NDArray]]] = {}
+    for project, offset in zip(projects, offsets, strict=True):
+        for selection in project.selections or []:
+            node_ids = selection.node_ids.astype(np.int64) + offset
+            if selection.name in merged:
+                merged[selection.name][1].append(node_ids)
+            else:
+                merged[selection.name] = (selection, [node_ids])
+
+    selections = []
+    for selection, node_id_parts in merged.values():
+        selections.append(selection._with_node_ids(np.unique(np.concatenate(node_id_parts)), None))
+    return selections
+
+
+def _first_occurrences(ids: npt.NDArray) -> npt.NDArray[np.intp]:
+    """Sorted row indices of the first occurrence of every distinct ID."""
+    _, first = np.unique(ids, return_index=True)
+    return np.sort(first)
+
+
+def _load_selections(selections: list[dict], arrays_dir: Path) -> list[Selection]:
+    """Validate selection metadata, reading node IDs from their array files.
+
+    Files written before selections were stored as arrays keep the node IDs in the metadata.
+    """
+    for i, selection in enumerate(selections):
+        if "node_ids" not in selection["nodes"]:
+            selection["nodes"]["node_ids"] = np.load(arrays_dir / f"selection_{i}_node_ids.npy")
+    return [Selection.model_validate(s) for s in selections]
+
+
+def _load_array(path: Path, mmap_mode: Literal["r"] | None, allow_pickle: bool = False) -> npt.NDArray:
+    """Load a ``.npy`` file, memory-mapped if requested and possible (object arrays are always read).
+
+    Only object arrays need `allow_pickle`; unpickling runs code from the file, so it is never
+    enabled for numeric arrays.
+    """
+    if mmap_mode is not None:
+        try:
+            array: npt.NDArray = np.load(path, mmap_mode=mmap_mode)
+        except ValueError:
+            pass
+        else:
+            return array
+    return np.load(path, allow_pickle=allow_pickle)  # type: ignore[no-any-return]
+
+
+OBJECT_SIZE_SAMPLES = 64
+"""Number of elements sampled to estimate the size of the Python objects in an object array."""
+
+
+def _resident_nbytes(array: npt.NDArray) -> int:
+    """Bytes of an array held in RAM, counting memory-mapped arrays (and views of them) as zero.
+
+    The Python objects referenced by object arrays (e.g. string attributes) are estimated from a
+    sample of `OBJECT_SIZE_SAMPLES` elements, so sizing stays cheap for large arrays.
+    """
+    base: Any = array
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return 0
+        base = getattr(base, "base", None)
+    size = int(array.nbytes)
+    if array.dtype.hasobject and array.size:
+        flat = array.reshape(-1)
+        step = max(1, len(flat) // OBJECT_SIZE_SAMPLES)
+        sample = flat[::step][:OBJECT_SIZE_SAMPLES]
+        size += sum(sys.getsizeof(value) for value in sample.tolist()) * len(flat) // len(sample)
+    return size
+
+
+def _report(progress: ProgressCallback | None, stage: str, fraction: float) -> None:
+    if progress is not None:
+        progress(stage, fraction)
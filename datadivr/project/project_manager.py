@@ -1,20 +1,312 @@
+"""Registry of the projects served by one process.
+
+Projects are registered by name, either as loaded `Project` instances or as binary project files
+that are loaded on first access. With a memory budget, the least recently used file-backed
+projects are first downgraded to memory-mapped arrays and then unloaded until the resident array
+memory fits the budget; unloaded projects are reloaded on their next access. Handlers should get
+projects with `datadivr.project.async_io.get_project`, which reloads them in an executor instead
+of on the event loop.
+
+Loading and the budget enforcement may run in executor threads; the registry is guarded by a lock
+and a reloaded project replaces the previous one in a single step.
+
+The "current" project is the one used by handlers that do not name a project.
+
+Clients may only load registered project files, or files inside the projects directory set with
+`set_projects_dir` (see `project_file` and `resolve_project_path`).
+"""
+
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar
+
+from datadivr.exceptions import ProjectNotFoundError, ProjectPathNotAllowedError
 from datadivr.project.model import Project
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ProjectEntry:
+    """A registered project.
+
+    Attributes:
+        name: Registry name of the project
+        path: Binary project file; only file-backed projects can be unloaded or memory-mapped
+        project: The loaded project, None while unloaded
+        mmap_dir: Directory holding the extracted arrays while the project is memory-mapped
+        nbytes: Array memory held in RAM by the loaded project
+    """
+
+    name: str
+    path: Path | None = None
+    project: Project | None = None
+    mmap_dir: Path | None = None
+    nbytes: int = 0
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self.mmap_dir is not None
+
+    def load(self, memory_mapped: bool = False) -> Project:
+        """(Re)load the project from its file, optionally memory-mapped.
+
+        The previous project stays in place until the new one is completely loaded.
+        """
+        if self.path is None:
+            raise ProjectNotFoundError(self.name)
+        mmap_dir = Path(tempfile.mkdtemp(prefix=f"datadivr_{self.name}_")) if memory_mapped else None
+        try:
+            project = Project.load_from_binary_file(self.path, mmap_dir=mmap_dir)
+            nbytes = project.memory_usage()
+        except Exception:
+            if mmap_dir is not None:
+                shutil.rmtree(mmap_dir, ignore_errors=True)
+            raise
+        previous_mmap_dir = self.mmap_dir
+        self.project, self.nbytes, self.mmap_dir = project, nbytes, mmap_dir
+        if previous_mmap_dir is not None:
+            shutil.rmtree(previous_mmap_dir, ignore_errors=True)
+        return project
+
+    def unload(self) -> None:
+        """Drop the loaded project and its memory-mapped files."""
+        self.project = None
+        self.nbytes = 0
+        if self.mmap_dir is not None:
+            shutil.rmtree(self.mmap_dir, ignore_errors=True)
+            self.mmap_dir = None
 
 
 class ProjectManager:
-    _instance: Project | None = None
+    _projects: ClassVar[OrderedDict[str, ProjectEntry]] = OrderedDict()  # least recently used first
+    _current: ClassVar[str | None] = None
+    _memory_budget: ClassVar[int | None] = None
+    _projects_dir: ClassVar[Path | None] = None
+    _lock: ClassVar[threading.RLock] = threading.RLock()
 
     @classmethod
     def get_current_project(cls) -> Project | None:
         """Get the current project instance."""
-        return cls._instance
+        return cls.get_project()
 
     @classmethod
     def set_current_project(cls, project: Project) -> None:
-        """Set the current project instance."""
-        cls._instance = project
+        """Set the current project instance, registering it under its name."""
+        cls.add_project(project, current=True)
 
     @classmethod
     def clear_current_project(cls) -> None:
-        """Clear the current project instance."""
-        cls._instance = None
+        """Clear the current project instance and remove it from the registry."""
+        if cls._current is not None:
+            cls.remove_project(cls._current)
+
+    @classmethod
+    def add_project(
+        cls,
+        project: Project,
+        name: str | None = None,
+        current: bool = False,
+        path: Path | str | None = None,
+        nbytes: int | None = None,
+        enforce_budget: bool = True,
+    ) -> None:
+        """Register a loaded project, replacing any project of the same name.
+
+        Args:
+            project: The project
+            name: Registry name, defaults to the project name
+            current: Make it the current project
+            path: Binary file the project was loaded from; projects without one are never unloaded by the budget
+            nbytes: The project's `Project.memory_usage`, if already known
+            enforce_budget: Apply the memory budget right away; otherwise the caller runs
+                `enforce_budget`, e.g. in an executor
+        """
+        name = name or project.name
+        if nbytes is None:
+            nbytes = project.memory_usage()
+        cls._replace(
+            ProjectEntry(name=name, path=Path(path) if path else None, project=project, nbytes=nbytes), current
+        )
+        if enforce_budget:
+            cls.enforce_budget(keep=name)
+
+    @classmethod
+    def register_project_file(cls, file_path: Path | str, name: str | None = None, current: bool = False) -> None:
+        """Register a binary project file, loaded on first access."""
+        file_path = Path(file_path)
+        cls._replace(ProjectEntry(name=name or file_path.stem, path=file_path), current)
+
+    @classmethod
+    def get_entry(cls, name: str | None = None) -> ProjectEntry | None:
+        """Get the registry entry of a project by name and mark it as recently used.
+
+        Args:
+            name: Registry name, or None for the current project
+
+        Returns:
+            The entry, or None if `name` is None and no project is current
+
+        Raises:
+            ProjectNotFoundError: If no project is registered under `name`
+        """
+        with cls._lock:
+            if name is None:
+                if cls._current is None:
+                    return None
+                name = cls._current
+            entry = cls._projects.get(name)
+            if entry is None:
+                raise ProjectNotFoundError(name)
+            cls._projects.move_to_end(name)
+            return entry
+
+    @classmethod
+    def get_project(cls, name: str | None = None) -> Project | None:
+        """Get a project by name, loading it if needed.
+
+        Loading blocks; on the event loop use `datadivr.project.async_io.get_project` instead.
+
+        Args:
+            name: Registry name, or None for the current project
+
+        Returns:
+            The project, or None if `name` is None and no project is current
+
+        Raises:
+            ProjectNotFoundError: If no project is registered under `name`
+        """
+        entry = cls.get_entry(name)
+        if entry is None:
+            return None
+        project = entry.project
+        if project is None:
+            logger.info("Loading project", project=entry.name, path=str(entry.path))
+            project = entry.load()
+            cls.enforce_budget(keep=entry.name)
+        return project
+
+    @classmethod
+    def remove_project(cls, name: str) -> None:
+        """Remove a project from the registry."""
+        with cls._lock:
+            entry = cls._projects.pop(name, None)
+            if cls._current == name:
+                cls._current = None
+        if entry is not None:
+            entry.unload()
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all projects, the memory budget and the projects directory."""
+        for entry in cls._entries():
+            cls.remove_project(entry.name)
+        cls._memory_budget = None
+        cls._projects_dir = None
+
+    @classmethod
+    def set_memory_budget(cls, nbytes: int | None) -> None:
+        """Limit the array memory held in RAM by all registered projects; None disables the limit."""
+        cls._memory_budget = nbytes
+        cls.enforce_budget()
+
+    @classmethod
+    def set_projects_dir(cls, path: Path | str | None) -> None:
+        """Directory whose project files clients may load by path; None allows registered files only."""
+        cls._projects_dir = Path(path).resolve() if path is not None else None
+
+    @classmethod
+    def resolve_project_path(cls, path: Path | str) -> Path:
+        """Resolve a project file path requested by a client, relative to the projects directory.
+
+        Raises:
+            ProjectPathNotAllowedError: If no projects directory is set or the path leaves it
+        """
+        projects_dir = cls._projects_dir
+        if projects_dir is None:
+            raise ProjectPathNotAllowedError(str(path))
+        resolved = (projects_dir / path).resolve()
+        if not resolved.is_relative_to(projects_dir):
+            raise ProjectPathNotAllowedError(str(path))
+        return resolved
+
+    @classmethod
+    def project_file(cls, name: str) -> Path:
+        """The binary file of a project registered with `register_project_file` or loaded from one.
+
+        Raises:
+            ProjectNotFoundError: If no file-backed project is registered under `name`
+        """
+        with cls._lock:
+            entry = cls._projects.get(name)
+        if entry is None or entry.path is None:
+            raise ProjectNotFoundError(name)
+        return entry.path
+
+    @classmethod
+    def memory_usage(cls, name: str | None = None) -> int:
+        """Array memory held in RAM by all registered projects, or by the project `name`."""
+        return sum(entry.nbytes for entry in cls._entries() if name is None or entry.name == name)
+
+    @classmethod
+    def list_projects(cls) -> list[dict[str, Any]]:
+        """Describe the registered projects, least recently used first."""
+        return [
+            {
+                "name": entry.name,
+                "current": entry.name == cls._current,
+                "loaded": entry.project is not None,
+                "memory_mapped": entry.memory_mapped,
+                "nbytes": entry.nbytes,
+            }
+            for entry in cls._entries()
+        ]
+
+    @classmethod
+    def _entries(cls) -> list[ProjectEntry]:
+        """Snapshot of the registry, least recently used first."""
+        with cls._lock:
+            return list(cls._projects.values())
+
+    @classmethod
+    def _replace(cls, entry: ProjectEntry, current: bool) -> None:
+        with cls._lock:
+            was_current = cls._current == entry.name
+            previous = cls._projects.pop(entry.name, None)
+            cls._projects[entry.name] = entry
+            if current or was_current:
+                cls._current = entry.name
+        if previous is not None:
+            previous.unload()
+
+    @classmethod
+    def enforce_budget(cls, keep: str | None = None) -> None:
+        """Downgrade, then unload least recently used file-backed projects until the budget is met."""
+        budget = cls._memory_budget
+        if budget is None:
+            return
+
+        candidates = [
+            entry
+            for entry in cls._entries()
+            if entry.name != keep and entry.path is not None and entry.project is not None
+        ]
+        for entry in candidates:
+            if cls.memory_usage() <= budget:
+                return
+            if not entry.memory_mapped:
+                logger.info("Memory-mapping project to meet the memory budget", project=entry.name)
+                entry.load(memory_mapped=True)
+        for entry in candidates:
+            if cls.memory_usage() <= budget:
+                return
+            logger.info("Unloading project to meet the memory budget", project=entry.name)
+            entry.unload()
+
+        if cls.memory_usage() > budget:
+            logger.warning("Memory budget exceeded", budget=budget, usage=cls.memory_usage())
@@ -1,4 +1,6 @@
+import math
 import os
+from dataclasses import dataclass
 
 import numpy as np
 from PIL import Image
@@ -7,36 +9,169 @@ from datadivr.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_MAX_TEXTURE_SIZE = 4096
+"""Largest texture side (in pixels) written before a texture is sharded into tiles."""
+
+
+@dataclass
+class TextureTile:
+    """One texture page holding a contiguous range of pixels of a texture atlas.
+
+    Attributes:
+        file: File name of the tile, relative to the project's texture directory
+        offset: Index of the first pixel stored in this tile
+        count: Number of used pixels in this tile (the remainder is zero padding)
+        width: Tile width in pixels
+        height: Tile height in pixels
+    """
+
+    file: str
+    offset: int
+    count: int
+    width: int
+    height: int
+
+
+def texture_tiles(
+    base_name: str, extension: str, num_pixels: int, max_size: int = DEFAULT_MAX_TEXTURE_SIZE, align: int = 1
+) -> list[TextureTile]:
+    """Compute near-square tiles for storing `num_pixels` pixels.
+
+    Pixels are laid out row-major. A single tile is used while the near-square side fits within
+    `max_size`; larger textures are split into pages of `max_size` x `max_size` pixels (the last
+    page only as tall as needed).
+
+    Args:
+        base_name: File name without extension, e.g. ``layout_default_XYZ``
+        extension: File extension without dot, e.g. ``bmp``
+        num_pixels: Number of pixels to store
+        max_size: Maximum texture width and height
+        align: Texture width is rounded up to a multiple of this (e.g. 2 keeps link pixel pairs on one row)
+
+    Returns:
+        list[TextureTile]: Tiles in pixel order. Single-tile textures keep the plain file name,
+        multi-tile textures get an ``_<index>`` suffix.
+    """
+    max_width = max(align, max_size - max_size % align)
+    side = max(1, math.ceil(math.sqrt(num_pixels)))
+    width = min(-(-side // align) * align, max_width)
+    total_rows = max(1, -(-num_pixels // width))
+
+    row_ranges = [(row, min(max_size, total_rows - row)) for row in range(0, total_rows, max_size)]
+    tiles = []
+    for index, (start_row, rows) in enumerate(row_ranges):
+        offset = start_row * width
+        suffix = f"_{index}" if len(row_ranges) > 1 else ""
+        tiles.append(
+            TextureTile(
+                file=f"{base_name}{suffix}.{extension}",
+                offset=offset,
+                count=max(0, min(rows * width, num_pixels - offset)),
+                width=width,
+                height=rows,
+            )
+        )
+    return tiles
 
-def create_textures_from_project(
-    project_name: str, layouts_data: dict, links_data: dict | None, output_dir: str = "static/projects/"
-) -> None:
-    """Create RGB textures from a Project instance and save them to a specified directory."""
+
+def describe_project_textures(
+    layouts_data: dict, num_links: int, max_size: int = DEFAULT_MAX_TEXTURE_SIZE
+) -> dict[str, list[TextureTile]]:
+    """Describe all textures written for a project without creating any files.
+
+    Returns:
+        dict: Mapping of texture name (e.g. ``layout_default_XYZ``, ``links_RGB``) to its tiles
+    """
+    textures: dict[str, list[TextureTile]] = {}
+    for layout_name, layout_data in layouts_data.items():
+        textures.update(layout_textures(layout_name, len(layout_data.positions), max_size))
+    if num_links:
+        textures.update(link_textures(num_links, max_size))
+    return textures
+
+
+def layout_textures(layout_name: str, num_nodes: int, max_size: int) -> dict[str, list[TextureTile]]:
+    """Tiles of the position (``XYZ``, ``XYZl``) and color (``RGB``) textures of a layout."""
+    return {
+        f"layout_{layout_name}_{kind}": texture_tiles(f"layout_{layout_name}_{kind}", ext, num_nodes, max_size)
+        for kind, ext in (("XYZ", "bmp"), ("XYZl", "bmp"), ("RGB", "png"))
+    }
+
+
+def link_textures(num_links: int, max_size: int, name: str = "links") -> dict[str, list[TextureTile]]:
+    """Tiles of the endpoint (``XYZ``) and color (``RGB``) textures of a link set."""
+    return {
+        f"{name}_XYZ": texture_tiles(f"{name}_XYZ", "bmp", num_links * 2, max_size, align=2),
+        f"{name}_RGB": texture_tiles(f"{name}_RGB", "png", num_links, max_size),
+    }
+
+
+def _save_tiles(pixels: np.ndarray, tiles: list[TextureTile], output_dir: str) -> None:
+    """Write `pixels` (P, channels) as zero-padded uint8 images, one per tile."""
+    channels = pixels.shape[1]
+    for tile in tiles:
+        data = np.zeros((tile.width * tile.height, channels), dtype=np.uint8)
+        data[: tile.count] = pixels[tile.offset : tile.offset + tile.count]
+
+        path = os.path.join(output_dir, tile.file)
+        if os.path.exists(path):
+            logger.warning(f"Overwriting existing file: {path}")
+        Image.fromarray(data.reshape((tile.height, tile.width, channels))).save(path)
+
+
+def project_texture_dir(output_dir: str, project_name: str) -> str:
+    """Create (if needed) and return the texture directory of a project."""
     project_output_dir = os.path.join(output_dir, project_name, "textures")
     os.makedirs(project_output_dir, exist_ok=True)
     logger.debug(f"Created directory {project_output_dir} for project textures.")
+    return project_output_dir
+
+
+def create_textures_from_project(
+    project_name: str,
+    layouts_data: dict,
+    links_data: dict | None,
+    output_dir: str = "static/projects/",
+    max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE,
+) -> dict[str, list[TextureTile]]:
+    """Create RGB textures from a Project instance and save them to a specified directory.
+
+    Returns:
+        dict: Mapping of texture name to the tiles written for it
+    """
+    project_output_dir = project_texture_dir(output_dir, project_name)
+
+    textures: dict[str, list[TextureTile]] = {}
 
     # Iterate over each layout in the project
     for layout_name, layout_data in layouts_data.items():
-        make_layout_tex(
-            project_name,
-            layout_name,
-            layout_data.node_ids,
-            layout_data.positions,
-            layout_data.colors,
-            project_output_dir,
+        textures.update(
+            make_layout_tex(
+                project_name,
+                layout_name,
+                layout_data.node_ids,
+                layout_data.positions,
+                layout_data.colors,
+                project_output_dir,
+                max_texture_size,
+            )
         )
 
     # Create link textures
     if links_data:
-        make_link_tex(
-            project_name,
-            links_data["start_ids"],
-            links_data["end_ids"],
-            links_data["colors"],
-            project_output_dir,
+        textures.update(
+            make_link_tex(
+                project_name,
+                links_data["start_ids"],
+                links_data["end_ids"],
+                links_data["colors"],
+                project_output_dir,
+                max_texture_size,
+            )
         )
 
+    return textures
+
 
 def make_layout_tex(
     project_name: str,
@@ -45,72 +180,43 @@ def make_layout_tex(
     node_positions: np.ndarray,
     node_colors: np.ndarray,
     output_dir: str,
-) -> None:
-    width = 128
-    height = (len(node_positions) + width - 1) // width
-    size = width * height
-
-    padded_high = np.zeros((size, 3), dtype=np.uint8)
-    padded_low = np.zeros((size, 3), dtype=np.uint8)
-    padded_color = np.zeros((size, 4), dtype=np.uint8)
+    max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE,
+) -> dict[str, list[TextureTile]]:
+    textures = layout_textures(layout_name, len(node_positions), max_texture_size)
 
     pos = (node_positions * 65280).astype(int)
-    padded_high[: len(node_positions)] = pos // 255
-    padded_low[: len(node_positions)] = pos % 255
-    padded_color[: len(node_positions)] = node_colors
-
-    img_high = Image.fromarray(padded_high.reshape((height, width, 3)), "RGB")
-    img_low = Image.fromarray(padded_low.reshape((height, width, 3)), "RGB")
-    img_color = Image.fromarray(padded_color.reshape((height, width, 4)), "RGBA")
-
-    img_high_path = f"{output_dir}/layout_{layout_name}_XYZ.bmp"
-    img_low_path = f"{output_dir}/layout_{layout_name}_XYZl.bmp"
-    img_color_path = f"{output_dir}/layout_{layout_name}_RGB.png"
-
-    for path in [img_high_path, img_low_path, img_color_path]:
-        if os.path.exists(path):
-            logger.warning(f"Overwriting existing file: {path}")
-
-    img_high.save(img_high_path)
-    img_low.save(img_low_path)
-    img_color.save(img_color_path)
+    _save_tiles((pos // 255).astype(np.uint8), textures[f"layout_{layout_name}_XYZ"], output_dir)
+    _save_tiles((pos % 255).astype(np.uint8), textures[f"layout_{layout_name}_XYZl"], output_dir)
+    _save_tiles(np.asarray(node_colors, dtype=np.uint8), textures[f"layout_{layout_name}_RGB"], output_dir)
 
     logger.debug(f"Saved layout textures for {layout_name} in {output_dir}.")
+    return textures
 
 
 def make_link_tex(
-    project_name: str, start_ids: np.ndarray, end_ids: np.ndarray, link_colors: np.ndarray, output_dir: str
-) -> None:
+    project_name: str,
+    start_ids: np.ndarray,
+    end_ids: np.ndarray,
+    link_colors: np.ndarray,
+    output_dir: str,
+    max_texture_size: int = DEFAULT_MAX_TEXTURE_SIZE,
+    name: str = "links",
+) -> dict[str, list[TextureTile]]:
     num_links = len(start_ids)
-    width = 1024
-    height = (num_links * 2 + width - 1) // width
-    size = width * height
-
-    padded_link_data = np.zeros((size, 3), dtype=np.uint8)
-    padded_color_data = np.zeros((size, 4), dtype=np.uint8)
-
-    start_bytes = np.stack([start_ids % 256, (start_ids // 256) % 256, start_ids // (256 * 256)], axis=1)
-
-    end_bytes = np.stack([end_ids % 256, (end_ids // 256) % 256, end_ids // (256 * 256)], axis=1)
+    textures = link_textures(num_links, max_texture_size, name)
 
+    # IDs are stored as their three low bytes, little endian
     all_bytes = np.empty((num_links * 2, 3), dtype=np.uint8)
-    all_bytes[::2] = start_bytes
-    all_bytes[1::2] = end_bytes
+    all_bytes[::2] = _id_bytes(start_ids)
+    all_bytes[1::2] = _id_bytes(end_ids)
 
-    padded_link_data[: len(all_bytes)] = all_bytes
-    padded_color_data[: len(link_colors)] = link_colors
+    _save_tiles(all_bytes, textures[f"{name}_XYZ"], output_dir)
+    _save_tiles(np.asarray(link_colors, dtype=np.uint8), textures[f"{name}_RGB"], output_dir)
 
-    img_links = Image.fromarray(padded_link_data.reshape((height, width, 3)), "RGB")
-    img_colors = Image.fromarray(padded_color_data.reshape((height, width, 4)), "RGBA")
-
-    img_links_path = f"{output_dir}/links_XYZ.bmp"
-    img_colors_path = f"{output_dir}/links_RGB.png"
-
-    for path in [img_links_path, img_colors_path]:
-        if os.path.exists(path):
-            logger.warning(f"Overwriting existing file: {path}")
+    logger.debug(f"Saved {name} textures in {output_dir}.")
+    return textures
 
-    img_links.save(img_links_path)
-    img_colors.save(img_colors_path)
 
-    logger.debug(f"Saved link textures in {output_dir}.")
+def _id_bytes(ids: np.ndarray) -> np.ndarray:
+    """View the three low bytes of each ID (little endian) as an (M, 3) uint8 array."""
+    return np.asarray(ids).astype("<u4").view(np.uint8).reshape(-1, 4)[:, :3]
@@ -0,0 +1,285 @@
+"""Message brokers connecting several server workers.
+
+In multi-worker mode every worker process holds its own connections in its own `clients` dict.
+Messages a worker cannot deliver to its own sockets alone (``"all"``, ``"others"``, rooms and
+clients connected to another worker) are published to a broker, which forwards them to all other
+workers; each worker then delivers them to its local recipients.
+
+Brokers:
+
+- `LocalBroker`: workers in the same process (e.g. several apps, or tests)
+- `UnixSocketBroker`: worker processes on one machine, connected through a `UnixSocketHub`
+  listening on a Unix socket; the ``datadivr start-server --workers N`` command runs the hub in a
+  process of its own, so it outlives any single worker
+
+Messages are exchanged as binary message frames (see `datadivr.transport.codec`), so NumPy
+payloads survive the hop. A broker is chosen with `broker_from_url`, e.g. from the
+``DATADIVR_BROKER`` environment variable: ``local`` or ``unix:/path/to/broker.sock``.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import struct
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, ClassVar
+
+from datadivr.exceptions import BrokerHubError, UnknownBrokerError, UnsupportedPayloadTypeError
+from datadivr.transport.codec import decode_message, encode_message
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+BROKER_ENV = "DATADIVR_BROKER"
+"""Environment variable selecting the broker of a worker, see `broker_from_url`."""
+
+RECONNECT_DELAY = 1.0
+"""Seconds between attempts of a `UnixSocketBroker` to reach its hub."""
+
+MessageCallback = Callable[[dict[str, Any]], Awaitable[None]]
+"""Coroutine receiving the message dicts published by other workers."""
+
+_LENGTH = struct.Struct("<I")
+
+
+class Broker(ABC):
+    """Connects a worker to the other workers.
+
+    Attributes:
+        worker_id: Unique ID of this worker
+    """
+
+    def __init__(self) -> None:
+        self.worker_id = uuid.uuid4().hex
+        self._on_message: MessageCallback | None = None
+
+    async def start(self, on_message: MessageCallback) -> None:
+        """Connect to the other workers; `on_message` receives the messages they publish."""
+        self._on_message = on_message
+
+    @abstractmethod
+    async def publish(self, message: dict[str, Any]) -> None:
+        """Send a message dict (``WebSocketMessage.model_dump()``) to all other workers."""
+
+    async def stop(self) -> None:
+        """Disconnect from the other workers."""
+        self._on_message = None
+
+    async def _deliver(self, message: dict[str, Any]) -> None:
+        if self._on_message is None:
+            return
+        try:
+            await self._on_message(message)
+        except Exception as e:
+            logger.exception("broker_delivery_error", error=str(e), worker_id=self.worker_id)
+
+
+class LocalBroker(Broker):
+    """Broker between workers running in the same process.
+
+    Args:
+        channel: Workers on the same channel exchange messages
+    """
+
+    _channels: ClassVar[dict[str, set["LocalBroker"]]] = {}
+
+    def __init__(self, channel: str = "default"):
+        super().__init__()
+        self.channel = channel
+
+    async def start(self, on_message: MessageCallback) -> None:
+        await super().start(on_message)
+        self._channels.setdefault(self.channel, set()).add(self)
+
+    async def publish(self, message: dict[str, Any]) -> None:
+        for worker in list(self._channels.get(self.channel, ())):
+            if worker is not self:
+                await worker._deliver(message)
+
+    async def stop(self) -> None:
+        self._channels.get(self.channel, set()).discard(self)
+        await super().stop()
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def _frame(data: bytes) -> bytes:
+    return _LENGTH.pack(len(data)) + data
+
+
+class UnixSocketHub:
+    """Forwards the frames of every connected worker to all other workers.
+
+    Args:
+        path: Path of the Unix socket to listen on
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        """Listen on the socket, replacing a stale socket file."""
+        self.path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle_worker, path=str(self.path))
+        logger.info("broker_hub_started", path=str(self.path))
+
+    async def stop(self) -> None:
+        """Close the socket and all worker connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+        self.path.unlink(missing_ok=True)
+
+    async def serve_forever(self, started: Callable[[], Any] | None = None) -> None:
+        """Listen on the socket until cancelled, calling `started` once listening."""
+        await self.start()
+        if started is not None:
+            started()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    def run_in_thread(self) -> threading.Thread:
+        """Run the hub on its own event loop in a daemon thread; it ends with the calling process."""
+        started = threading.Event()
+        thread = threading.Thread(
+            target=asyncio.run, args=(self.serve_forever(started.set),), name="datadivr_broker_hub", daemon=True
+        )
+        thread.start()
+        started.wait()
+        return thread
+
+    def run_in_process(self) -> BaseProcess:
+        """Run the hub in a separate daemon process, independent of the worker processes.
+
+        The hub keeps forwarding while workers exit or restart; it is terminated when the calling
+        process (e.g. the uvicorn supervisor) exits, or with `terminate()` on the returned process.
+
+        Raises:
+            BrokerHubError: If the hub process exits before it listens on the socket
+        """
+        context = multiprocessing.get_context("spawn")
+        started = context.Event()
+        process = context.Process(
+            target=_run_hub, args=(str(self.path), started), name="datadivr_broker_hub", daemon=True
+        )
+        process.start()
+        while not started.wait(0.1):
+            if not process.is_alive():
+                raise BrokerHubError(str(self.path))
+        return process
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                frame = _frame(await _read_frame(reader))
+                for other in list(self._writers):
+                    if other is not writer:
+                        other.write(frame)
+                await asyncio.gather(
+                    *(other.drain() for other in list(self._writers) if other is not writer), return_exceptions=True
+                )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+def _run_hub(path: str, started: Any) -> None:
+    """Entry point of the hub process started by `UnixSocketHub.run_in_process`."""
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(UnixSocketHub(path).serve_forever(started.set))
+
+
+class UnixSocketBroker(Broker):
+    """Broker between worker processes connected to a `UnixSocketHub`.
+
+    The broker reconnects when it loses the hub; messages published while it is disconnected are
+    dropped.
+
+    Args:
+        path: Path of the hub's Unix socket
+    """
+
+    def __init__(self, path: str | Path):
+        super().__init__()
+        self.path = Path(path)
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._connected = asyncio.Event()
+
+    async def start(self, on_message: MessageCallback) -> None:
+        await super().start(on_message)
+        self._reader_task = asyncio.create_task(self._run(), name=f"broker_{self.worker_id}")
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._connected.wait(), RECONNECT_DELAY)
+
+    async def publish(self, message: dict[str, Any]) -> None:
+        if self._writer is None:
+            logger.warning("broker_not_connected", worker_id=self.worker_id, event_name=message.get("event_name"))
+            return
+        try:
+            self._writer.write(_frame(encode_message(message)))
+            await self._writer.drain()
+        except (ConnectionError, UnsupportedPayloadTypeError) as e:
+            logger.warning("broker_publish_error", error=str(e), worker_id=self.worker_id)
+
+    async def stop(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader_task
+            self._reader_task = None
+        await super().stop()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(str(self.path))
+            except OSError as e:
+                logger.warning("broker_connect_error", error=str(e), path=str(self.path))
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            self._writer = writer
+            logger.info("broker_connected", worker_id=self.worker_id, path=str(self.path))
+            self._connected.set()
+            try:
+                while True:
+                    await self._deliver(decode_message(await _read_frame(reader)))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("broker_disconnected", worker_id=self.worker_id)
+            finally:
+                self._connected.clear()
+                self._writer = None
+                writer.close()
+
+
+def broker_from_url(url: str) -> Broker:
+    """Create a broker from a URL: ``local``, ``local:<channel>`` or ``unix:<socket path>``.
+
+    Raises:
+        UnknownBrokerError: If the URL names no known broker
+    """
+    scheme, _, location = url.partition(":")
+    if scheme == "local":
+        return LocalBroker(location or "default")
+    if scheme == "unix" and location:
+        return UnixSocketBroker(location.removeprefix("//"))
+    raise UnknownBrokerError(url)
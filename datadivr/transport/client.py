@@ -19,18 +19,70 @@ Example:
     ```
 """
 
+import asyncio
 import json
+import random
+import uuid
+from collections import deque
+from dataclasses import dataclass
 from typing import Any
+from urllib.parse import urlencode
 
+import numpy as np
 import websockets
 from websockets import WebSocketClientProtocol
 
-from datadivr.exceptions import NotConnectedError
+from datadivr.exceptions import (
+    InvalidStreamFrameError,
+    NotConnectedError,
+    RequestFailedError,
+    RequestTimeoutError,
+    UnknownStreamError,
+)
 from datadivr.handlers.registry import HandlerType, get_handlers
-from datadivr.transport.messages import send_message
+from datadivr.transport.codec import Encoding, decode_message, is_message_frame
+from datadivr.transport.messages import SESSION_EVENT, send_batch, send_message
 from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.streaming import STREAM_EVENTS, StreamAssembler
 from datadivr.utils.logging import get_logger
 
+DEFAULT_REQUEST_TIMEOUT = 30.0
+"""Seconds `WebSocketClient.request` waits for a response by default."""
+
+DEFAULT_MAX_BATCH_SIZE = 100
+"""Number of messages after which an automatically batching client sends its batch right away."""
+
+
+@dataclass
+class ReconnectPolicy:
+    """How a `WebSocketClient` reconnects after losing its connection.
+
+    The n-th attempt waits ``initial_delay * multiplier ** n`` seconds, at most `max_delay`, of
+    which a random fraction up to `jitter` is left out, so that many clients losing the same
+    server do not all reconnect at once.
+
+    Attributes:
+        initial_delay: Seconds before the first attempt
+        max_delay: Longest wait between attempts
+        multiplier: Factor the wait grows by with every failed attempt
+        jitter: Fraction of each wait that is randomized, between 0 and 1
+        max_attempts: Attempts before giving up, None to try forever
+        buffer_size: Number of messages sent while offline that are kept and sent once
+            reconnected; beyond that, the oldest are dropped
+    """
+
+    initial_delay: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    max_attempts: int | None = None
+    buffer_size: int = 1000
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before an attempt, counted from 0."""
+        delay = min(self.max_delay, self.initial_delay * self.multiplier**attempt)
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
 
 class WebSocketClient:
     """A WebSocket client for communicating with a datadivr server.
@@ -40,6 +92,13 @@ class WebSocketClient:
 
     Attributes:
         uri: The WebSocket server URI to connect to
+        encoding: Wire encoding of messages, ``json`` or ``binary`` (see `datadivr.transport.codec`)
+        batch_interval: Seconds sent messages are collected into one batch frame, None to send
+            every message right away
+        max_batch_size: Number of collected messages that are sent without waiting any longer
+        reconnect: How to reconnect after losing the connection, None to stay disconnected
+        client_id: The client's ID on the server, known with a session
+        session_token: Token resuming the client's session on the server
         handlers: Dictionary of registered event handlers
         websocket: The active WebSocket connection (if connected)
 
@@ -51,21 +110,49 @@ class WebSocketClient:
         ```
     """
 
-    def __init__(self, uri: str):
+    def __init__(
+        self,
+        uri: str,
+        encoding: Encoding = "json",
+        batch_interval: float | None = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        reconnect: ReconnectPolicy | None = None,
+    ):
         """Initialize the WebSocket client.
 
         Args:
             uri: The WebSocket server URI to connect to
+            encoding: Wire encoding of messages, requested from the server when connecting
+            batch_interval: Collect the messages sent within this many seconds after a first one
+                and send them as one batch frame (Nagle-style), None to send messages right away
+            max_batch_size: Send a collected batch once it holds this many messages
+            reconnect: Reconnect with this policy after losing the connection. The client then
+                has a session on the server: after reconnecting, it gets its client ID, state and
+                rooms back, and messages sent while offline are sent once reconnected.
         """
         self.uri = uri
+        self.encoding = encoding
+        self.batch_interval = batch_interval
+        self.max_batch_size = max(1, max_batch_size)
+        self.reconnect = reconnect
+        self.client_id: str | None = None
+        self.session_token: str | None = None
+        self._batch: list[WebSocketMessage] = []
+        self._flush_task: asyncio.Task[None] | None = None
+        self._offline: deque[WebSocketMessage] = deque(maxlen=reconnect.buffer_size if reconnect else None)
+        self._reconnecting = False
+        self._closing = False
         self.handlers = get_handlers(HandlerType.CLIENT)
         self.websocket: WebSocketClientProtocol | None = None
+        self.streams = StreamAssembler()
+        self.pending_requests: dict[str, asyncio.Future[WebSocketMessage]] = {}
         self.logger = get_logger(__name__)
 
     async def connect(self) -> None:
         """Connect to the WebSocket server and send initial handler information."""
+        self._closing = False
         try:
-            self.websocket = await websockets.connect(self.uri)
+            self.websocket = await websockets.connect(self._connection_uri())
             # await self.send_handler_names()
         except ConnectionRefusedError as e:
             self.logger.exception("connection_refused", error=str(e))
@@ -75,21 +162,117 @@ class WebSocketClient:
             raise
 
     async def receive_messages(self) -> None:
-        """Listen for incoming messages from the server."""
+        """Listen for incoming messages from the server.
+
+        With a reconnect policy, lost connections are reestablished; this returns once the client
+        disconnects or gives up reconnecting.
+        """
         if not self.websocket:
             raise NotConnectedError()
 
         try:
-            async for message in self.websocket:
-                self.logger.info("raw_message_received", raw_message=message)
-                event_data = json.loads(message)
-                self.logger.info("message_received", event_data=event_data)
-                await self.handle_event(event_data, self.websocket)
-        except websockets.exceptions.ConnectionClosed:
-            self.logger.info("connection_closed")
+            while self.websocket is not None:
+                try:
+                    await self._receive(self.websocket)
+                except websockets.exceptions.ConnectionClosed:
+                    self.logger.info("connection_closed")
+                # the server cancels the streams of a closed connection
+                self.streams.fail_all(NotConnectedError())
+                if self.reconnect is None or self._closing or not await self._reconnect():
+                    break
         finally:
             await self.disconnect()
 
+    async def _receive(self, websocket: WebSocketClientProtocol) -> None:
+        async for message in websocket:
+            if isinstance(message, bytes) and not is_message_frame(message):
+                try:
+                    ack = self.streams.feed(message)
+                except (InvalidStreamFrameError, UnknownStreamError) as e:
+                    self.logger.warning("stream_frame_dropped", error=str(e))
+                    continue
+                await send_message(websocket, ack, self.encoding)
+                continue
+            self.logger.info("raw_message_received", raw_message=message)
+            event_data = decode_message(message) if isinstance(message, bytes) else json.loads(message)
+            self.logger.info("message_received", event_data=event_data)
+            if event_data.get("event_name") in STREAM_EVENTS:
+                self.streams.handle_message(WebSocketMessage.model_validate(event_data))
+                continue
+            if self.resolve_request(event_data):
+                continue
+            if event_data.get("event_name") == SESSION_EVENT:
+                self._start_session(event_data.get("payload") or {})
+            await self.handle_event(event_data, websocket)
+
+    def _start_session(self, session: dict[str, Any]) -> None:
+        self.client_id = session.get("client_id")
+        self.session_token = session.get("token")
+        self.logger.info("session_started", client_id=self.client_id, resumed=session.get("resumed"))
+
+    async def _reconnect(self) -> bool:
+        """Reconnect with backoff and send the messages buffered meanwhile; returns whether it succeeded."""
+        policy = self.reconnect or ReconnectPolicy()
+        self.websocket = None
+        self._reconnecting = True
+        try:
+            attempt = 0
+            while policy.max_attempts is None or attempt < policy.max_attempts:
+                await asyncio.sleep(policy.delay(attempt))
+                attempt += 1
+                if self._closing:
+                    return False
+                try:
+                    self.websocket = await websockets.connect(self._connection_uri())
+                except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:  # noqa: UP041
+                    self.logger.warning("reconnect_failed", attempt=attempt, error=str(e))
+                    continue
+                self.logger.info("reconnected", attempt=attempt)
+                try:
+                    await self._send_offline()
+                except websockets.exceptions.ConnectionClosed as e:
+                    self.logger.warning("reconnect_failed", attempt=attempt, error=str(e))
+                    self.websocket = None
+                    continue
+                return True
+            self.logger.warning("reconnect_gave_up", attempts=attempt)
+            return False
+        finally:
+            self._reconnecting = False
+
+    async def _send_offline(self) -> None:
+        """Send the messages buffered while offline, in order, as batches.
+
+        Messages stay buffered until they were sent, so they are sent again after the next
+        reconnect if the connection drops meanwhile.
+
+        Raises:
+            ConnectionClosed: If the connection is closed while sending
+        """
+        while self._offline and self.websocket is not None:
+            messages = list(self._offline)
+            if len(messages) == 1:
+                await send_message(self.websocket, messages[0], self.encoding)
+            else:
+                await send_batch(self.websocket, messages, self.encoding)
+            # messages buffered meanwhile may have pushed some of the sent ones out of the buffer
+            for message in messages:
+                if self._offline and self._offline[0] is message:
+                    self._offline.popleft()
+
+    def resolve_request(self, event_data: dict) -> bool:
+        """Complete the pending request a received message answers; returns whether there was one.
+
+        Responses to requests are not passed to the client handlers.
+        """
+        correlation_id = event_data.get("correlation_id")
+        future = self.pending_requests.pop(correlation_id, None) if correlation_id else None
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(WebSocketMessage.model_validate(event_data))
+        return True
+
     async def handle_event(self, event_data: dict, websocket: WebSocketClientProtocol) -> None:
         """Handle an incoming event using registered handlers.
 
@@ -104,10 +287,10 @@ class WebSocketClient:
             message = WebSocketMessage.model_validate(event_data)
             response = await handler(message)
             if response and isinstance(response, WebSocketMessage):
-                await send_message(websocket, response)
+                await send_message(websocket, response, self.encoding)
         else:
             self.logger.debug(
-                "no_handler_for_event", event_name=event_name, event_data=json.dumps(event_data, indent=2)
+                "no_handler_for_event", event_name=event_name, event_data=json.dumps(event_data, indent=2, default=str)
             )
 
     async def send_message(self, payload: Any, event_name: str, msg: str | None = None, to: str = "others") -> None:
@@ -122,21 +305,206 @@ class WebSocketClient:
         Raises:
             NotConnectedError: If called before connecting to the server
         """
-        if self.websocket:
-            message = WebSocketMessage(event_name=event_name, payload=payload, to=to, message=msg)
-            await send_message(self.websocket, message)
-        else:
+        message = WebSocketMessage(event_name=event_name, payload=payload, to=to, message=msg)
+        await self._send(message)
+
+    async def send_batch(self, messages: list[WebSocketMessage]) -> None:
+        """Send several messages as one frame; the server handles them in order.
+
+        Messages collected by automatic batching are sent first, to keep the order. With
+        reconnecting enabled, a batch sent while the connection drops is buffered like single
+        messages and sent after the reconnect.
+
+        Raises:
+            NotConnectedError: If called before connecting to the server
+        """
+        if self._reconnecting:
+            self._offline.extend(messages)
+            return
+        if not self.websocket:
             raise NotConnectedError()
+        await self.flush()
+        if not messages:
+            return
+        try:
+            await send_batch(self.websocket, messages, self.encoding)
+        except websockets.exceptions.ConnectionClosed:
+            if self.reconnect is None or self._closing:
+                raise
+            self._offline.extend(messages)  # sent once the receive loop reconnected
+
+    async def flush(self) -> None:
+        """Send the messages collected by automatic batching right away."""
+        batch, self._batch = self._batch, []
+        if self._reconnecting:
+            self._offline.extend(batch)
+            return
+        if not batch or not self.websocket:
+            return
+        try:
+            if len(batch) == 1:
+                await send_message(self.websocket, batch[0], self.encoding)
+            else:
+                await send_batch(self.websocket, batch, self.encoding)
+        except websockets.exceptions.ConnectionClosed:
+            if self.reconnect is None or self._closing:
+                raise
+            self._offline.extend(batch)  # sent once the receive loop reconnected
+
+    async def _send(self, message: WebSocketMessage) -> None:
+        """Send a message, collect it for the next batch, or buffer it while reconnecting."""
+        if self._reconnecting:
+            self._offline.append(message)
+            return
+        if not self.websocket:
+            raise NotConnectedError()
+        if self.batch_interval is None:
+            try:
+                await send_message(self.websocket, message, self.encoding)
+            except websockets.exceptions.ConnectionClosed:
+                if self.reconnect is None or self._closing:
+                    raise
+                self._offline.append(message)  # sent once the receive loop reconnected
+            return
+        self._batch.append(message)
+        if len(self._batch) >= self.max_batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_interval or 0)
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.exception("batch_flush_error", error=str(e))
+
+    async def request(
+        self,
+        event_name: str,
+        payload: Any = None,
+        msg: str | None = None,
+        to: str = "server",
+        timeout: float | None = DEFAULT_REQUEST_TIMEOUT,
+    ) -> WebSocketMessage:
+        """Send a message to the server and wait for the response of its handler.
+
+        The message carries a new correlation ID, which the server echoes in the response.
+        `receive_messages` must be running concurrently to receive the response; any number of
+        requests can be awaited at the same time, e.g. with `asyncio.gather`.
+
+        Args:
+            event_name: The name of the event
+            payload: The message payload
+            msg: Optional text message
+            to: The recipient of the message (default: "server")
+            timeout: Seconds to wait for the response, None to wait indefinitely
+
+        Returns:
+            WebSocketMessage: The response
+
+        Raises:
+            NotConnectedError: If called before connecting to the server, or the connection is
+                closed before the response arrived
+            RequestTimeoutError: If no response arrived within `timeout`
+            RequestFailedError: If the server responded with an error message
+
+        Example:
+            ```python
+            response = await client.request("sum_event", {"numbers": [1, 2, 3]})
+            response.payload  # 6.0
+            ```
+        """
+        if not self.websocket and not self._reconnecting:
+            raise NotConnectedError()
+
+        correlation_id = uuid.uuid4().hex
+        future: asyncio.Future[WebSocketMessage] = asyncio.get_running_loop().create_future()
+        self.pending_requests[correlation_id] = future
+        try:
+            message = WebSocketMessage(
+                event_name=event_name, payload=payload, to=to, message=msg, correlation_id=correlation_id
+            )
+            await self._send(message)
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:  # noqa: UP041  # not the builtin TimeoutError before Python 3.11
+            raise RequestTimeoutError(event_name, timeout or 0) from None
+        finally:
+            self.pending_requests.pop(correlation_id, None)
+
+        if response.event_name == "error":
+            raise RequestFailedError(event_name, response.message)
+        return response
+
+    async def request_array(
+        self,
+        array: str,
+        project: str | None = None,
+        start: int | None = None,
+        stop: int | None = None,
+        chunk_bytes: int | None = None,
+    ) -> np.ndarray:
+        """Stream a project array from the server as binary frames.
+
+        `receive_messages` must be running concurrently to receive the frames.
+
+        Args:
+            array: Array path, e.g. ``layouts/default/positions`` or ``links/start_ids``
+            project: Project name, defaults to the server's current project
+            start: First row to stream
+            stop: Row after the last row to stream
+            chunk_bytes: Target size of the binary frames
+
+        Returns:
+            np.ndarray: The requested rows
+
+        Raises:
+            NotConnectedError: If called before connecting to the server, or the connection is
+                closed before the stream completed
+            StreamProtocolError: If the server cannot stream the array
+        """
+        if not self.websocket:
+            raise NotConnectedError()
+
+        stream_id = self.streams.new_stream_id()
+        result = self.streams.expect(stream_id)
+        payload = {"stream_id": stream_id, "array": array, "project": project, "start": start, "stop": stop}
+        if chunk_bytes is not None:
+            payload["chunk_bytes"] = chunk_bytes
+        await self.send_message(payload=payload, event_name="stream_array", to="server")
+        return await result
+
+    def _connection_uri(self) -> str:
+        """The server URI with the requested wire encoding and session as query parameters."""
+        params: dict[str, str] = {}
+        if self.encoding != "json":
+            params["encoding"] = self.encoding
+        if self.reconnect is not None:
+            params["session"] = self.session_token or "new"
+        if not params:
+            return self.uri
+        separator = "&" if "?" in self.uri else "?"
+        return f"{self.uri}{separator}{urlencode(params)}"
 
     async def disconnect(self) -> None:
-        """Close the WebSocket connection."""
+        """Send collected messages and close the WebSocket connection; the client does not reconnect."""
+        self._closing = True
+        self._offline.clear()
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
         if self.websocket:
             try:
+                await self.flush()
                 await self.websocket.close()
             except Exception:
                 self.logger.exception("error_closing_connection")
             finally:
                 self.websocket = None
+        for future in self.pending_requests.values():
+            if not future.done():
+                future.set_exception(NotConnectedError())
+        self.pending_requests.clear()
+        self.streams.fail_all(NotConnectedError())
 
     async def send_handler_names(self) -> None:
         """Send a message with the names of all registered handlers.
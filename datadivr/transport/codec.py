@@ -0,0 +1,223 @@
+"""Wire encodings of WebSocket messages.
+
+JSON stays the default encoding. A connection opts into the binary encoding at handshake time
+with the query parameter ``encoding=binary`` (``ws://host:port/ws?encoding=binary``); from then
+on both sides exchange messages as binary frames. Numeric payloads, and NumPy arrays in
+particular, are much smaller and faster to decode than their JSON form.
+
+A binary message frame is ``b"DDM1"`` followed by one encoded value, the message dict, or a
+list of message dicts for a batch of messages. Values are encoded with a one-byte tag (all
+integers little endian):
+
+=====  ==========  =========================================================================
+tag    type        body
+=====  ==========  =========================================================================
+``N``  None
+``T``  True
+``F``  False
+``i``  int         i64
+``d``  float       f64
+``s``  str         u32 length, UTF-8 bytes
+``b``  bytes       u32 length, bytes
+``l``  list        u32 count, values
+``m``  dict        u32 count, key and value pairs
+``a``  ndarray     u8 dtype length, dtype string (e.g. ``<f4``), u8 ndim, u64 shape per
+                   dimension, zero padding up to a multiple of 8 from the frame start, data
+=====  ==========  =========================================================================
+
+Tuples are encoded as lists and NumPy scalars as their Python values. Decoded arrays are
+read-only views into the received frame.
+"""
+
+import struct
+from typing import Any, Literal
+
+import numpy as np
+import orjson
+
+from datadivr.exceptions import InvalidMessageFormat, UnsupportedPayloadTypeError
+
+Encoding = Literal["json", "binary"]
+"""Wire encoding of a connection."""
+
+ENCODINGS: tuple[Encoding, ...] = ("json", "binary")
+
+MESSAGE_MAGIC = b"DDM1"
+
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_U32 = struct.Struct("<I")
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+
+def is_message_frame(frame: bytes) -> bool:
+    """Whether a binary frame holds a binary-encoded message."""
+    return frame[:4] == MESSAGE_MAGIC
+
+
+def encode_json(data: dict[str, Any]) -> str:
+    """Encode a message dict as JSON text, NumPy arrays and scalars included."""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+
+
+def encode_json_batch(messages: list[dict[str, Any]]) -> str:
+    """Encode a batch of message dicts as one JSON text, a list of messages."""
+    return orjson.dumps(messages, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+
+
+def decode_frame(frame: str | bytes) -> Any:
+    """Decode a received frame: a binary message or batch frame, or JSON text (or bytes).
+
+    Batches decode to a list of message dicts.
+    """
+    if isinstance(frame, bytes) and is_message_frame(frame):
+        if frame[len(MESSAGE_MAGIC) : len(MESSAGE_MAGIC) + 1] == b"l":
+            return decode_batch(frame)
+        return decode_message(frame)
+    return orjson.loads(frame)
+
+
+def encode_message(data: dict[str, Any]) -> bytes:
+    """Encode a message dict (e.g. ``WebSocketMessage.model_dump()``) as a binary message frame."""
+    out = bytearray(MESSAGE_MAGIC)
+    _encode(data, out)
+    return bytes(out)
+
+
+def encode_batch(messages: list[dict[str, Any]]) -> bytes:
+    """Encode a batch of message dicts as one binary frame."""
+    out = bytearray(MESSAGE_MAGIC)
+    _encode(messages, out)
+    return bytes(out)
+
+
+def decode_message(frame: bytes) -> dict[str, Any]:
+    """Decode a binary message frame.
+
+    Raises:
+        InvalidMessageFormat: If the frame is not a valid binary message holding a dict
+    """
+    value = _decode_frame(frame)
+    if not isinstance(value, dict):
+        raise InvalidMessageFormat()
+    return value
+
+
+def decode_batch(frame: bytes) -> list[dict[str, Any]]:
+    """Decode a binary batch frame into its message dicts.
+
+    Raises:
+        InvalidMessageFormat: If the frame is not a valid binary frame holding a list of dicts
+    """
+    value = _decode_frame(frame)
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise InvalidMessageFormat()
+    return value
+
+
+def _decode_frame(frame: bytes) -> Any:
+    if not is_message_frame(frame):
+        raise InvalidMessageFormat()
+    try:
+        value, position = _decode(frame, len(MESSAGE_MAGIC))
+    except (struct.error, IndexError, TypeError, ValueError, RecursionError):
+        raise InvalidMessageFormat() from None
+    if position != len(frame):
+        raise InvalidMessageFormat()
+    return value
+
+
+def _encode(value: Any, out: bytearray) -> None:  # noqa: C901
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        if not _INT64_MIN <= value <= _INT64_MAX:
+            # only integers in the int64 range are supported
+            raise UnsupportedPayloadTypeError(type(value).__name__)
+        out += b"i" + _I64.pack(value)
+    elif isinstance(value, float):
+        out += b"d" + _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s" + _U32.pack(len(data)) + data
+    elif isinstance(value, bytes | bytearray | memoryview):
+        out += b"b" + _U32.pack(len(value)) + bytes(value)
+    elif isinstance(value, np.ndarray):
+        _encode_array(value, out)
+    elif isinstance(value, np.generic):
+        _encode(value.item(), out)
+    elif isinstance(value, dict):
+        out += b"m" + _U32.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, list | tuple):
+        out += b"l" + _U32.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    else:
+        raise UnsupportedPayloadTypeError(type(value).__name__)
+
+
+def _encode_array(array: np.ndarray, out: bytearray) -> None:
+    if array.dtype.hasobject:
+        _encode(array.tolist(), out)
+        return
+    dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+    dtype_str = dtype.str.encode("ascii")
+    out += b"a" + bytes((len(dtype_str),)) + dtype_str + bytes((array.ndim,))
+    out += struct.pack(f"<{array.ndim}Q", *array.shape)
+    out += b"\0" * (-len(out) % 8)
+    out += np.ascontiguousarray(array, dtype=dtype).tobytes()
+
+
+def _decode(frame: bytes, position: int) -> tuple[Any, int]:  # noqa: C901
+    tag = frame[position : position + 1]
+    position += 1
+    if tag == b"N":
+        return None, position
+    if tag == b"T":
+        return True, position
+    if tag == b"F":
+        return False, position
+    if tag == b"i":
+        return _I64.unpack_from(frame, position)[0], position + 8
+    if tag == b"d":
+        return _F64.unpack_from(frame, position)[0], position + 8
+    if tag in (b"s", b"b"):
+        (length,) = _U32.unpack_from(frame, position)
+        position += 4
+        data = frame[position : position + length]
+        if len(data) != length:
+            raise ValueError(tag)
+        return (data.decode("utf-8") if tag == b"s" else data), position + length
+    if tag in (b"l", b"m"):
+        (count,) = _U32.unpack_from(frame, position)
+        position += 4
+        items = []
+        for _ in range(count * 2 if tag == b"m" else count):
+            item, position = _decode(frame, position)
+            items.append(item)
+        if tag == b"m":
+            return dict(zip(items[::2], items[1::2], strict=True)), position
+        return items, position
+    if tag == b"a":
+        return _decode_array(frame, position)
+    raise ValueError(tag)
+
+
+def _decode_array(frame: bytes, position: int) -> tuple[np.ndarray, int]:
+    dtype_length = frame[position]
+    dtype = np.dtype(frame[position + 1 : position + 1 + dtype_length].decode("ascii"))
+    position += 1 + dtype_length
+    ndim = frame[position]
+    shape = struct.unpack_from(f"<{ndim}Q", frame, position + 1)
+    position += 1 + 8 * ndim
+    position += -position % 8
+    count = int(np.prod(shape, dtype=np.int64))
+    array = np.frombuffer(frame, dtype=dtype, count=count, offset=position).reshape(shape)
+    return array, position + array.nbytes
@@ -0,0 +1,222 @@
+"""Concurrent dispatch of received messages to their handlers.
+
+Every connection gets a `Dispatcher`. The receive loop only puts messages on it, so it keeps
+reading while handlers run. Messages are handled in lanes: a lane handles its messages one after
+the other in the order they were received, while different lanes, of the same or of different
+connections, run concurrently. Which messages share a lane is decided by the ordering:
+
+``client``
+    All messages of a connection share one lane (default).
+``event``
+    Messages of a connection share a lane per event name, so e.g. a slow query does not hold up
+    the position updates of the same client.
+
+A global limit caps the number of handlers running at once over all connections, and handlers
+that take longer than their timeout (see `datadivr.handlers.registry.websocket_handler`, or the
+default `DispatchConfig.handler_timeout`) are cancelled. Messages of coalescing events replace a
+pending message of the same event in their lane, so only the newest update is handled. The lane
+task only runs while the lane holds messages, idle connections cost no task.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Literal, cast
+
+from datadivr.exceptions import UnknownOrderingError
+from datadivr.handlers.registry import get_handler_timeout
+from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.queues import CoalescingQueue
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+Ordering = Literal["client", "event"]
+"""Which messages of a connection are handled in order, see the module documentation."""
+
+ORDERINGS: tuple[Ordering, ...] = ("client", "event")
+
+DEFAULT_MAX_CONCURRENCY = 256
+"""Default number of handlers running at once over all connections."""
+
+DEFAULT_LANE_SIZE = 256
+"""Default number of messages a lane buffers before the receive loop waits for room."""
+
+MessageHandler = Callable[[WebSocketMessage], Awaitable[None]]
+"""Coroutine handling a received message, including sending its response."""
+
+TimeoutHandler = Callable[[WebSocketMessage, float], Awaitable[None]]
+"""Coroutine called with a message whose handler timed out and the timeout in seconds."""
+
+
+@dataclass
+class DispatchConfig:
+    """Settings of the message dispatch.
+
+    Attributes:
+        max_concurrency: Number of handlers running at once over all connections, 0 for no limit
+        handler_timeout: Seconds after which a handler without a timeout of its own is
+            cancelled, None for no timeout
+        ordering: Which messages of a connection are handled in order
+    """
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    handler_timeout: float | None = None
+    ordering: Ordering = "client"
+    _limiter: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+
+    @property
+    def limiter(self) -> asyncio.Semaphore | None:
+        """Semaphore enforcing `max_concurrency`, None without a limit."""
+        if self._limiter is None and self.max_concurrency > 0:
+            self._limiter = asyncio.Semaphore(self.max_concurrency)
+        return self._limiter
+
+
+dispatch_config = DispatchConfig()
+
+
+def configure_dispatch(
+    max_concurrency: int | None = None, handler_timeout: float | None = None, ordering: str | None = None
+) -> DispatchConfig:
+    """Change the dispatch settings; orderings apply to connections opened from now on.
+
+    Args:
+        max_concurrency: Number of handlers running at once, 0 for no limit
+        handler_timeout: Default handler timeout in seconds, 0 for no timeout
+        ordering: ``client`` or ``event``
+
+    Raises:
+        UnknownOrderingError: If `ordering` is not one of `ORDERINGS`
+    """
+    if max_concurrency is not None:
+        dispatch_config.max_concurrency = max(0, max_concurrency)
+        dispatch_config._limiter = None
+    if handler_timeout is not None:
+        dispatch_config.handler_timeout = handler_timeout if handler_timeout > 0 else None
+    if ordering is not None:
+        if ordering not in ORDERINGS:
+            raise UnknownOrderingError(ordering, ORDERINGS)
+        dispatch_config.ordering = cast(Ordering, ordering)
+    return dispatch_config
+
+
+def handler_timeout(event_name: str) -> float | None:
+    """Timeout of the handler of an event: its own, or the configured default."""
+    timeout = get_handler_timeout(event_name)
+    return timeout if timeout is not None else dispatch_config.handler_timeout
+
+
+@dataclass
+class _Lane:
+    messages: CoalescingQueue
+    task: asyncio.Task[None] | None = None
+
+
+class Dispatcher:
+    """Handles the messages received on one connection.
+
+    Args:
+        client_id: ID of the connection's client, used in logs and task names
+        handle: Coroutine handling a message
+        on_timeout: Coroutine called when a handler timed out, e.g. to notify the sender
+        ordering: Which messages are handled in order, the configured ordering by default
+        lane_size: Number of messages a lane buffers; `put` waits while the lane is full
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        handle: MessageHandler,
+        on_timeout: TimeoutHandler | None = None,
+        ordering: Ordering | None = None,
+        lane_size: int = DEFAULT_LANE_SIZE,
+    ):
+        self.client_id = client_id
+        self.handle = handle
+        self.on_timeout = on_timeout
+        self.ordering = ordering or dispatch_config.ordering
+        self.lane_size = max(1, lane_size)
+        self.closed = False
+        self.handled = 0
+        self.timed_out = 0
+        self.failed = 0
+        self._lanes: dict[Hashable, _Lane] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting to be handled."""
+        return sum(len(lane.messages) for lane in self._lanes.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Dispatch metrics for monitoring."""
+        return {
+            "pending": self.pending,
+            "lanes": len(self._lanes),
+            "ordering": self.ordering,
+            "handled": self.handled,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+        }
+
+    async def put(self, message: WebSocketMessage, coalesce: bool = False) -> None:
+        """Queue a message on its lane, waiting while the lane is full.
+
+        Args:
+            message: The received message
+            coalesce: Replace a pending message of the same event instead of queueing a new one
+        """
+        if self.closed:
+            return
+        key = message.event_name if self.ordering == "event" else None
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane(CoalescingQueue(self.lane_size))
+        await lane.messages.put(message, message.event_name, coalesce)
+        if self.closed:
+            lane.messages.clear()
+            return
+        if lane.task is None or lane.task.done():
+            lane.task = asyncio.create_task(self._drain(lane), name=f"dispatch_{self.client_id}")
+
+    async def join(self) -> None:
+        """Wait until all queued messages were handled."""
+        while tasks := [lane.task for lane in self._lanes.values() if lane.task is not None and not lane.task.done()]:
+            await asyncio.gather(*(asyncio.shield(task) for task in tasks))
+
+    async def close(self) -> None:
+        """Discard queued messages and cancel running handlers."""
+        self.closed = True
+        tasks = []
+        for lane in self._lanes.values():
+            lane.messages.clear()
+            if lane.task is not None and lane.task is not asyncio.current_task():
+                lane.task.cancel()
+                tasks.append(lane.task)
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _drain(self, lane: _Lane) -> None:
+        while len(lane.messages):
+            await self._dispatch(lane.messages.popleft())
+
+    async def _dispatch(self, message: WebSocketMessage) -> None:
+        timeout = handler_timeout(message.event_name)
+        limiter = dispatch_config.limiter
+        try:
+            async with limiter if limiter is not None else contextlib.nullcontext():
+                await asyncio.wait_for(self.handle(message), timeout)
+            self.handled += 1
+        except asyncio.TimeoutError:  # noqa: UP041  # not the builtin TimeoutError before Python 3.11
+            self.timed_out += 1
+            logger.warning("handler_timeout", event_name=message.event_name, timeout=timeout, client_id=self.client_id)
+            if self.on_timeout is not None and timeout is not None:
+                try:
+                    await self.on_timeout(message, timeout)
+                except Exception as e:
+                    logger.exception("timeout_handling_error", error=str(e), client_id=self.client_id)
+        except Exception as e:
+            self.failed += 1
+            logger.exception("message_handling_error", error=str(e), client_id=message.from_id)
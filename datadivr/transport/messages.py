@@ -5,20 +5,32 @@ from fastapi import WebSocket
 
 from datadivr.core.tasks import BackgroundTasks
 from datadivr.exceptions import UnsupportedWebSocketTypeError
+from datadivr.transport.codec import Encoding, encode_batch, encode_json_batch, encode_message
 from datadivr.transport.models import WebSocketMessage
 from datadivr.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+SESSION_EVENT = "session"
+"""Event telling a client its session, see `datadivr.transport.server.open_session`."""
+
 
 @BackgroundTasks.task(name="send_message")
-async def send_message(websocket: Any, message: WebSocketMessage) -> None:
-    """Send a message over a WebSocket connection."""
+async def send_message(websocket: Any, message: WebSocketMessage, encoding: Encoding = "json") -> None:
+    """Send a message over a WebSocket connection in the connection's wire encoding."""
     message_data = message.model_dump(exclude={"websocket"})
     logger.debug("send_message", message=message_data)
 
+    if encoding == "binary":
+        frame = encode_message(message_data)
+        if hasattr(websocket, "send_bytes"):
+            await websocket.send_bytes(frame)
+        elif hasattr(websocket, "send"):
+            await websocket.send(frame)
+        else:
+            raise UnsupportedWebSocketTypeError()
     # Check if it's a FastAPI WebSocket
-    if hasattr(websocket, "send_json"):
+    elif hasattr(websocket, "send_json"):
         await websocket.send_json(message_data)
     # Check if it's a websockets WebSocket
     elif hasattr(websocket, "send"):
@@ -27,6 +39,27 @@ async def send_message(websocket: Any, message: WebSocketMessage) -> None:
         raise UnsupportedWebSocketTypeError()
 
 
+async def send_batch(websocket: Any, messages: list[WebSocketMessage], encoding: Encoding = "json") -> None:
+    """Send several messages as one frame, a batch that the server handles in order."""
+    batch = [message.model_dump(exclude={"websocket"}) for message in messages]
+    logger.debug("send_batch", num_messages=len(batch))
+
+    if encoding == "binary":
+        frame: str | bytes = encode_batch(batch)
+        if hasattr(websocket, "send_bytes"):
+            await websocket.send_bytes(frame)
+            return
+    else:
+        frame = encode_json_batch(batch)
+        if hasattr(websocket, "send_text"):
+            await websocket.send_text(frame)
+            return
+    if hasattr(websocket, "send"):
+        await websocket.send(frame)
+    else:
+        raise UnsupportedWebSocketTypeError()
+
+
 def create_error_message(error_msg: str, to: str, websocket: WebSocket | None = None) -> WebSocketMessage:
     """Create a standardized error message."""
     return WebSocketMessage(event_name="error", message=error_msg, to=to, websocket=websocket)
@@ -17,6 +17,8 @@ class WebSocketMessage(BaseModel):
         to: The recipient identifier (defaults to "others")
         from_id: The sender identifier (defaults to "server")
         message: Optional text message content
+        correlation_id: Optional ID of a request, echoed by the server in the responses to it
+            (see `datadivr.transport.client.WebSocketClient.request`)
         websocket: Optional WebSocket reference
 
     Example:
@@ -36,6 +38,7 @@ class WebSocketMessage(BaseModel):
     to: str = Field(default="others")
     from_id: str = Field(default="server")
     message: str | None = None
+    correlation_id: str | None = None
     websocket: WebSocket | None = Field(default=None, exclude=True)
 
     model_config = ConfigDict(
@@ -0,0 +1,208 @@
+"""Bounded per-client outbound queues.
+
+Every connected client gets an `OutboundQueue`. Broadcasts only enqueue the serialized frame; a
+writer task per client drains the queue into its socket. A stalled client therefore only fills
+its own queue instead of holding up the sender, and what happens once the queue is full is
+decided by the overflow policy:
+
+``block``
+    The sender waits until the writer made room (backpressure onto the sender).
+``drop_oldest``
+    The oldest queued frame is dropped.
+``coalesce``
+    The new frame replaces the queued frame with the same key, by default the sender and event
+    name of the message (latest value wins); without such a frame the oldest one is dropped.
+``disconnect``
+    The connection is closed and the queued frames are discarded.
+
+Independent of the policy, frames of events declared with ``coalesce=True`` (see
+`datadivr.handlers.registry.websocket_handler`) replace a queued frame of the same sender and
+event name right away. Reliable frames, such as the frames of array streams, are queued even if
+the queue is full and are never dropped; their number is bounded by the stream's credit window. The writer task only runs while the queue holds frames, idle clients cost
+no task.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any, Literal, cast
+
+from fastapi import WebSocket
+
+from datadivr.exceptions import UnknownOverflowPolicyError
+from datadivr.transport.queues import CoalescingQueue
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+OverflowPolicy = Literal["block", "drop_oldest", "coalesce", "disconnect"]
+"""What to do with a frame sent to a client whose outbound queue is full."""
+
+OVERFLOW_POLICIES: tuple[OverflowPolicy, ...] = ("block", "drop_oldest", "coalesce", "disconnect")
+
+DEFAULT_QUEUE_SIZE = 1024
+"""Default number of frames a client's outbound queue holds."""
+
+OVERFLOW_CLOSE_CODE = 1008
+"""WebSocket close code used by the ``disconnect`` policy (policy violation)."""
+
+
+@dataclass
+class QueueConfig:
+    """Settings of the outbound queues of newly connected clients."""
+
+    maxsize: int = DEFAULT_QUEUE_SIZE
+    policy: OverflowPolicy = "drop_oldest"
+
+
+queue_config = QueueConfig()
+
+
+def configure_queues(maxsize: int | None = None, policy: str | None = None) -> QueueConfig:
+    """Change the outbound queue settings used for clients connecting from now on.
+
+    Raises:
+        UnknownOverflowPolicyError: If `policy` is not one of `OVERFLOW_POLICIES`
+    """
+    if maxsize is not None:
+        queue_config.maxsize = max(1, maxsize)
+    if policy is not None:
+        queue_config.policy = validate_policy(policy)
+    return queue_config
+
+
+def validate_policy(policy: str) -> OverflowPolicy:
+    """Check that `policy` names an overflow policy."""
+    if policy not in OVERFLOW_POLICIES:
+        raise UnknownOverflowPolicyError(policy, OVERFLOW_POLICIES)
+    return cast(OverflowPolicy, policy)
+
+
+class OutboundQueue:
+    """Frames waiting to be written to one client.
+
+    Args:
+        client_id: ID of the client, used in logs
+        websocket: The client's connection
+        maxsize: Number of frames the queue holds
+        policy: Overflow policy, see the module documentation
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: OverflowPolicy = "drop_oldest",
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.policy = validate_policy(policy)
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._frames = CoalescingQueue(max(1, maxsize))
+        self._writer: asyncio.Task[None] | None = None
+
+    @property
+    def maxsize(self) -> int:
+        return self._frames.maxsize
+
+    @property
+    def depth(self) -> int:
+        """Number of queued frames."""
+        return len(self._frames)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue metrics for monitoring."""
+        return {
+            "depth": self.depth,
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed,
+        }
+
+    async def put(
+        self, frame: str | bytes, key: Hashable | None = None, coalesce: bool = False, reliable: bool = False
+    ) -> None:
+        """Queue a frame (text or binary) for the writer task.
+
+        Args:
+            frame: The serialized message
+            key: Coalescing key of the frame, used by `coalesce` and the ``coalesce`` policy
+            coalesce: Always replace a pending frame with the same key (latest value wins)
+            reliable: Queue the frame regardless of the overflow policy and never drop it
+        """
+        if self.closed:
+            return
+        if reliable:
+            self._frames.append(frame, pinned=True)
+            self._start_writer()
+            return
+        if coalesce and key is not None and self._frames.replace(key, frame):
+            self.coalesced += 1
+            return
+        if self._frames.full():
+            if self.policy == "block":
+                await self._frames.put(frame, key, coalesce)
+                if self.closed:
+                    self._frames.clear()
+                    return
+                self._start_writer()
+                return
+            if not await self._make_room(frame, key):
+                return
+        self._frames.append(frame, key)
+        self._start_writer()
+
+    async def join(self) -> None:
+        """Wait until all queued frames were written."""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def close(self) -> None:
+        """Discard queued frames and stop the writer task."""
+        self.closed = True
+        self._frames.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+
+    async def _make_room(self, frame: str | bytes, key: Hashable | None) -> bool:
+        """Apply a non-blocking overflow policy; returns whether `frame` should still be queued."""
+        if self.policy == "coalesce" and key is not None and self._frames.replace(key, frame):
+            self.coalesced += 1
+            return False
+        if self.policy == "disconnect":
+            logger.warning("outbound_queue_overflow", client_id=self.client_id, depth=self.depth)
+            self.dropped += self.depth + 1
+            await self.close()
+            with contextlib.suppress(Exception):
+                await self.websocket.close(code=OVERFLOW_CLOSE_CODE)
+            return False
+        self.dropped += 1
+        # if the queue only holds reliable frames, the new frame is dropped instead
+        return self._frames.drop_oldest()
+
+    def _start_writer(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write(), name=f"outbound_{self.client_id}")
+
+    async def _write(self) -> None:
+        while len(self._frames):
+            frame = self._frames.popleft()
+            try:
+                if isinstance(frame, bytes):
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(frame)
+                self.sent += 1
+                logger.debug("message_sent", client_id=self.client_id)
+            except Exception as e:
+                logger.exception("broadcast_error", error=str(e), client_id=self.client_id)
@@ -0,0 +1,122 @@
+"""Message queues with latest-value-wins coalescing.
+
+High-frequency state updates (positions, camera poses, ...) are only interesting in their newest
+version. A `CoalescingQueue` keeps its items in FIFO order, but an item put with a key that is
+still pending replaces the queued item in place instead of being appended. A server that falls
+behind thereby skips stale updates instead of working through all of them.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _Entry:
+    item: Any
+    key: Hashable | None
+    pinned: bool = False
+
+
+class CoalescingQueue:
+    """FIFO queue in which pending items can be replaced by newer items with the same key.
+
+    Args:
+        maxsize: Number of items the queue holds, 0 for no limit
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._entries: deque[_Entry] = deque()
+        self._keys: dict[Hashable, _Entry] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def full(self) -> bool:
+        """Whether the queue holds `maxsize` items."""
+        return 0 < self.maxsize <= len(self._entries)
+
+    def replace(self, key: Hashable, item: Any) -> bool:
+        """Replace the pending item queued under `key`; returns False if there is none."""
+        entry = self._keys.get(key)
+        if entry is None:
+            return False
+        entry.item = item
+        return True
+
+    def append(self, item: Any, key: Hashable | None = None, pinned: bool = False) -> None:
+        """Append an item regardless of `maxsize`, indexed under `key` for later replacement.
+
+        Pinned items are skipped by `drop_oldest`.
+        """
+        entry = _Entry(item, key, pinned)
+        self._entries.append(entry)
+        if key is not None:
+            self._keys[key] = entry
+        self._not_empty.set()
+        if self.full():
+            self._not_full.clear()
+
+    def popleft(self) -> Any:
+        """Remove and return the oldest item.
+
+        Raises:
+            IndexError: If the queue is empty
+        """
+        entry = self._entries.popleft()
+        if entry.key is not None and self._keys.get(entry.key) is entry:
+            del self._keys[entry.key]
+        if not self._entries:
+            self._not_empty.clear()
+        if not self.full():
+            self._not_full.set()
+        return entry.item
+
+    def drop_oldest(self) -> bool:
+        """Remove the oldest item that is not pinned; returns False if there is none."""
+        entry = next((entry for entry in self._entries if not entry.pinned), None)
+        if entry is None:
+            return False
+        self._entries.remove(entry)
+        if entry.key is not None and self._keys.get(entry.key) is entry:
+            del self._keys[entry.key]
+        if not self._entries:
+            self._not_empty.clear()
+        if not self.full():
+            self._not_full.set()
+        return True
+
+    def clear(self) -> None:
+        """Remove all items and wake up waiting producers."""
+        self._entries.clear()
+        self._keys.clear()
+        self._not_empty.clear()
+        self._not_full.set()
+
+    async def put(self, item: Any, key: Hashable | None = None, coalesce: bool = False) -> None:
+        """Queue an item, waiting for room while the queue is full.
+
+        Args:
+            item: The item
+            key: Key of the item
+            coalesce: Replace a pending item with the same key instead of queueing a new one
+        """
+        if coalesce and key is not None and self.replace(key, item):
+            return
+        while self.full():
+            await self._not_full.wait()
+            if coalesce and key is not None and self.replace(key, item):
+                return
+        self.append(item, key)
+
+    async def get(self) -> Any:
+        """Remove and return the oldest item, waiting for one if the queue is empty."""
+        while not self._entries:
+            await self._not_empty.wait()
+        return self.popleft()
@@ -12,6 +12,10 @@ Example:
     ```
 """
 
+import asyncio
+import os
+import secrets
+import time
 import uuid
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -19,16 +23,46 @@ from typing import Any
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 
+from datadivr.core.executors import shutdown_executors
 from datadivr.core.tasks import BackgroundTasks
 from datadivr.exceptions import InvalidMessageFormat
-from datadivr.handlers.registry import HandlerType, get_handlers
+from datadivr.handlers.registry import HandlerType, get_handlers, is_coalesced
+from datadivr.transport.broker import BROKER_ENV, Broker, broker_from_url
+from datadivr.transport.codec import ENCODINGS, Encoding, decode_frame, encode_json, encode_message
+from datadivr.transport.dispatch import Dispatcher
+from datadivr.transport.messages import SESSION_EVENT, create_error_message
 from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.outbound import OutboundQueue, queue_config
+from datadivr.transport.streaming import STREAM_EVENTS, cancel_streams
 from datadivr.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+ROOM_PREFIX = "room:"
+"""Prefix of the ``to`` field addressing the members of a room, e.g. ``to="room:project_a"``."""
+
+INBOUND_QUEUE_SIZE = 256
+"""Number of received messages a dispatch lane buffers before its connection stops reading from its socket."""
+
+SESSION_TTL = 300.0
+"""Seconds the session of a disconnected client can be resumed."""
+
 # Module-level state
 clients: dict[str, dict[str, Any]] = {}  # Use client_id as the key
+client_ids: dict[int, str] = {}  # Reverse index: id(websocket) -> client_id
+rooms: dict[str, set[str]] = {}  # Membership index: room -> client_ids, mirrored by clients[client_id]["rooms"]
+broker: Broker | None = None  # Connects this worker to the other workers in multi-worker mode
+sessions: dict[str, dict[str, Any]] = {}  # Resumable sessions of disconnected clients: token -> client_id, state, ...
+
+
+def set_broker(new_broker: Broker | None) -> None:
+    """Set the broker this worker shares message routing through; started with the app.
+
+    Without one, the broker named by the ``DATADIVR_BROKER`` environment variable is used, if set
+    (see `datadivr.transport.broker.broker_from_url`).
+    """
+    global broker
+    broker = new_broker
 
 
 @asynccontextmanager
@@ -39,6 +73,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     server_handlers = get_handlers(HandlerType.SERVER)
     logger.info("registered_server_handlers", handlers=list(server_handlers.keys()))
 
+    if broker is None and os.environ.get(BROKER_ENV):
+        set_broker(broker_from_url(os.environ[BROKER_ENV]))
+    if broker is not None:
+        await broker.start(deliver_published)
+        logger.info("broker_started", broker=type(broker).__name__, worker_id=broker.worker_id)
+
     await BackgroundTasks.start_all()
     try:
         yield
@@ -53,7 +93,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
                 logger.exception("client_close_error", error=str(e), client_id=client_id)
 
         await BackgroundTasks.stop_all()
+        shutdown_executors()
+        if broker is not None:
+            await broker.stop()
         clients.clear()
+        client_ids.clear()
+        rooms.clear()
+        sessions.clear()
         logger.debug("shutdown_completed")
 
 
@@ -68,44 +114,197 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
 
 @BackgroundTasks.task()
 async def handle_connection(websocket: WebSocket) -> None:
-    """Handle a WebSocket connection lifecycle."""
+    """Handle a WebSocket connection lifecycle.
+
+    The wire encoding of outbound messages is chosen with the ``encoding`` query parameter
+    (``json`` or ``binary``); inbound frames may use either encoding. An inbound frame holds a
+    message or a batch of messages (a list), which are handled in order.
+
+    A client asking for a session with the ``session`` query parameter (``new``, or the token of
+    an earlier session) gets a resumable session, see `open_session`.
+
+    Received messages are handed to a `datadivr.transport.dispatch.Dispatcher`, which runs their
+    handlers in separate tasks, so the connection keeps reading while handlers run. Messages of
+    coalescing events (see `datadivr.handlers.registry.coalesce_event`) replace a pending message
+    of the same event, so a client sending faster than its messages are handled only has its
+    newest update handled.
+    """
     await websocket.accept()
-    client_id = add_client(websocket)
+    encoding = requested_encoding(websocket)
+    token = websocket.query_params.get("session")
+    client_id = add_client(websocket, encoding) if token is None else await open_session(websocket, encoding, token)
+
+    async def respond(message: WebSocketMessage) -> None:
+        response = await handle_msg(message)
+        if response is not None:
+            await broadcast(correlate(response, message), websocket)
+
+    async def report_timeout(message: WebSocketMessage, timeout: float) -> None:
+        error = f"Handler for '{message.event_name}' timed out after {timeout:g}s"
+        await broadcast(correlate(create_error_message(error, client_id), message), websocket)
+
+    dispatcher = Dispatcher(client_id, respond, report_timeout, lane_size=INBOUND_QUEUE_SIZE)
 
     try:
         while True:
-            data = await websocket.receive_json()
-            try:
-                message = WebSocketMessage.model_validate(data)
+            data = await receive_data(websocket)
+            for item in data if isinstance(data, list) else (data,):
+                try:
+                    message = WebSocketMessage.model_validate(item)
+                except ValueError as e:
+                    logger.exception("invalid_message_format", error=str(e), client_id=client_id)
+                    raise InvalidMessageFormat() from None
                 message.from_id = client_id
-                response = await handle_msg(message)
-                if response is not None:
-                    await broadcast(response, websocket)
-            except ValueError as e:
-                logger.exception("invalid_message_format", error=str(e), client_id=client_id)
-                raise InvalidMessageFormat() from None
+                message.websocket = websocket
+                await dispatcher.put(message, coalesce=is_coalesced(message.event_name))
     except WebSocketDisconnect:
-        remove_client(client_id)
+        # handle what the client sent before disconnecting
+        await dispatcher.join()
     except Exception as e:
         logger.exception("websocket_error", error=str(e), client_id=client_id)
         raise
+    finally:
+        await dispatcher.close()
+        await remove_client(client_id)
+
+
+async def receive_data(websocket: WebSocket) -> Any:
+    """Receive and decode the next frame of a connection."""
+    event = await websocket.receive()
+    if event["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(event.get("code", 1000), event.get("reason"))
+    frame = event.get("text")
+    return decode_frame(frame if frame is not None else event.get("bytes", b""))
+
+
+def requested_encoding(websocket: WebSocket) -> Encoding:
+    """Wire encoding requested by the ``encoding`` query parameter of the handshake, JSON by default."""
+    encoding = websocket.query_params.get("encoding", "json")
+    if encoding in ENCODINGS:
+        return encoding
+    logger.warning("unknown_encoding_requested", encoding=encoding)
+    return "json"
+
+
+def add_client(websocket: WebSocket, encoding: Encoding = "json", client_id: str | None = None) -> str:
+    """Add a new client and return its client ID, a new one unless given."""
+    client_id = client_id or str(uuid.uuid4())
+    clients[client_id] = {
+        "websocket": websocket,
+        "state": {},
+        "encoding": encoding,
+        "queue": OutboundQueue(client_id, websocket, queue_config.maxsize, queue_config.policy),
+        "rooms": set(),
+        "session": None,
+    }
+    client_ids[id(websocket)] = client_id
+    logger.info("client_connected", client_id=client_id, connected_clients=len(clients), encoding=encoding)
+    return client_id
 
 
-def add_client(websocket: WebSocket) -> str:
-    """Add a new client and return its client ID."""
-    client_id = str(uuid.uuid4())
-    clients[client_id] = {"websocket": websocket, "state": {}}
-    logger.info("client_connected", client_id=client_id, connected_clients=len(clients))
+async def open_session(websocket: WebSocket, encoding: Encoding, token: str) -> str:
+    """Add a client with a resumable session and return its client ID.
+
+    If `token` belongs to the session of a client that disconnected less than `SESSION_TTL`
+    seconds ago, the client gets that client's ID, state and rooms back; otherwise it gets a new
+    session. Either way, it receives a ``session`` message with its ``client_id``, the ``token``
+    to resume the session with and whether it was ``resumed``. Sessions are kept per worker.
+    """
+    _expire_sessions()
+    session = sessions.pop(token, None)
+    if session is None or session["client_id"] in clients:
+        client_id = add_client(websocket, encoding)
+        token = secrets.token_urlsafe(24)
+        resumed = False
+    else:
+        client_id = add_client(websocket, encoding, session["client_id"])
+        clients[client_id]["state"] = session["state"]
+        for room in session["rooms"]:
+            join_room(client_id, room)
+        resumed = True
+        logger.info("session_resumed", client_id=client_id)
+    clients[client_id]["session"] = token
+
+    payload = {"client_id": client_id, "token": token, "resumed": resumed}
+    await broadcast(WebSocketMessage(event_name=SESSION_EVENT, payload=payload, to=client_id))
     return client_id
 
 
-def remove_client(client_id: str) -> None:
-    """Remove a client by its ID."""
+def _expire_sessions() -> None:
+    now = time.monotonic()
+    for token in [token for token, session in sessions.items() if session["expires"] <= now]:
+        del sessions[token]
+
+
+async def remove_client(client_id: str) -> None:
+    """Remove a client by its ID, discarding its queued messages.
+
+    The state and rooms of a client with a session are kept for `SESSION_TTL` seconds, so it can
+    resume the session.
+    """
+    cancel_streams(client_id)
     if client_id in clients:
-        del clients[client_id]
+        data = clients[client_id]
+        if data.get("session") is not None:
+            _expire_sessions()
+            sessions[data["session"]] = {
+                "client_id": client_id,
+                "state": data["state"],
+                "rooms": set(data["rooms"]),
+                "expires": time.monotonic() + SESSION_TTL,
+            }
+        _leave_all_rooms(client_id)
+        data = clients.pop(client_id)
+        client_ids.pop(id(data["websocket"]), None)
+        await data["queue"].close()
         logger.info("client_disconnected", client_id=client_id)
 
 
+def get_client_id(websocket: WebSocket) -> str | None:
+    """Client ID of a connected websocket."""
+    return client_ids.get(id(websocket))
+
+
+def join_room(client_id: str, room: str) -> None:
+    """Add a connected client to a room; messages sent to ``room:<room>`` reach its members."""
+    if client_id in clients:
+        clients[client_id]["rooms"].add(room)
+        rooms.setdefault(room, set()).add(client_id)
+        logger.debug("room_joined", client_id=client_id, room=room, members=len(rooms[room]))
+
+
+def leave_room(client_id: str, room: str) -> None:
+    """Remove a client from a room; empty rooms are dropped."""
+    if client_id in clients:
+        clients[client_id]["rooms"].discard(room)
+    members = rooms.get(room)
+    if members is not None:
+        members.discard(client_id)
+        if not members:
+            del rooms[room]
+        logger.debug("room_left", client_id=client_id, room=room)
+
+
+def get_room_members(room: str) -> set[str]:
+    """Client IDs of the members of a room."""
+    return set(rooms.get(room, ()))
+
+
+def _leave_all_rooms(client_id: str) -> None:
+    for room in list(clients[client_id].get("rooms", ())):
+        leave_room(client_id, room)
+
+
+def queue_metrics() -> dict[str, dict[str, Any]]:
+    """Outbound queue metrics (depth, drops, ...) of all clients, by client ID."""
+    return {client_id: data["queue"].stats() for client_id, data in clients.items()}
+
+
+async def flush_queues() -> None:
+    """Wait until the outbound queues of all clients are written."""
+    await asyncio.gather(*(data["queue"].join() for data in list(clients.values())))
+
+
 def update_client_state(client_id: str, **kwargs: Any) -> None:
     """Update the state information for a client."""
     if client_id in clients:
@@ -128,35 +327,80 @@ async def handle_msg(message: WebSocketMessage) -> WebSocketMessage | None:
     return message
 
 
-async def broadcast(message: WebSocketMessage, sender: WebSocket) -> None:
-    """Broadcast a message to appropriate clients."""
+def correlate(response: WebSocketMessage, request: WebSocketMessage) -> WebSocketMessage:
+    """Echo the correlation ID of a request in its response, unless the handler set one."""
+    if response.correlation_id is None:
+        response.correlation_id = request.correlation_id
+    return response
+
+
+async def broadcast(message: WebSocketMessage, sender: WebSocket | None = None) -> None:
+    """Broadcast a message to appropriate clients.
+
+    The message is serialized once per wire encoding and put on the outbound queue of every
+    target (see `datadivr.transport.outbound`), so a slow connection does not delay the others.
+    With a broker, messages not addressed to a client of this worker are also published to the
+    other workers.
+
+    Args:
+        message: The message, addressed by its ``to`` field: ``"all"``, ``"others"``, a client ID
+            or ``"room:<name>"`` for the members of a room other than the sender
+        sender: Connection the message originates from, excluded for ``to="others"``
+    """
     message_data = message.model_dump()
-    targets: list[WebSocket] = []
+    await _deliver(message, message_data, sender)
+    if broker is not None and message.to not in clients:
+        await broker.publish(message_data)
+
+
+async def deliver_published(message_data: dict[str, Any]) -> None:
+    """Deliver a message published by another worker to the clients of this worker."""
+    await _deliver(WebSocketMessage.model_validate(message_data), message_data, None)
+
+
+async def _deliver(message: WebSocketMessage, message_data: dict[str, Any], sender: WebSocket | None) -> None:
+    """Queue a message for its recipients among the clients of this worker."""
+    targets: list[tuple[str, dict[str, Any]]] = []
+    sender_id = get_client_id(sender) if sender is not None else None
 
     if message.to == "all":
-        targets = [data["websocket"] for data in clients.values()]
+        targets = list(clients.items())
     elif message.to == "others":
-        targets = [data["websocket"] for cid, data in clients.items() if data["websocket"] != sender]
-    else:
-        target_data = next((data for cid, data in clients.items() if cid == message.to), None)
-        if target_data:
-            targets = [target_data["websocket"]]
+        targets = [(cid, data) for cid, data in clients.items() if cid != sender_id]
+    elif message.to.startswith(ROOM_PREFIX):
+        members = rooms.get(message.to.removeprefix(ROOM_PREFIX), ())
+        targets = [(cid, clients[cid]) for cid in members if cid != sender_id]
+    elif (target_data := clients.get(message.to)) is not None:
+        targets = [(message.to, target_data)]
 
     logger.debug("broadcasting_message", message=message_data, num_targets=len(targets))
 
-    for websocket in targets:
-        try:
-            # Find client_id for this websocket
-            client_id = next(cid for cid, data in clients.items() if data["websocket"] == websocket)
-            await websocket.send_json(message_data)
-            logger.debug("message_sent", client_id=client_id)
-        except Exception as e:
-            # Find client_id for this websocket
-            client_id = next(cid for cid, data in clients.items() if data["websocket"] == websocket)
-            logger.exception("broadcast_error", error=str(e), client_id=client_id)
+    # each encoding is serialized once, on first use, and the frame is shared by all its targets
+    frames: dict[str, str | bytes] = {}
+    for _, data in targets:
+        encoding = data.get("encoding", "json")
+        if encoding not in frames:
+            frames[encoding] = encode_message(message_data) if encoding == "binary" else encode_json(message_data)
+
+    key = (message.from_id, message.event_name)
+    coalesce = is_coalesced(message.event_name)
+    # a dropped stream_start or stream_end would break the stream for good
+    reliable = message.event_name in STREAM_EVENTS
+    await asyncio.gather(
+        *(data["queue"].put(frames[data.get("encoding", "json")], key, coalesce, reliable) for _, data in targets)
+    )
+
+
+async def send_stream_frame(client_id: str, frame: bytes) -> None:
+    """Queue a binary array stream frame for a client of this worker; stream frames are never dropped."""
+    if (data := clients.get(client_id)) is not None:
+        await data["queue"].put(frame, reliable=True)
 
 
 async def close_client_connection(client_id: str) -> None:
     """Close a client connection."""
     if client_id in clients:
-        del clients[client_id]
+        _leave_all_rooms(client_id)
+        data = clients.pop(client_id)
+        client_ids.pop(id(data["websocket"]), None)
+        await data["queue"].close()
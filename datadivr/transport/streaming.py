@@ -0,0 +1,317 @@
+"""Binary streaming of NumPy arrays over WebSocket connections.
+
+Large arrays (layout positions, colors, link IDs, ...) are sent as a sequence of binary frames
+instead of JSON. A stream is framed by two JSON messages:
+
+1. ``stream_start`` with ``stream_id``, ``dtype``, ``shape`` and ``chunks``
+2. one binary frame per chunk of rows, see `encode_chunk`
+3. ``stream_end`` with ``stream_id`` (or ``stream_error`` with ``error``)
+
+Flow control is credit based: the sender has a window of chunks it may send before the receiver
+acknowledges them with ``stream_ack`` messages (``{"stream_id": ..., "chunks": n}``). A slow
+receiver therefore holds back its own stream without buffering the whole array in the sender or
+starving other messages on the connection.
+
+Binary frame layout (little endian)::
+
+    magic      4s   b"DDA1"
+    stream_id  u32
+    offset     u64  index of the first row in this chunk
+    rows       u32  number of rows in this chunk
+    ndim       u8
+    dtype_len  u8
+    reserved   2x
+    shape      ndim * u64  shape of the whole array
+    dtype      dtype_len bytes, NumPy dtype string such as "<f4"
+    padding    zero bytes up to a multiple of 8, so the data can be viewed as a typed array
+    data       rows * row size bytes, C order
+"""
+
+import asyncio
+import contextlib
+import struct
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from datadivr.exceptions import (
+    IncompleteStreamError,
+    InvalidStreamAckError,
+    InvalidStreamFrameError,
+    StreamAlreadyActiveError,
+    StreamFailedError,
+    UnknownStreamError,
+    UnstreamableArrayError,
+)
+from datadivr.transport.models import WebSocketMessage
+from datadivr.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+STREAM_MAGIC = b"DDA1"
+DEFAULT_CHUNK_BYTES = 256 * 1024
+"""Target size of the data part of a binary frame."""
+DEFAULT_WINDOW = 8
+"""Number of unacknowledged chunks a sender may have in flight."""
+
+STREAM_EVENTS = frozenset({"stream_start", "stream_end", "stream_error"})
+"""Control messages of the receiving side of a stream."""
+
+_HEADER = struct.Struct("<4sIQIBB2x")
+
+
+@dataclass
+class ChunkHeader:
+    """Decoded header of a binary stream frame."""
+
+    stream_id: int
+    offset: int
+    rows: int
+    shape: tuple[int, ...]
+    dtype: np.dtype
+
+
+def encode_chunk(stream_id: int, array: npt.NDArray, offset: int, rows: int) -> bytes:
+    """Encode rows ``offset:offset + rows`` of `array` as a binary stream frame."""
+    little_endian = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+    dtype = little_endian.str.encode("ascii")
+    header = _HEADER.pack(STREAM_MAGIC, stream_id, offset, rows, array.ndim, len(dtype))
+    shape = struct.pack(f"<{array.ndim}Q", *array.shape)
+    prefix = header + shape + dtype
+    padding = b"\0" * (-len(prefix) % 8)
+    data = np.ascontiguousarray(array[offset : offset + rows], dtype=little_endian).tobytes()
+    return prefix + padding + data
+
+
+def decode_chunk(frame: bytes) -> tuple[ChunkHeader, npt.NDArray]:
+    """Decode a binary stream frame into its header and the rows it carries."""
+    if len(frame) < _HEADER.size or frame[:4] != STREAM_MAGIC:
+        raise InvalidStreamFrameError()
+    _, stream_id, offset, rows, ndim, dtype_len = _HEADER.unpack_from(frame)
+    position = _HEADER.size
+    shape = struct.unpack_from(f"<{ndim}Q", frame, position)
+    position += 8 * ndim
+    dtype = np.dtype(frame[position : position + dtype_len].decode("ascii"))
+    position += dtype_len
+    position += -position % 8
+
+    data = np.frombuffer(frame, dtype=dtype, offset=position).reshape((rows, *shape[1:]))
+    return ChunkHeader(stream_id=stream_id, offset=offset, rows=rows, shape=tuple(shape), dtype=dtype), data
+
+
+def chunk_rows(array: npt.NDArray, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> int:
+    """Number of rows of `array` per chunk so that a chunk holds about `chunk_bytes` bytes."""
+    row_bytes = array.itemsize * int(np.prod(array.shape[1:], dtype=np.int64))
+    return max(1, chunk_bytes // max(row_bytes, 1))
+
+
+class ArrayStream:
+    """Sends one array as a credit-controlled sequence of binary frames.
+
+    Args:
+        stream_id: ID chosen by the receiver, unique per connection
+        array: The array to send (any non-object dtype)
+        send_bytes: Coroutine sending a binary frame
+        send_message: Coroutine sending a JSON message
+        to: Client ID of the receiver
+        chunk_bytes: Target data size per frame
+        window: Number of unacknowledged chunks in flight
+    """
+
+    def __init__(
+        self,
+        stream_id: int,
+        array: npt.NDArray,
+        send_bytes: Callable[[bytes], Awaitable[None]],
+        send_message: Callable[[WebSocketMessage], Awaitable[None]],
+        to: str = "server",
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        window: int = DEFAULT_WINDOW,
+    ):
+        if array.dtype.hasobject:
+            raise UnstreamableArrayError(str(array.dtype))
+        self.stream_id = stream_id
+        self.array = array if array.ndim else array.reshape(1)
+        self.send_bytes = send_bytes
+        self.send_message = send_message
+        self.to = to
+        self.rows_per_chunk = chunk_rows(self.array, chunk_bytes)
+        self.num_chunks = -(-len(self.array) // self.rows_per_chunk)
+        self.window = max(1, window)
+        self._sent = 0
+        self._acked = 0
+        self._credit = asyncio.Event()
+
+    def ack(self, chunks: int = 1) -> None:
+        """Grant credits for `chunks` received chunks.
+
+        Acknowledgements beyond the chunks sent so far are ignored, so a receiver cannot raise the
+        window by acknowledging chunks in advance.
+
+        Raises:
+            InvalidStreamAckError: If `chunks` is not a positive integer
+        """
+        if not isinstance(chunks, int) or isinstance(chunks, bool) or chunks < 1:
+            raise InvalidStreamAckError(self.stream_id, chunks)
+        self._acked += min(chunks, self._sent - self._acked)
+        self._credit.set()
+
+    async def _acquire_credit(self) -> None:
+        while self._sent - self._acked >= self.window:
+            self._credit.clear()
+            await self._credit.wait()
+        self._sent += 1
+
+    async def run(self) -> None:
+        """Send the start message, all chunks as credits allow, and the end message."""
+        await self.send_message(
+            WebSocketMessage(
+                event_name="stream_start",
+                payload={
+                    "stream_id": self.stream_id,
+                    "dtype": self.array.dtype.str,
+                    "shape": list(self.array.shape),
+                    "chunks": self.num_chunks,
+                },
+                to=self.to,
+            )
+        )
+        try:
+            for offset in range(0, len(self.array), self.rows_per_chunk):
+                await self._acquire_credit()
+                rows = min(self.rows_per_chunk, len(self.array) - offset)
+                await self.send_bytes(encode_chunk(self.stream_id, self.array, offset, rows))
+        except Exception as e:
+            logger.exception("stream_error", stream_id=self.stream_id, error=str(e))
+            with contextlib.suppress(Exception):
+                await self.send_message(
+                    WebSocketMessage(
+                        event_name="stream_error", payload={"stream_id": self.stream_id, "error": str(e)}, to=self.to
+                    )
+                )
+            return
+        await self.send_message(
+            WebSocketMessage(event_name="stream_end", payload={"stream_id": self.stream_id}, to=self.to)
+        )
+
+
+# Streams being sent, by (client ID, stream ID)
+active_streams: dict[tuple[str, int], tuple[ArrayStream, asyncio.Task[None]]] = {}
+
+
+def start_stream(client_id: str, stream: ArrayStream) -> asyncio.Task[None]:
+    """Run `stream` in the background and track it for acknowledgements and cancellation."""
+    key = (client_id, stream.stream_id)
+    if key in active_streams:
+        raise StreamAlreadyActiveError(stream.stream_id)
+
+    async def run() -> None:
+        try:
+            await stream.run()
+        finally:
+            active_streams.pop(key, None)
+
+    task = asyncio.create_task(run(), name=f"stream_{client_id}_{stream.stream_id}")
+    active_streams[key] = (stream, task)
+    logger.debug("stream_started", client_id=client_id, stream_id=stream.stream_id, chunks=stream.num_chunks)
+    return task
+
+
+def ack_stream(client_id: str, stream_id: int, chunks: int = 1) -> None:
+    """Grant credits to an active stream; acknowledgements for finished streams are ignored."""
+    entry = active_streams.get((client_id, stream_id))
+    if entry is not None:
+        entry[0].ack(chunks)
+
+
+def cancel_streams(client_id: str) -> None:
+    """Cancel all streams to a client, e.g. when it disconnects."""
+    for key in [key for key in active_streams if key[0] == client_id]:
+        _, task = active_streams.pop(key)
+        task.cancel()
+
+
+@dataclass
+class _IncomingStream:
+    array: npt.NDArray
+    chunks: int
+    future: asyncio.Future[npt.NDArray]
+    received: int = 0
+
+
+class StreamAssembler:
+    """Receiver side of array streams: assembles chunks into arrays.
+
+    Example:
+        ```python
+        assembler = StreamAssembler()
+        future = assembler.expect(stream_id)
+        # for every stream_start / stream_end / stream_error message
+        assembler.handle_message(message)
+        # for every binary frame; send the returned ack back to the sender
+        ack = assembler.feed(frame)
+        array = await future
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._futures: dict[int, asyncio.Future[npt.NDArray]] = {}
+        self._streams: dict[int, _IncomingStream] = {}
+        self._next_id = 1
+
+    def new_stream_id(self) -> int:
+        """A stream ID not used by this assembler before."""
+        stream_id = self._next_id
+        self._next_id += 1
+        return stream_id
+
+    def expect(self, stream_id: int) -> asyncio.Future[npt.NDArray]:
+        """Future resolved with the complete array of stream `stream_id`."""
+        future: asyncio.Future[npt.NDArray] = asyncio.get_running_loop().create_future()
+        self._futures[stream_id] = future
+        return future
+
+    def handle_message(self, message: WebSocketMessage) -> bool:
+        """Process a stream control message; returns False for unrelated messages."""
+        payload: dict[str, Any] = message.payload if isinstance(message.payload, dict) else {}
+        stream_id = payload.get("stream_id")
+        if message.event_name == "stream_start" and stream_id is not None:
+            array = np.empty(tuple(payload["shape"]), dtype=np.dtype(payload["dtype"]))
+            future = self._futures.pop(stream_id, None) or asyncio.get_running_loop().create_future()
+            self._streams[stream_id] = _IncomingStream(array=array, chunks=payload["chunks"], future=future)
+        elif message.event_name == "stream_end" and stream_id in self._streams:
+            stream = self._streams.pop(stream_id)
+            if stream.received != stream.chunks:
+                stream.future.set_exception(IncompleteStreamError(stream_id, stream.received, stream.chunks))
+            else:
+                stream.future.set_result(stream.array)
+        elif message.event_name == "stream_error" and stream_id is not None:
+            incoming = self._streams.pop(stream_id, None)
+            pending = incoming.future if incoming else self._futures.pop(stream_id, None)
+            if pending is not None:
+                pending.set_exception(StreamFailedError(stream_id, payload.get("error", "")))
+        else:
+            return False
+        return True
+
+    def fail_all(self, error: Exception) -> None:
+        """Fail all expected and incomplete streams, e.g. when the connection is lost."""
+        pending = [*self._futures.values(), *(stream.future for stream in self._streams.values())]
+        self._futures.clear()
+        self._streams.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def feed(self, frame: bytes) -> WebSocketMessage:
+        """Store the rows of a binary frame and return the ``stream_ack`` to send back."""
+        header, data = decode_chunk(frame)
+        stream = self._streams.get(header.stream_id)
+        if stream is None:
+            raise UnknownStreamError(header.stream_id)
+        stream.array[header.offset : header.offset + header.rows] = data
+        stream.received += 1
+        return WebSocketMessage(event_name="stream_ack", payload={"stream_id": header.stream_id, "chunks": 1})
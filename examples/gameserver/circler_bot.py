@@ -2,12 +2,10 @@
 
 
 import asyncio
-import json
 import math
 import time
-from contextlib import suppress
 
-import websockets
+from datadivr.transport.client import ReconnectPolicy, WebSocketClient
 
 VIENNA_CENTER = (48.2082, 16.3738)
 BRATISLAVA_CENTER = (48.1486, 17.1077)
@@ -24,11 +22,9 @@ class CircleBot:
         self.altitude = altitude
         self.start_time = None
 
-    async def start(self, websocket):
+    async def start(self, client):
         self.start_time = time.time()
-        await websocket.send(
-            json.dumps({"event_name": "GAMESERVER_SET_NAME", "to": "others", "payload": {"name": self.name}})
-        )
+        await client.send_message(event_name="GAMESERVER_SET_NAME", to="others", payload={"name": self.name})
 
     def calculate_position(self, elapsed_time):
         angle_deg = (elapsed_time * self.speed_deg_per_sec) % 360
@@ -42,51 +38,31 @@ class CircleBot:
 
 
 async def run_bot(bot):
-    while True:  # Outer loop for reconnection
-        try:
-            async with websockets.connect(WS_URI, ping_interval=20, ping_timeout=60) as websocket:
-                print(f"Connected to {WS_URI} for {bot.name}")
-                await bot.start(websocket)
-
-                while True:
-                    receive_task = asyncio.create_task(websocket.recv())
-                    send_task = asyncio.create_task(send_update(bot, websocket))
-
-                    # Wait for either task to complete
-                    done, pending = await asyncio.wait([receive_task, send_task], return_when=asyncio.FIRST_COMPLETED)
-
-                    # Cancel pending tasks
-                    for task in pending:
-                        task.cancel()
-
-                    # Process completed tasks
-                    for task in done:
-                        with suppress(asyncio.CancelledError):
-                            await task
-
-                    await asyncio.sleep(UPDATE_INTERVAL)
-
-        except websockets.exceptions.ConnectionClosed:
-            print(f"Connection closed for {bot.name}, attempting to reconnect...")
-            await asyncio.sleep(5)  # Wait before reconnecting
-        except Exception as e:
-            print(f"Error for {bot.name}: {e}")
-            await asyncio.sleep(5)
-
-
-async def send_update(bot, websocket):
+    # the client reconnects on its own and resumes its session, so the server keeps the bot's
+    # client ID and state; updates sent while offline are sent once reconnected
+    client = WebSocketClient(WS_URI, reconnect=ReconnectPolicy(initial_delay=1.0, max_delay=30.0, buffer_size=10))
+    await client.connect()
+    print(f"Connected to {WS_URI} for {bot.name}")
+    await bot.start(client)
+
+    receiver = asyncio.create_task(client.receive_messages())
+    try:
+        while not receiver.done():
+            await send_update(bot, client)
+            await asyncio.sleep(UPDATE_INTERVAL)
+    finally:
+        await client.disconnect()
+        await receiver
+
+
+async def send_update(bot, client):
     """Helper function to send position updates"""
     current_time = time.time()
     elapsed_time = current_time - bot.start_time
     lat, lon, direction = bot.calculate_position(elapsed_time)
 
-    message = {
-        "event_name": "GAMESERVER_INFO_UPDATE",
-        "to": "others",
-        "payload": {"latitude": lat, "longitude": lon, "altitude": bot.altitude, "direction": direction},
-    }
-
-    await websocket.send(json.dumps(message))
+    payload = {"latitude": lat, "longitude": lon, "altitude": bot.altitude, "direction": direction}
+    await client.send_message(event_name="GAMESERVER_INFO_UPDATE", to="others", payload=payload)
     if int(elapsed_time) % 5 == 0:  # Print every 5 seconds
         print(f"{bot.name} - Position: {lat:.4f}, {lon:.4f}, Direction: {direction:.1f}°")
 
@@ -1,10 +1,10 @@
-from math import asin, cos, radians, sin, sqrt
-
 from datadivr import BackgroundTasks, app
+from datadivr.calc.spatial import SpatialGrid
+from datadivr.core.snapshots import SnapshotTracker
 from datadivr.handlers.registry import HandlerType, websocket_handler
-from datadivr.transport.messages import create_message, send_message
+from datadivr.transport.messages import create_message
 from datadivr.transport.models import WebSocketMessage
-from datadivr.transport.server import clients, get_client_state, update_client_state
+from datadivr.transport.server import broadcast, clients, get_client_state, update_client_state
 from datadivr.utils.logging import get_logger, setup_logging
 
 # Initialize logging first, before getting the logger
@@ -17,37 +17,17 @@ logger = get_logger(__name__)
 # {"event_name": "GAMESERVER_INFO_UPDATE", "to": "others", "payload": {"latitude": 48.23747967660676, "longitude": 16.416320800781254, "altitude": 500, "direction": 90}}
 
 
-def is_within_range(lat1: float, lon1: float, lat2: float, lon2: float, max_range_km: float = 100.0) -> bool:
-    """
-    Determine if two geographical points are within a specified range.
+NEARBY_RANGE_KM = 100.0
+STATE_FIELDS = ("name", "lat", "long", "alt", "rot_x", "rot_y", "rot_z", "type", "anim")
 
-    This function calculates the great-circle distance between two points
-    on the Earth's surface given their latitude and longitude in degrees.
-    It returns True if the distance is less than or equal to the specified
-    maximum range in kilometers.
+# positions of all clients, bucketed for the nearby broadcast
+nearby_grid = SpatialGrid(radius_km=NEARBY_RANGE_KM)
+# nearby clients last sent to each client; a full list every 25 ticks (5 s) repairs lost deltas
+nearby_snapshots = SnapshotTracker(keyframe_interval=25)
 
-    Parameters:
-    - lat1 (float): Latitude of the first point in degrees.
-    - lon1 (float): Longitude of the first point in degrees.
-    - lat2 (float): Latitude of the second point in degrees.
-    - lon2 (float): Longitude of the second point in degrees.
-    - max_range_km (float): Maximum range in kilometers. Default is 10.0 km.
-
-    Returns:
-    - bool: True if the distance between the two points is within the specified range, False otherwise.
-    """
-    lat1, lon1 = radians(lat1), radians(lon1)
-    lat2, lon2 = radians(lat2), radians(lon2)
-    R = 6371.0
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    distance = R * c
-    return distance <= max_range_km
-
-
-@websocket_handler("GAMESERVER_CLIENT_UPDATE_STATE", HandlerType.SERVER)
+
+# only the newest pending state update of a client is handled
+@websocket_handler("GAMESERVER_CLIENT_UPDATE_STATE", HandlerType.SERVER, coalesce=True)
 async def info_update_handler(message: WebSocketMessage) -> None:
     """
     Handle position updates from clients.
@@ -134,17 +114,18 @@ async def broadcast_updates() -> None:
     """
     Periodically broadcast updates about nearby clients to each connected client.
 
-    This function runs every second and performs the following steps for each client:
-    1. Gets the client's current position
-    2. Finds all other clients within the specified range
-    3. Sends a GAMESERVER_NEARBY_UPDATE message containing information about nearby clients
+    This function runs every 200 ms and performs the following steps:
+    1. Buckets the current positions of all clients in the spatial grid
+    2. Finds the other clients within range of each client with vectorized distance math
+    3. Sends each client a GAMESERVER_NEARBY_UPDATE message with the nearby clients that entered,
+       changed or left since its last update; clients whose nearby clients are unchanged get nothing
 
     The message format sent to each client is:
     {
         "event_name": "GAMESERVER_NEARBY_UPDATE",
         "payload": {
-            "nearby_clients": [
-                {
+            "entered": {
+                "uuid": {
                     "client_id": "uuid",
                     "name": "Client Name",
                     "lat": float,
@@ -157,61 +138,40 @@ async def broadcast_updates() -> None:
                     "anim": int
                 },
                 ...
-            ]
+            },
+            "changed": {"uuid": {...}, ...},
+            "left": ["uuid", ...],
+            "full": bool  # true every 5 s: "entered" holds all nearby clients and replaces the previous ones
         }
     }
     """
     logger.debug("Starting broadcast cycle")
 
-    # Iterate through all connected clients
-    for client_id, client_data in clients.items():
-        state = client_data["state"]
-
-        # Get current client's position
-        lat1, lon1 = state.get("lat", 0), state.get("long", 0)
-
-        # Skip clients without valid position data
-        if lat1 == 0 and lon1 == 0:
-            continue
-
-        nearby_clients = []
-
-        # Check distance to all other clients
-        for other_id, other_data in clients.items():
-            # Skip self
-            if client_id == other_id:
-                continue
-
-            other_state = other_data["state"]
-            lat2, lon2 = other_state.get("lat", 0), other_state.get("long", 0)
-            # Skip clients without valid position data
-            if lat2 == 0 and lon2 == 0:
-                continue
-
-            # If client is within range, add their info to the nearby list
-            if is_within_range(lat1, lon1, lat2, lon2):
-                nearby_clients.append({
-                    "client_id": other_id,
-                    "name": other_state.get("name"),
-                    "lat": lat2,
-                    "long": lon2,
-                    "alt": other_state.get("alt"),
-                    "rot_x": other_state.get("rot_x"),
-                    "rot_y": other_state.get("rot_y"),
-                    "rot_z": other_state.get("rot_z"),
-                    "type": other_state.get("type"),
-                    "anim": other_state.get("anim"),
-                })
-
-        # also send if no nearby clients, to potentially clean old clients, could be improved:
-        # TODO: check if last update was already empty for this client, if so, skip
-
-        # if nearby_clients: # only send if there are nearby clients
-
-        message = create_message(
-            event_name="GAMESERVER_NEARBY_UPDATE", payload={"nearby_clients": nearby_clients}, to=client_id
-        )
-        await send_message(client_data["websocket"], message)
+    # Clients without valid position data are skipped
+    states = {
+        client_id: client_data["state"]
+        for client_id, client_data in list(clients.items())
+        if client_data["state"].get("lat", 0) != 0 or client_data["state"].get("long", 0) != 0
+    }
+    nearby_grid.update(
+        list(states),
+        [state.get("lat", 0) for state in states.values()],
+        [state.get("long", 0) for state in states.values()],
+    )
+
+    nearby_snapshots.retain(clients)
+
+    for client_id, others in nearby_grid.neighbors().items():
+        nearby_clients = {
+            other_id: {"client_id": other_id, **{field: states[other_id].get(field) for field in STATE_FIELDS}}
+            for other_id in others
+        }
+
+        # only send what changed since the last update, nothing if the nearby clients are unchanged
+        delta = nearby_snapshots.update(client_id, nearby_clients)
+        if delta:
+            message = create_message(event_name="GAMESERVER_NEARBY_UPDATE", payload=delta.to_payload(), to=client_id)
+            await broadcast(message)
 
 
 @websocket_handler("GAMESERVER_CLIENT_SETNAME", HandlerType.SERVER)
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from datadivr.exceptions import UnknownBrokerError
+from datadivr.transport.broker import LocalBroker, UnixSocketBroker, UnixSocketHub, broker_from_url
+
+
+def _collector():
+    received = []
+    arrived = asyncio.Event()
+
+    async def on_message(message):
+        received.append(message)
+        arrived.set()
+
+    return received, arrived, on_message
+
+
+@pytest.mark.asyncio
+async def test_local_broker_reaches_other_workers():
+    brokers = [LocalBroker("test_local") for _ in range(3)]
+    inboxes = []
+    for broker in brokers:
+        received, _, on_message = _collector()
+        inboxes.append(received)
+        await broker.start(on_message)
+
+    await brokers[0].publish({"event_name": "test", "to": "all"})
+    assert inboxes == [[], [{"event_name": "test", "to": "all"}], [{"event_name": "test", "to": "all"}]]
+
+    for broker in brokers:
+        await broker.stop()
+    await brokers[0].publish({"event_name": "test", "to": "all"})
+    assert len(inboxes[1]) == 1
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_broker(tmp_path):
+    hub = UnixSocketHub(tmp_path / "broker.sock")
+    await hub.start()
+    sender, receiver = UnixSocketBroker(hub.path), UnixSocketBroker(hub.path)
+    sender_inbox, _, on_sender_message = _collector()
+    received, arrived, on_message = _collector()
+    await sender.start(on_sender_message)
+    await receiver.start(on_message)
+    try:
+        await sender.publish({"event_name": "positions", "to": "all", "payload": np.arange(6.0).reshape(2, 3)})
+        await asyncio.wait_for(arrived.wait(), 1)
+    finally:
+        await sender.stop()
+        await receiver.stop()
+        await hub.stop()
+
+    assert received[0]["event_name"] == "positions"
+    assert received[0]["payload"].tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+    assert sender_inbox == []  # the hub does not echo messages back
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_hub_in_process(tmp_path):
+    process = UnixSocketHub(tmp_path / "broker.sock").run_in_process()
+    sender, receiver = UnixSocketBroker(tmp_path / "broker.sock"), UnixSocketBroker(tmp_path / "broker.sock")
+    received, arrived, on_message = _collector()
+    await sender.start(_collector()[2])
+    await receiver.start(on_message)
+    try:
+        assert process.pid != os.getpid()
+        await sender.publish({"event_name": "test", "to": "all"})
+        await asyncio.wait_for(arrived.wait(), 1)
+    finally:
+        await sender.stop()
+        await receiver.stop()
+        process.terminate()
+        process.join()
+
+    assert received == [{"event_name": "test", "to": "all"}]
+
+
+def test_broker_from_url():
+    assert isinstance(broker_from_url("local"), LocalBroker)
+    assert broker_from_url("local:workers").channel == "workers"
+    assert str(broker_from_url("unix:/run/datadivr.sock").path) == "/run/datadivr.sock"
+    with pytest.raises(UnknownBrokerError):
+        broker_from_url("redis://localhost")
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from datadivr.calc.sample_data import generate_cube_project
+from datadivr.project.bundling import aggregate_links, unique_keys
+from datadivr.project.model import Project
+
+
+def test_aggregate_links_undirected():
+    clusters = np.array([0, 0, 1, 2])
+    links = aggregate_links(
+        clusters,
+        start_rows=np.array([0, 2, 1, 0, 3]),
+        end_rows=np.array([2, 0, 0, 3, 3]),
+        colors=np.array([[10] * 4, [30] * 4, [99] * 4, [7] * 4, [99] * 4], dtype=np.uint8),
+    )
+
+    np.testing.assert_array_equal(links.start_ids, [0, 0])
+    np.testing.assert_array_equal(links.end_ids, [1, 2])
+    np.testing.assert_array_equal(links.weights, [2, 1])
+    np.testing.assert_array_equal(links.colors[:, 0], [20, 7])
+
+
+def test_aggregate_links_directed():
+    clusters = np.array([0, 1])
+    links = aggregate_links(clusters, np.array([0, 1, 0]), np.array([1, 0, 1]), np.zeros((3, 4), np.uint8), True)
+
+    np.testing.assert_array_equal(links.start_ids, [0, 1])
+    np.testing.assert_array_equal(links.end_ids, [1, 0])
+    np.testing.assert_array_equal(links.weights, [2, 1])
+
+
+@pytest.mark.parametrize("key_space", [None, 10])
+def test_unique_keys_matches_numpy(key_space):
+    keys = np.array([5, 1, 5, 9, 1, 1])
+    unique, inverse, counts = unique_keys(keys, key_space)
+
+    np.testing.assert_array_equal(unique, [1, 5, 9])
+    np.testing.assert_array_equal(unique[inverse], keys)
+    np.testing.assert_array_equal(counts, [3, 2, 1])
+
+
+def test_unique_keys_sparse_key_space_sorts(monkeypatch):
+    monkeypatch.setattr(np, "bincount", None)  # the dense table counts with np.bincount
+    unique, _, counts = unique_keys(np.array([8191**2, 3, 3]), 8192**2)
+
+    np.testing.assert_array_equal(unique, [3, 8191**2])
+    np.testing.assert_array_equal(counts, [2, 1])
+
+
+def test_project_aggregate_links(tmp_path):
+    project = generate_cube_project()
+    reduced = project.aggregate_links(resolution=1, node_clusters=np.array([0, 0, 0, 0, 1, 1, 1, 1]))
+
+    assert reduced.name == f"{project.name}_aggregated"
+    np.testing.assert_array_equal(reduced.nodes_data.get_attribute("size"), [4, 4])
+    # the four edges connecting front and back face become one meta-link
+    np.testing.assert_array_equal(reduced.links_data.weights, [4])
+
+    reduced.save_to_binary_file(tmp_path / "reduced.zip")
+    loaded = Project.load_from_binary_file(tmp_path / "reduced.zip")
+    np.testing.assert_array_equal(loaded.links_data.weights, [4])
+
+    reduced.create_all_assets(str(tmp_path))
+    assert (tmp_path / reduced.name / "textures" / "links_XYZ.bmp").exists()
+
+
+def test_project_aggregate_links_grid():
+    project = generate_cube_project()
+    reduced = project.aggregate_links(resolution=2)
+
+    assert len(reduced.nodes_data.ids) == 8
+    assert reduced.links_data.weights.sum() == len(project.links_data.start_ids)
@@ -5,9 +5,19 @@ from prompt_toolkit import PromptSession
 from typer.testing import CliRunner
 
 from datadivr.commandlineinterface.client import get_user_input, input_loop, run_client, start_client_app
-from datadivr.commandlineinterface.server import start_server_app
+from datadivr.commandlineinterface.server import (
+    HANDLER_TIMEOUT_ENV,
+    MAX_CONCURRENCY_ENV,
+    ORDERING_ENV,
+    PROCESS_WORKERS_ENV,
+    THREAD_WORKERS_ENV,
+    create_worker_app,
+    start_server_app,
+)
+from datadivr.core.executors import executor_config
 from datadivr.exceptions import InputLoopInterrupted
 from datadivr.transport.client import WebSocketClient
+from datadivr.transport.dispatch import configure_dispatch, dispatch_config
 
 
 @pytest.fixture
@@ -28,6 +38,35 @@ def test_start_server_cli():
         mock_server.assert_called_once()
 
 
+def test_create_worker_app_reads_dispatch_settings(monkeypatch):
+    """Worker processes take the dispatch settings from the environment."""
+    original = (dispatch_config.max_concurrency, dispatch_config.handler_timeout or 0, dispatch_config.ordering)
+    monkeypatch.setenv(MAX_CONCURRENCY_ENV, "8")
+    monkeypatch.setenv(HANDLER_TIMEOUT_ENV, "2.5")
+    monkeypatch.setenv(ORDERING_ENV, "event")
+    try:
+        with patch("datadivr.commandlineinterface.server.create_app"):
+            create_worker_app()
+        assert dispatch_config.max_concurrency == 8
+        assert dispatch_config.handler_timeout == 2.5
+        assert dispatch_config.ordering == "event"
+    finally:
+        configure_dispatch(*original)
+
+
+def test_create_worker_app_reads_executor_settings(monkeypatch):
+    """Worker processes take the executor pool sizes from the environment."""
+    original = (executor_config.thread_workers, executor_config.process_workers)
+    monkeypatch.setenv(THREAD_WORKERS_ENV, "3")
+    monkeypatch.setenv(PROCESS_WORKERS_ENV, "2")
+    try:
+        with patch("datadivr.commandlineinterface.server.create_app"):
+            create_worker_app()
+        assert (executor_config.thread_workers, executor_config.process_workers) == (3, 2)
+    finally:
+        executor_config.thread_workers, executor_config.process_workers = original
+
+
 def test_start_client_cli():
     """Test the client CLI command."""
     with patch("asyncio.run") as mock_run:
@@ -1,13 +1,21 @@
+import asyncio
 import json
 from unittest.mock import AsyncMock, patch
 
+import numpy as np
 import pytest
 import websockets
 
-from datadivr.exceptions import UnsupportedWebSocketTypeError
-from datadivr.transport.client import WebSocketClient
+from datadivr.exceptions import (
+    NotConnectedError,
+    RequestFailedError,
+    RequestTimeoutError,
+    UnsupportedWebSocketTypeError,
+)
+from datadivr.transport.client import ReconnectPolicy, WebSocketClient
 from datadivr.transport.messages import send_message
 from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.streaming import encode_chunk
 
 
 @pytest.fixture
@@ -80,3 +88,207 @@ async def test_send_message_invalid_socket_type():
 
     with pytest.raises(UnsupportedWebSocketTypeError):
         await send_message(invalid_socket, message)
+
+
+def _answer(mock_websocket, client, respond):
+    """Make the server answer every sent message with `respond(request_data)` through the receive path."""
+
+    async def send(raw):
+        request = json.loads(raw)
+        response = respond(request)
+        asyncio.get_running_loop().call_soon(
+            client.resolve_request, {**response, "correlation_id": request["correlation_id"]}
+        )
+
+    mock_websocket.send.side_effect = send
+
+
+@pytest.mark.asyncio
+async def test_request_pipelining(client, mock_websocket):
+    client.websocket = mock_websocket
+    _answer(mock_websocket, client, lambda request: {"event_name": "result", "payload": request["payload"] * 2})
+
+    responses = await asyncio.gather(*(client.request("double", payload=i) for i in range(5)))
+    assert [response.payload for response in responses] == [0, 2, 4, 6, 8]
+    assert client.pending_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_request_error_response(client, mock_websocket):
+    client.websocket = mock_websocket
+    _answer(mock_websocket, client, lambda request: {"event_name": "error", "message": "Invalid payload format"})
+
+    with pytest.raises(RequestFailedError, match="Invalid payload format"):
+        await client.request("sum_event", payload="oops")
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(client, mock_websocket):
+    client.websocket = mock_websocket
+
+    with pytest.raises(RequestTimeoutError):
+        await client.request("sum_event", payload={"numbers": [1]}, timeout=0.01)
+    assert client.pending_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_disconnect_fails_pending_requests(client, mock_websocket):
+    client.websocket = mock_websocket
+    request = asyncio.create_task(client.request("sum_event", payload={"numbers": [1]}))
+    await asyncio.sleep(0)
+
+    await client.disconnect()
+    with pytest.raises(NotConnectedError):
+        await request
+
+
+@pytest.mark.asyncio
+async def test_disconnect_fails_pending_streams(client, mock_websocket):
+    client.websocket = mock_websocket
+    request = asyncio.create_task(client.request_array("links/colors"))
+    await asyncio.sleep(0)
+
+    await client.disconnect()
+    with pytest.raises(NotConnectedError):
+        await request
+
+
+@pytest.mark.asyncio
+async def test_invalid_stream_frames_are_dropped(client, mock_websocket):
+    mock_websocket.__aiter__.return_value = [
+        encode_chunk(99, np.arange(4, dtype=np.int32), 0, 4),  # stream that was never started
+        b"DDA1 truncated",
+    ]
+
+    await client._receive(mock_websocket)
+
+    mock_websocket.send.assert_not_called()
+
+
+def test_uncorrelated_messages_go_to_handlers(client):
+    assert not client.resolve_request({"event_name": "msg", "correlation_id": None})
+    assert not client.resolve_request({"event_name": "msg", "correlation_id": "unknown"})
+
+
+@pytest.mark.asyncio
+async def test_automatic_batching(mock_websocket):
+    client = WebSocketClient("ws://test.com/ws", batch_interval=0.01, max_batch_size=3)
+    client.websocket = mock_websocket
+
+    for i in range(2):
+        await client.send_message(payload=i, event_name="move")
+    mock_websocket.send.assert_not_called()
+    await asyncio.sleep(0.05)
+    sent = json.loads(mock_websocket.send.call_args.args[0])
+    assert [message["payload"] for message in sent] == [0, 1]
+
+    mock_websocket.send.reset_mock()
+    for i in range(3):  # a full batch is sent right away
+        await client.send_message(payload=i, event_name="move")
+    assert len(json.loads(mock_websocket.send.call_args.args[0])) == 3
+
+
+@pytest.mark.asyncio
+async def test_send_batch_sends_collected_messages_first(mock_websocket):
+    client = WebSocketClient("ws://test.com/ws", batch_interval=10)
+    client.websocket = mock_websocket
+
+    await client.send_message(payload="first", event_name="msg")
+    await client.send_batch([WebSocketMessage(event_name="msg", payload=p) for p in ("second", "third")])
+
+    frames = [json.loads(call.args[0]) for call in mock_websocket.send.call_args_list]
+    assert frames[0]["payload"] == "first"
+    assert [message["payload"] for message in frames[1]] == ["second", "third"]
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_send_batch_buffers_messages_when_connection_drops(mock_websocket):
+    client = WebSocketClient("ws://test.com/ws", reconnect=ReconnectPolicy())
+    client.websocket = mock_websocket
+    mock_websocket.send.side_effect = websockets.exceptions.ConnectionClosed(None, None)
+    messages = [WebSocketMessage(event_name="msg", payload=p) for p in ("first", "second")]
+
+    await client.send_batch(messages)
+
+    assert list(client._offline) == messages
+
+    client.reconnect = None
+    with pytest.raises(websockets.exceptions.ConnectionClosed):
+        await client.send_batch(messages)
+
+
+def test_reconnect_delays():
+    policy = ReconnectPolicy(initial_delay=1, max_delay=5, multiplier=2, jitter=0.5)
+    for attempt, ceiling in enumerate([1, 2, 4, 5, 5]):
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
+
+
+def _session_socket(client_id, token, resumed):
+    websocket = AsyncMock(spec=websockets.WebSocketClientProtocol)
+    payload = {"client_id": client_id, "token": token, "resumed": resumed}
+    websocket.__aiter__.return_value = [json.dumps({"event_name": "session", "payload": payload})]
+    return websocket
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_session_and_sends_buffered_messages():
+    client = WebSocketClient("ws://test.com/ws", reconnect=ReconnectPolicy(initial_delay=0.001, max_attempts=2))
+    first = _session_socket("client_1", "token_1", resumed=False)
+    second = _session_socket("client_1", "token_1", resumed=True)
+
+    async def reconnect(uri):
+        # sent while offline, delivered after reconnecting
+        await client.send_message(payload=1, event_name="move")
+        await client.send_message(payload=2, event_name="move")
+        return second
+
+    calls = []
+
+    async def fake_connect(uri):
+        calls.append(uri)
+        if len(calls) == 1:
+            return first
+        if len(calls) == 2:
+            return await reconnect(uri)
+        raise OSError("refused")
+
+    with patch("websockets.connect", fake_connect):
+        await client.connect()
+        await client.receive_messages()  # returns after giving up on the third connection
+
+    assert calls[:2] == ["ws://test.com/ws?session=new", "ws://test.com/ws?session=token_1"]
+    assert client.client_id == "client_1"
+    batch = json.loads(second.send.call_args.args[0])
+    assert [message["payload"] for message in batch] == [1, 2]
+    assert client.websocket is None
+
+
+@pytest.mark.asyncio
+async def test_buffered_messages_are_kept_when_resending_fails():
+    client = WebSocketClient("ws://test.com/ws", reconnect=ReconnectPolicy(initial_delay=0.001, max_attempts=3))
+    first = _session_socket("client_1", "token_1", resumed=False)
+    dropped = _session_socket("client_1", "token_1", resumed=True)
+    dropped.send.side_effect = websockets.exceptions.ConnectionClosed(None, None)
+    third = _session_socket("client_1", "token_1", resumed=True)
+    calls = []
+
+    async def fake_connect(uri):
+        calls.append(uri)
+        if len(calls) == 1:
+            return first
+        if len(calls) == 2:
+            await client.send_message(payload=1, event_name="move")
+            await client.send_message(payload=2, event_name="move")
+            return dropped
+        if len(calls) == 3:
+            return third
+        raise OSError("refused")
+
+    with patch("websockets.connect", fake_connect):
+        await client.connect()
+        await client.receive_messages()
+
+    dropped.send.assert_awaited_once()
+    batch = json.loads(third.send.call_args.args[0])
+    assert [message["payload"] for message in batch] == [1, 2]
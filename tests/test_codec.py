@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from datadivr.exceptions import InvalidMessageFormat, UnsupportedPayloadTypeError
+from datadivr.transport.client import WebSocketClient
+from datadivr.transport.codec import (
+    decode_batch,
+    decode_frame,
+    decode_message,
+    encode_batch,
+    encode_json_batch,
+    encode_message,
+)
+from datadivr.transport.models import WebSocketMessage
+
+
+def test_roundtrip():
+    positions = np.arange(12, dtype=">f4").reshape(4, 3)
+    data = WebSocketMessage(
+        event_name="update",
+        payload={"positions": positions, "ids": (1, 2), "ok": True, "name": "ü", "raw": b"\x00", "none": None},
+        to="all",
+    ).model_dump()
+
+    decoded = decode_message(encode_message(data))
+
+    np.testing.assert_array_equal(decoded["payload"].pop("positions"), positions)
+    assert decoded["payload"] == {"ids": [1, 2], "ok": True, "name": "ü", "raw": b"\x00", "none": None}
+    assert decoded["event_name"] == "update"
+
+
+def test_arrays_are_aligned():
+    frame = encode_message({"a": "x", "b": np.arange(3, dtype=np.float64)})
+    array = decode_message(frame)["b"]
+    assert (array.__array_interface__["data"][0] - np.frombuffer(frame, np.uint8).ctypes.data) % 8 == 0
+
+
+def test_invalid_frames():
+    with pytest.raises(InvalidMessageFormat):
+        decode_message(b"DDM1m\x05\x00\x00\x00")
+    with pytest.raises(InvalidMessageFormat):
+        decode_message(b"{}")
+    with pytest.raises(UnsupportedPayloadTypeError):
+        encode_message({"value": object()})
+
+
+def test_client_requests_encoding():
+    assert WebSocketClient("ws://host/ws", encoding="binary")._connection_uri() == "ws://host/ws?encoding=binary"
+    assert WebSocketClient("ws://host/ws")._connection_uri() == "ws://host/ws"
+
+
+def test_batch_frames():
+    batch = [{"event_name": "move", "payload": np.arange(3, dtype=np.int32)}, {"event_name": "msg", "payload": "hi"}]
+
+    decoded = decode_frame(encode_batch(batch))
+    assert [message["event_name"] for message in decoded] == ["move", "msg"]
+    np.testing.assert_array_equal(decoded[0]["payload"], [0, 1, 2])
+    assert decode_frame(encode_json_batch(batch))[0]["payload"] == [0, 1, 2]
+
+    with pytest.raises(InvalidMessageFormat):
+        decode_message(encode_batch(batch))
+    with pytest.raises(InvalidMessageFormat):
+        decode_batch(encode_message(batch[1]))
@@ -0,0 +1,42 @@
+import base64
+
+import numpy as np
+import pytest
+
+from datadivr.handlers.custom_handlers import combine_selections_handler, get_selection_handler
+from datadivr.project.model import Project, Selection, SelectionNodes
+from datadivr.project.project_manager import ProjectManager
+from datadivr.transport.models import WebSocketMessage
+
+
+@pytest.mark.asyncio
+async def test_selection_handlers():
+    project = Project(name="p")
+    project.add_nodes_bulk(np.arange(10), {})
+    project.selections = [
+        Selection(name=name, label_color=(0, 0, 0, 255), nodes=SelectionNodes(node_ids=ids, create_clusternode=False))
+        for name, ids in (("a", [1, 2, 3]), ("b", [3, 9]))
+    ]
+    ProjectManager.set_current_project(project)
+    try:
+        message = WebSocketMessage(
+            event_name="combine_selections", payload={"a": "a", "b": "b", "op": "union", "name": "ab"}, from_id="c"
+        )
+        result = await combine_selections_handler(message)
+        assert result.payload == {"name": "ab", "count": 4}
+
+        message = WebSocketMessage(event_name="get_selection", payload={"name": "ab"}, from_id="c")
+        result = await get_selection_handler(message)
+        ids = np.frombuffer(base64.b64decode(result.payload["data"]), dtype="<i4")
+        assert ids.tolist() == [1, 2, 3, 9]
+
+        message = WebSocketMessage(event_name="get_selection", payload={"name": "ab", "encoding": "bitmap"})
+        result = await get_selection_handler(message)
+        bits = np.unpackbits(np.frombuffer(base64.b64decode(result.payload["data"]), dtype=np.uint8))
+        assert np.flatnonzero(bits[:10]).tolist() == [1, 2, 3, 9]
+
+        message = WebSocketMessage(event_name="get_selection", payload={"name": "missing"})
+        result = await get_selection_handler(message)
+        assert "error" in result.payload
+    finally:
+        ProjectManager.clear_current_project()
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from datadivr.exceptions import UnknownOrderingError
+from datadivr.handlers.registry import get_handler_timeout, get_handlers, websocket_handler
+from datadivr.transport.dispatch import Dispatcher, configure_dispatch, dispatch_config, handler_timeout
+from datadivr.transport.models import WebSocketMessage
+
+
+@pytest.fixture
+def restore_dispatch_config():
+    original = (dispatch_config.max_concurrency, dispatch_config.handler_timeout, dispatch_config.ordering)
+    yield
+    configure_dispatch(original[0], original[1] or 0, original[2])
+
+
+def _message(event_name, payload=None, client_id="client"):
+    return WebSocketMessage(event_name=event_name, payload=payload, from_id=client_id)
+
+
+class _Recorder:
+    """Message handler recording the handled payloads; events in `gates` wait for their event."""
+
+    def __init__(self, *gated):
+        self.handled = []
+        self.gates = {event_name: asyncio.Event() for event_name in gated}
+
+    async def __call__(self, message):
+        gate = self.gates.get(message.event_name)
+        if gate is not None:
+            await gate.wait()
+        self.handled.append(message.payload)
+
+
+@pytest.mark.asyncio
+async def test_client_ordering_runs_clients_concurrently():
+    slow, fast = _Recorder("slow"), _Recorder()
+    slow_client = Dispatcher("slow_client", slow, ordering="client")
+    fast_client = Dispatcher("fast_client", fast, ordering="client")
+
+    await slow_client.put(_message("slow", 1))
+    await slow_client.put(_message("quick", 2))
+    await fast_client.put(_message("quick", 3))
+    await fast_client.join()
+    assert fast.handled == [3]
+    assert slow.handled == []  # waits behind the slow handler of its client
+    assert slow_client.pending == 1
+
+    slow.gates["slow"].set()
+    await slow_client.join()
+    assert slow.handled == [1, 2]
+    assert slow_client.stats()["handled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_event_ordering_runs_events_concurrently():
+    recorder = _Recorder("slow")
+    dispatcher = Dispatcher("client", recorder, ordering="event")
+
+    await dispatcher.put(_message("slow", "query"))
+    for position in range(3):
+        await dispatcher.put(_message("move", position))
+    await asyncio.sleep(0.01)
+    assert recorder.handled == [0, 1, 2]
+
+    recorder.gates["slow"].set()
+    await dispatcher.join()
+    assert recorder.handled == [0, 1, 2, "query"]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_messages_replace_pending_ones():
+    recorder = _Recorder("slow")
+    dispatcher = Dispatcher("client", recorder, ordering="client")
+
+    await dispatcher.put(_message("slow", "first"))
+    await asyncio.sleep(0)  # the lane task starts handling the first message
+    for position in range(3):
+        await dispatcher.put(_message("move", position), coalesce=True)
+    assert dispatcher.pending == 1
+
+    recorder.gates["slow"].set()
+    await dispatcher.join()
+    assert recorder.handled == ["first", 2]
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_limit(restore_dispatch_config):
+    configure_dispatch(max_concurrency=1)
+    running = 0
+    peak = 0
+
+    async def handle(_message):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    dispatchers = [Dispatcher(f"client_{i}", handle) for i in range(3)]
+    for dispatcher in dispatchers:
+        await dispatcher.put(_message("work"))
+    await asyncio.gather(*(dispatcher.join() for dispatcher in dispatchers))
+    assert peak == 1
+    assert sum(dispatcher.handled for dispatcher in dispatchers) == 3
+
+
+@pytest.mark.asyncio
+async def test_handler_timeout(restore_dispatch_config):
+    configure_dispatch(handler_timeout=0.01)
+    timed_out = []
+
+    async def on_timeout(message, timeout):
+        timed_out.append((message.payload, timeout))
+
+    recorder = _Recorder("hang")
+    dispatcher = Dispatcher("client", recorder, on_timeout)
+    await dispatcher.put(_message("hang", "stuck"))
+    await dispatcher.put(_message("next", "handled"))
+    await dispatcher.join()
+
+    assert timed_out == [("stuck", 0.01)]
+    assert recorder.handled == ["handled"]  # the lane continues after a timeout
+    assert dispatcher.stats()["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_running_handlers():
+    recorder = _Recorder("hang")
+    dispatcher = Dispatcher("client", recorder)
+    await dispatcher.put(_message("hang"))
+    await dispatcher.put(_message("next"))
+    await asyncio.sleep(0)
+
+    await dispatcher.close()
+    assert dispatcher.pending == 0
+    await dispatcher.put(_message("after_close"))
+    assert dispatcher.pending == 0
+    assert recorder.handled == []
+
+
+def test_handler_timeouts(restore_dispatch_config):
+    @websocket_handler("test_timeout_event", timeout=2.5)
+    async def handler(message):
+        return None
+
+    try:
+        assert get_handler_timeout("test_timeout_event") == 2.5
+        assert handler_timeout("test_timeout_event") == 2.5
+        configure_dispatch(handler_timeout=10)
+        assert handler_timeout("other_event") == 10
+        configure_dispatch(handler_timeout=0)
+        assert handler_timeout("other_event") is None
+    finally:
+        get_handlers().pop("test_timeout_event")
+
+
+def test_configure_dispatch_rejects_unknown_ordering():
+    with pytest.raises(UnknownOrderingError):
+        configure_dispatch(ordering="random")
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from datadivr.core.executors import configure_executors, executor_config, run_handler, shutdown_executors
+from datadivr.exceptions import UnknownExecutionModeError
+from datadivr.handlers.builtin.sum_handler import sum_handler
+from datadivr.handlers.registry import get_handlers, websocket_handler
+from datadivr.transport.models import WebSocketMessage
+
+
+@pytest.fixture
+def executors():
+    yield
+    shutdown_executors()
+
+
+@pytest.mark.asyncio
+async def test_thread_handler_does_not_block_the_loop(executors):
+    @websocket_handler("test_thread_event", execution="thread")
+    async def blocking_handler(message):
+        time.sleep(0.05)  # CPU-bound work holding the worker
+        return WebSocketMessage(event_name="done", payload=threading.current_thread().name, to=message.from_id)
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        response = await get_handlers()["test_thread_event"](WebSocketMessage(event_name="test_thread_event"))
+    finally:
+        ticker.cancel()
+        get_handlers().pop("test_thread_event")
+
+    assert response.payload.startswith("datadivr_handler")
+    assert ticks > 2  # the event loop kept running meanwhile
+
+
+@pytest.mark.asyncio
+async def test_process_handler_marshals_messages(executors):
+    message = WebSocketMessage(event_name="sum_event", payload={"numbers": [1, 2, 3]}, from_id="client")
+    response = await run_handler(sum_handler, message, "process")
+
+    assert response.event_name == "sum_handler_result"
+    assert response.payload == 6.0
+    assert response.to == "client"
+
+
+def test_unknown_execution_mode():
+    with pytest.raises(UnknownExecutionModeError):
+        websocket_handler("test_event", execution="gpu")
+
+
+def test_configure_executors():
+    original = (executor_config.thread_workers, executor_config.process_workers)
+    try:
+        assert configure_executors(thread_workers=4, process_workers=0).thread_workers == 4
+        assert executor_config.process_workers == 1
+    finally:
+        executor_config.thread_workers, executor_config.process_workers = original
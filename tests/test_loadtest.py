@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from datadivr.commandlineinterface.loadtest import (
+    LoadTestConfig,
+    latency_summary,
+    parse_mix,
+    run_loadtest,
+    start_loadtest_app,
+    validate_encoding,
+)
+from datadivr.exceptions import InvalidLoadTestMixError, InvalidLoadTestOptionError, UnknownEncodingError
+
+
+def test_parse_mix():
+    assert parse_mix("request=0.8, broadcast=0.2") == {"request": 0.8, "broadcast": 0.2}
+    assert parse_mix("broadcast") == {"broadcast": 1.0}
+
+
+@pytest.mark.parametrize("mix", ["", "request=x", "unknown=1", "request=0", "request=-1,broadcast=2"])
+def test_parse_mix_invalid(mix):
+    with pytest.raises(InvalidLoadTestMixError):
+        parse_mix(mix)
+
+
+def test_latency_summary():
+    summary = latency_summary([i / 1000 for i in range(1, 101)])
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == pytest.approx(100.0)
+    assert latency_summary([])["p95"] is None
+
+
+@pytest.mark.asyncio
+async def test_run_loadtest_local_server():
+    """Requests and broadcasts against a server started for the test all arrive."""
+    config = LoadTestConfig(clients=3, duration=0.5, rate=20, mix={"request": 1, "broadcast": 1}, payload_size=16)
+    report = await run_loadtest(config)
+
+    assert report["messages_sent"] > 0
+    assert report["requests"]["completed"] == report["requests"]["sent"]
+    assert report["broadcasts"]["received"] == report["broadcasts"]["sent"] * 2
+    assert report["dropped"] == 0
+    assert report["rtt_ms"]["p50"] is not None
+    json.dumps(report)
+
+
+def test_start_loadtest_app_writes_report(tmp_path, monkeypatch):
+    async def fake_run(config):
+        return {"messages_sent": 1}
+
+    monkeypatch.setattr("datadivr.commandlineinterface.loadtest.run_loadtest", fake_run)
+    output = tmp_path / "report.json"
+    start_loadtest_app(LoadTestConfig(), str(output))
+    assert json.loads(output.read_text()) == {"messages_sent": 1}
+
+
+def test_validate_encoding():
+    assert validate_encoding("binary") == "binary"
+    with pytest.raises(UnknownEncodingError):
+        validate_encoding("xml")
+
+
+@pytest.mark.parametrize("option", [{"rate": 0}, {"clients": 0}, {"duration": -1}, {"payload_size": -1}])
+def test_config_rejects_invalid_options(option):
+    with pytest.raises(InvalidLoadTestOptionError):
+        LoadTestConfig(**option)
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from datadivr.calc.sample_data import generate_cube_project
+from datadivr.project.lod import build_lod_level
+from datadivr.project.model import LayoutNotFoundError, Project
+
+
+def test_build_lod_level_clusters_and_bundles():
+    positions = np.array([[0.0, 0.0, 0.0], [0.1, 0.1, 0.1], [1.0, 1.0, 1.0], [0.9, 0.9, 0.9]], dtype=np.float32)
+    colors = np.array([[0, 0, 0, 255], [10, 10, 10, 255], [100, 0, 0, 255], [200, 0, 0, 255]], dtype=np.uint8)
+    start_rows = np.array([0, 1, 0, 2])
+    end_rows = np.array([2, 3, 1, 3])
+    link_colors = np.array([[0, 0, 0, 0], [100, 100, 100, 100], [5, 5, 5, 5], [5, 5, 5, 5]], dtype=np.uint8)
+
+    level = build_lod_level(2, positions, colors, start_rows, end_rows, link_colors)
+
+    np.testing.assert_array_equal(level.node_clusters, [0, 0, 1, 1])
+    np.testing.assert_array_equal(level.sizes, [2, 2])
+    np.testing.assert_allclose(level.positions, [[0.05] * 3, [0.95] * 3], rtol=1e-6)
+    np.testing.assert_array_equal(level.colors[:, 0], [5, 150])
+    # intra-cluster links are dropped, the two cross links form one bundle
+    np.testing.assert_array_equal(level.link_start_ids, [0])
+    np.testing.assert_array_equal(level.link_end_ids, [1])
+    np.testing.assert_array_equal(level.link_weights, [2])
+    np.testing.assert_array_equal(level.link_colors, [[50, 50, 50, 50]])
+
+
+def test_project_lod_levels_refine():
+    project = generate_cube_project()
+    levels = project.build_lod(num_levels=3, base_resolution=1)
+
+    assert [level.resolution for level in levels] == [1, 2, 4]
+    assert [len(level.sizes) for level in levels] == [1, 8, 8]
+    assert len(levels[0].link_weights) == 0
+    assert levels[1].link_weights.sum() == len(project.links_data.start_ids)
+
+
+def test_lod_saved_with_binary_project(tmp_path):
+    project = generate_cube_project()
+    project.build_lod(num_levels=2, base_resolution=1)
+
+    project.save_to_binary_file(tmp_path / "cube.zip")
+    loaded = Project.load_from_binary_file(tmp_path / "cube.zip")
+
+    assert [level.resolution for level in loaded.lod_data["default"]] == [1, 2]
+    np.testing.assert_array_equal(
+        loaded.lod_data["default"][1].link_weights, project.lod_data["default"][1].link_weights
+    )
+
+
+def test_lod_textures_and_summary(tmp_path):
+    project = generate_cube_project()
+    project.build_lod(num_levels=2, base_resolution=1)
+    project.create_all_assets(str(tmp_path))
+
+    summary = json.loads((tmp_path / project.name / "project.json").read_text())
+    assert [level["nodecount"] for level in summary["lod"]["default"]] == [1, 8]
+    assert "links_default_lod1_XYZ" in summary["textures"]["tiles"]
+    assert (tmp_path / project.name / "textures" / "layout_default_lod1_XYZ.bmp").exists()
+
+
+def test_build_lod_unknown_layout():
+    with pytest.raises(LayoutNotFoundError):
+        Project(name="empty").build_lod("missing")
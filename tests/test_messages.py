@@ -74,6 +74,7 @@ def test_create_error_message() -> None:
                 "to": "all",
                 "message": None,
                 "from_id": "server",
+                "correlation_id": None,
             },
         ),
         (
@@ -87,6 +88,7 @@ def test_create_error_message() -> None:
                 "to": "others",
                 "message": "Hello",
                 "from_id": "server",
+                "correlation_id": None,
             },
         ),
     ],
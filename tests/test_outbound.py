@@ -0,0 +1,152 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.websockets import WebSocket
+
+from datadivr.exceptions import UnknownOverflowPolicyError
+from datadivr.transport.outbound import OVERFLOW_CLOSE_CODE, OutboundQueue, configure_queues, queue_config
+
+
+def _stalled_socket():
+    """A mock websocket whose sends wait for the returned event."""
+    release = asyncio.Event()
+    websocket = AsyncMock(spec=WebSocket)
+
+    async def send(_):
+        await release.wait()
+
+    websocket.send_text.side_effect = send
+    return websocket, release
+
+
+def _sent(websocket):
+    return [call.args[0] for call in websocket.send_text.await_args_list]
+
+
+async def _fill(queue, frames, key=None):
+    for frame in frames:
+        await queue.put(frame, key)
+        await asyncio.sleep(0)  # let the writer pick up the first frame
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=2, policy="drop_oldest")
+
+    await _fill(queue, ["a", "b", "c", "d"])
+    assert queue.depth == 2
+    assert queue.dropped == 1
+
+    release.set()
+    await queue.join()
+    assert _sent(websocket) == ["a", "c", "d"]
+    assert queue.stats()["sent"] == 3
+
+
+@pytest.mark.asyncio
+async def test_reliable_frames_are_never_dropped():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=2, policy="drop_oldest")
+
+    await _fill(queue, ["a"])
+    await queue.put("stream_start", reliable=True)
+    await queue.put("b")
+    await queue.put("c")  # drops "b", not the reliable frame
+    await queue.put("stream_end", reliable=True)  # queued although the queue is full
+    await queue.put("d")  # drops "c"
+    assert queue.dropped == 2
+
+    release.set()
+    await queue.join()
+    assert _sent(websocket) == ["a", "stream_start", "stream_end", "d"]
+
+
+@pytest.mark.asyncio
+async def test_frame_is_dropped_if_only_reliable_frames_are_queued():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=1, policy="drop_oldest")
+
+    await _fill(queue, ["a"])
+    await queue.put("chunk", reliable=True)
+    await queue.put("b")
+    assert queue.dropped == 1
+
+    release.set()
+    await queue.join()
+    assert _sent(websocket) == ["a", "chunk"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_keeps_latest_value_per_key():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=2, policy="coalesce")
+
+    await _fill(queue, ["a"])
+    await queue.put("chat", key=("other", "msg"))
+    await queue.put("pos 1", key=("user", "move"))
+    await queue.put("pos 2", key=("user", "move"))
+    await queue.put("pos 3", key=("user", "move"))
+    assert queue.coalesced == 2
+
+    release.set()
+    await queue.join()
+    assert _sent(websocket) == ["a", "chat", "pos 3"]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_events_replace_pending_frames():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, policy="block")
+
+    await _fill(queue, ["a"])
+    for position in range(3):
+        await queue.put(f"pos {position}", key=("user", "move"), coalesce=True)
+    assert queue.depth == 1
+
+    release.set()
+    await queue.join()
+    assert _sent(websocket) == ["a", "pos 2"]
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_room():
+    websocket, release = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=1, policy="block")
+    await _fill(queue, ["a", "b"])
+
+    blocked = asyncio.create_task(queue.put("c"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await queue.join()
+    assert _sent(websocket) == ["a", "b", "c"]
+    assert queue.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_disconnect_closes_connection():
+    websocket, _ = _stalled_socket()
+    queue = OutboundQueue("client", websocket, maxsize=1, policy="disconnect")
+
+    await _fill(queue, ["a", "b", "c"])
+    websocket.close.assert_awaited_once_with(code=OVERFLOW_CLOSE_CODE)
+    assert queue.closed
+    assert queue.depth == 0
+
+    await queue.put("d")
+    assert queue.depth == 0
+
+
+def test_configure_queues():
+    original = (queue_config.maxsize, queue_config.policy)
+    try:
+        assert configure_queues(maxsize=16, policy="coalesce").policy == "coalesce"
+        assert queue_config.maxsize == 16
+        with pytest.raises(UnknownOverflowPolicyError):
+            configure_queues(policy="ignore")
+    finally:
+        configure_queues(*original)
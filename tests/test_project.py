@@ -1,7 +1,8 @@
 import numpy as np
 import pytest
 
-from datadivr.project.model import LayoutNotFoundError, Project
+from datadivr.exceptions import MissingNodeDataError
+from datadivr.project.model import IdIndex, LayoutNotFoundError, Project, Selection, SelectionNodes
 
 
 @pytest.fixture
@@ -94,3 +95,59 @@ def test_save_and_load_binary(sample_project, tmp_path):
         loaded_project.nodes_data.get_attribute("names").tolist()
         == sample_project.nodes_data.get_attribute("names").tolist()
     )
+
+
+def test_subgraph_by_ids(sample_project):
+    sample_project.selections = [
+        Selection(name="sel", label_color=(1, 2, 3, 4), nodes=SelectionNodes(node_ids=[1, 3], create_clusternode=False))
+    ]
+
+    sub = sample_project.subgraph(np.array([2, 3]))
+
+    np.testing.assert_array_equal(sub.nodes_data.ids, [2, 3])
+    assert sub.nodes_data.get_attribute("names").tolist() == ["Node 2", "Node 3"]
+    np.testing.assert_array_equal(sub.links_data.start_ids, [2])
+    np.testing.assert_array_equal(sub.links_data.end_ids, [3])
+    np.testing.assert_array_equal(sub.layouts_data["default"].positions, [[1, 1, 1], [2, 2, 2]])
+    assert sub.selections[0].nodes.node_ids.tolist() == [3]
+    # the source project is untouched
+    assert sample_project.selections[0].nodes.node_ids.tolist() == [1, 3]
+
+
+def test_subgraph_mask_with_remap(sample_project):
+    sub = sample_project.subgraph(np.array([False, True, True]), remap_ids=True, name="sub")
+
+    assert sub.name == "sub"
+    np.testing.assert_array_equal(sub.nodes_data.ids, [0, 1])
+    np.testing.assert_array_equal(sub.links_data.start_ids, [0])
+    np.testing.assert_array_equal(sub.links_data.end_ids, [1])
+    np.testing.assert_array_equal(sub.layouts_data["default"].node_ids, [0, 1])
+
+
+def test_subgraph_without_nodes():
+    with pytest.raises(MissingNodeDataError):
+        Project(name="empty").subgraph(np.array([1]))
+
+
+def test_subgraph_sparse_ids():
+    project = Project(name="sparse")
+    ids = np.array([-5, 10, 1 << 30], dtype=np.int32)
+    project.add_nodes_bulk(ids, {"w": np.array([0.1, 0.2, 0.3], dtype=np.float32)})
+    project.add_links_bulk(ids[[0, 1]], ids[[2, 2]], np.zeros((2, 4), dtype=np.uint8))
+
+    sub = project.subgraph(np.array([-5, 1 << 30]), remap_ids=True)
+
+    np.testing.assert_allclose(sub.nodes_data.get_attribute("w"), [0.1, 0.3])
+    np.testing.assert_array_equal(sub.links_data.start_ids, [0])
+    np.testing.assert_array_equal(sub.links_data.end_ids, [1])
+
+
+def test_id_index_sparse_ids_use_binary_search():
+    ids = np.array([120_000_000, 5, 42], dtype=np.int64)
+
+    index = IdIndex(ids)
+
+    assert index._table is None
+    np.testing.assert_array_equal(index.contains(np.array([5, 6, 120_000_000])), [True, False, True])
+    np.testing.assert_array_equal(index.positions(np.array([42, 120_000_000])), [2, 0])
+    assert IdIndex(np.array([3, 1, 0, 2]))._table is not None
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from datadivr.handlers.custom_handlers import load_project_handler
+from datadivr.project.async_io import get_project, load_project, save_project
+from datadivr.project.model import Project
+from datadivr.project.project_manager import ProjectManager
+from datadivr.transport.models import WebSocketMessage
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    ProjectManager.clear()
+    yield
+    ProjectManager.clear()
+
+
+@pytest.fixture
+def project():
+    project = Project(name="async")
+    ids = np.arange(100, dtype=np.int32)
+    project.add_nodes_bulk(ids, {"weight": np.ones(100, dtype=np.float32)})
+    project.add_layout_bulk("default", ids, np.zeros((100, 3), np.float32), np.zeros((100, 4), np.uint8))
+    return project
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("suffix", [".bin", ".json"])
+async def test_save_and_load_async(project, tmp_path, suffix):
+    path = tmp_path / f"project{suffix}"
+    stages = []
+
+    async def progress(stage, fraction):
+        stages.append((stage, fraction))
+
+    await save_project(project, path, progress=progress)
+    assert path.exists()
+    assert not list(tmp_path.glob(".*.tmp"))
+    assert stages[-1] == ("done", 1.0)
+
+    stages.clear()
+    loaded = await load_project(path, name="loaded", current=True, progress=progress)
+
+    assert ProjectManager.get_current_project() is loaded
+    np.testing.assert_array_equal(loaded.nodes_data.ids, project.nodes_data.ids)
+    fractions = [fraction for _, fraction in stages]
+    assert fractions == sorted(fractions)
+    assert stages[-1] == ("done", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_loading_does_not_block_event_loop(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+    ticks = 0
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.2)
+        return project
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    with patch.object(Project, "load_from_binary_file", side_effect=slow_load):
+        await load_project(path)
+    task.cancel()
+
+    assert ticks > 5
+    assert ProjectManager.get_project("async") is project
+
+
+@pytest.mark.asyncio
+async def test_load_project_sizes_and_enforces_budget_in_executor(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+    threads = []
+    memory_usage = Project.memory_usage
+    enforce_budget = ProjectManager.enforce_budget
+
+    def record_memory_usage(self):
+        threads.append(threading.current_thread())
+        return memory_usage(self)
+
+    def record_enforce_budget(keep=None):
+        threads.append(threading.current_thread())
+        enforce_budget(keep)
+
+    with (
+        patch.object(Project, "memory_usage", record_memory_usage),
+        patch.object(ProjectManager, "enforce_budget", side_effect=record_enforce_budget),
+    ):
+        await load_project(path)
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert ProjectManager.memory_usage("async") == project.memory_usage()
+
+
+@pytest.mark.asyncio
+async def test_get_project_reloads_in_executor(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+    ProjectManager.register_project_file(path, name="lazy")
+    ticks = 0
+    original_load = Project.load_from_binary_file
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.2)
+        return original_load(*args, **kwargs)
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    with patch.object(Project, "load_from_binary_file", side_effect=slow_load) as mock_load:
+        first, second = await asyncio.gather(get_project("lazy"), get_project("lazy"))
+    task.cancel()
+
+    assert ticks > 5
+    assert first is second is ProjectManager.get_project("lazy")
+    assert mock_load.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_load_project_handler_sends_progress(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+
+    ProjectManager.set_projects_dir(tmp_path)
+
+    with patch("datadivr.transport.server.broadcast", new_callable=AsyncMock) as mock_broadcast:
+        message = WebSocketMessage(event_name="load_project", payload={"path": "project.bin"}, from_id="client")
+        result = await load_project_handler(message)
+
+    assert result.payload == {"name": "async", "memory_usage": project.memory_usage()}
+    progress_events = [call.args[0] for call in mock_broadcast.await_args_list]
+    assert all(event.event_name == "project_progress" and event.to == "client" for event in progress_events)
+    assert progress_events[-1].payload["stage"] == "done"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["../outside.bin", "/etc/passwd"])
+async def test_load_project_handler_rejects_paths_outside_projects_dir(tmp_path, path):
+    projects_dir = tmp_path / "projects"
+    projects_dir.mkdir()
+    ProjectManager.set_projects_dir(projects_dir)
+
+    message = WebSocketMessage(event_name="load_project", payload={"path": path}, from_id="client")
+    with patch("datadivr.handlers.custom_handlers.load_project", new_callable=AsyncMock) as mock_load:
+        result = await load_project_handler(message)
+
+    assert "not inside the projects directory" in result.payload["error"]
+    mock_load.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_load_project_handler_rejects_paths_without_projects_dir(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+
+    message = WebSocketMessage(event_name="load_project", payload={"path": str(path)}, from_id="client")
+    result = await load_project_handler(message)
+
+    assert "error" in result.payload
+    assert ProjectManager.list_projects() == []
+
+
+@pytest.mark.asyncio
+async def test_load_project_handler_loads_registered_file(project, tmp_path):
+    path = tmp_path / "project.bin"
+    project.save_to_binary_file(path)
+    ProjectManager.register_project_file(path, name="registered")
+
+    message = WebSocketMessage(event_name="load_project", payload={"name": "registered"})
+    result = await load_project_handler(message)
+
+    assert result.payload["name"] == "registered"
+    assert ProjectManager.list_projects()[0]["loaded"] is True
+
+    message = WebSocketMessage(event_name="load_project", payload={"name": "unknown"})
+    assert "error" in (await load_project_handler(message)).payload
@@ -0,0 +1,49 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from datadivr.calc.sample_data import generate_cube_project
+from datadivr.project.json import create_links_json, create_nodes_json
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_nodes_json_schema(tmp_path, chunk_size):
+    ids = np.array([5, 6, 7], dtype=np.int32)
+    create_nodes_json(ids, ["a", "b", "c"], "p", str(tmp_path), chunk_size=chunk_size)
+
+    data = json.loads((tmp_path / "p" / "nodes.json").read_text())
+    assert data == {
+        "nodes": [
+            {"id": 5, "n": "a", "attrlist": []},
+            {"id": 6, "n": "b", "attrlist": []},
+            {"id": 7, "n": "c", "attrlist": []},
+        ]
+    }
+
+
+def test_links_json_schema(tmp_path):
+    create_links_json(np.array([1, 2], dtype=np.int32), np.array([2, 3], dtype=np.int32), "p", str(tmp_path), 1)
+
+    data = json.loads((tmp_path / "p" / "links.json").read_text())
+    assert data == {"links": [{"id": 0, "s": 1, "e": 2}, {"id": 1, "s": 2, "e": 3}]}
+
+
+def test_empty_json(tmp_path):
+    create_links_json(np.array([], dtype=np.int32), np.array([], dtype=np.int32), "p", str(tmp_path))
+    assert json.loads((tmp_path / "p" / "links.json").read_text()) == {"links": []}
+
+
+def test_project_json_files_compressed(tmp_path):
+    project = generate_cube_project()
+    project.create_json_files(str(tmp_path), compress=True)
+
+    with gzip.open(tmp_path / project.name / "nodes.json.gz") as f:
+        nodes = json.load(f)["nodes"]
+    with gzip.open(tmp_path / project.name / "links.json.gz") as f:
+        links = json.load(f)["links"]
+
+    assert [node["n"] for node in nodes] == [str(i) for i in project.nodes_data.ids]
+    assert [link["s"] for link in links] == project.links_data.start_ids.tolist()
+    assert [link["e"] for link in links] == project.links_data.end_ids.tolist()
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from datadivr.exceptions import ProjectNotFoundError
+from datadivr.project.model import Project
+from datadivr.project.project_manager import ProjectManager
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    ProjectManager.clear()
+    yield
+    ProjectManager.clear()
+
+
+def _project_file(tmp_path, name, num_nodes=1000, with_names=False):
+    project = Project(name=name)
+    ids = np.arange(num_nodes, dtype=np.int32)
+    attributes = {"weight": np.ones(num_nodes, dtype=np.float32)}
+    if with_names:
+        attributes["name"] = ids.astype(str).astype(object)
+    project.add_nodes_bulk(ids, attributes)
+    project.add_layout_bulk(
+        "default", ids, np.zeros((num_nodes, 3), dtype=np.float32), np.zeros((num_nodes, 4), dtype=np.uint8)
+    )
+    path = tmp_path / f"{name}.bin"
+    project.save_to_binary_file(path)
+    return path, project.memory_usage()
+
+
+def test_current_project():
+    project = Project(name="p")
+    ProjectManager.set_current_project(project)
+    assert ProjectManager.get_current_project() is project
+    assert ProjectManager.get_project("p") is project
+
+    ProjectManager.clear_current_project()
+    assert ProjectManager.get_current_project() is None
+    with pytest.raises(ProjectNotFoundError):
+        ProjectManager.get_project("p")
+
+
+def test_projects_load_on_demand(tmp_path):
+    path, nbytes = _project_file(tmp_path, "a")
+    ProjectManager.register_project_file(path)
+    assert ProjectManager.list_projects()[0]["loaded"] is False
+
+    project = ProjectManager.get_project("a")
+
+    assert len(project.nodes_data.ids) == 1000
+    assert ProjectManager.memory_usage() == nbytes
+
+
+def test_memory_budget_memory_maps_least_recently_used(tmp_path):
+    for name in ("a", "b", "c"):
+        ProjectManager.register_project_file(_project_file(tmp_path, name)[0])
+        ProjectManager.get_project(name)
+
+    ProjectManager.set_memory_budget(ProjectManager.memory_usage() // 3 + 1)
+
+    assert [p["memory_mapped"] for p in ProjectManager.list_projects()] == [True, True, False]
+    assert [p["loaded"] for p in ProjectManager.list_projects()] == [True, True, True]
+    assert isinstance(ProjectManager.get_project("a").layouts_data["default"].positions, np.memmap)
+
+
+def test_memory_budget_unloads_projects(tmp_path):
+    for name in ("a", "b"):
+        ProjectManager.register_project_file(_project_file(tmp_path, name, with_names=True)[0])
+        ProjectManager.get_project(name)
+
+    # string attributes cannot be memory-mapped, so the projects are unloaded
+    ProjectManager.set_memory_budget(0)
+    assert [p["loaded"] for p in ProjectManager.list_projects()] == [False, False]
+    assert ProjectManager.memory_usage() == 0
+
+    # unloaded projects are reloaded on access
+    assert len(ProjectManager.get_project("b").nodes_data.ids) == 1000
@@ -1,10 +1,12 @@
 import os
+import sys
 
 import numpy as np
 import pytest
 
 from datadivr.calc.sample_data import generate_cube_data
-from datadivr.project.model import Project
+from datadivr.exceptions import AttributeKindConflictError, IdOverflowError, UnknownIdStrategyError
+from datadivr.project.model import Project, Selection, SelectionNodes, _load_array, _resident_nbytes
 
 
 @pytest.fixture
@@ -141,3 +143,146 @@ def test_multiple_save_load_formats(sample_project, tmp_path):
         assert np.array_equal(final_layout.node_ids, original_layout.node_ids)
         assert np.array_equal(final_layout.positions, original_layout.positions)
         assert np.array_equal(final_layout.colors, original_layout.colors)
+
+
+def _small_project(name, ids, attributes):
+    project = Project(name=name)
+    ids = np.array(ids, dtype=np.int32)
+    project.add_nodes_bulk(ids, attributes)
+    project.add_links_bulk(ids[:-1], ids[1:], np.zeros((len(ids) - 1, 4), dtype=np.uint8))
+    project.add_layout_bulk(
+        "default", ids, np.zeros((len(ids), 3), dtype=np.float32), np.zeros((len(ids), 4), np.uint8)
+    )
+    project.selections = [
+        Selection(
+            name="first",
+            label_color=(0, 0, 0, 255),
+            nodes=SelectionNodes(node_ids=[int(ids[0])], create_clusternode=False),
+        )
+    ]
+    return project
+
+
+def test_concat_with_offsets():
+    a = _small_project("a", [0, 1, 2], {"weight": np.array([1.0, 2.0, 3.0])})
+    b = _small_project("b", [0, 1], {"label": np.array(["x", "y"], dtype=object)})
+
+    merged = Project.concat([a, b], name="merged")
+
+    np.testing.assert_array_equal(merged.nodes_data.ids, [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(merged.links_data.start_ids, [0, 1, 3])
+    np.testing.assert_array_equal(merged.links_data.end_ids, [1, 2, 4])
+    np.testing.assert_array_equal(merged.layouts_data["default"].node_ids, [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(merged.nodes_data.get_attribute("weight")[:3], [1.0, 2.0, 3.0])
+    assert np.isnan(merged.nodes_data.get_attribute("weight")[3:]).all()
+    assert merged.nodes_data.get_attribute("label").tolist() == [None, None, None, "x", "y"]
+    assert merged.selections[0].nodes.node_ids.tolist() == [0, 3]
+
+
+def test_concat_union_deduplicates_nodes():
+    a = _small_project("a", [1, 2], {"weight": np.array([1.0, 2.0])})
+    b = _small_project("b", [2, 3], {"weight": np.array([20.0, 30.0])})
+
+    merged = a.merge(b, id_strategy="union")
+
+    assert merged.name == "a"
+    np.testing.assert_array_equal(merged.nodes_data.ids, [1, 2, 3])
+    np.testing.assert_array_equal(merged.nodes_data.get_attribute("weight"), [1.0, 2.0, 30.0])
+    np.testing.assert_array_equal(merged.layouts_data["default"].node_ids, [1, 2, 3])
+    assert len(merged.links_data.start_ids) == 2
+    assert merged.selections[0].nodes.node_ids.tolist() == [1, 2]
+
+
+def test_concat_union_deduplicates_links():
+    a = _small_project("a", [1, 2, 3], {})
+    b = _small_project("b", [2, 3, 4], {})
+
+    merged = Project.concat([a, b], id_strategy="union")
+
+    pairs = list(zip(merged.links_data.start_ids.tolist(), merged.links_data.end_ids.tolist(), strict=True))
+    assert pairs == [(1, 2), (2, 3), (3, 4)]
+
+
+def test_concat_attribute_kind_conflict():
+    a = _small_project("a", [0, 1], {"value": np.array([1.0, 2.0])})
+    b = _small_project("b", [0, 1], {"value": np.array(["x", "y"], dtype=object)})
+
+    with pytest.raises(AttributeKindConflictError, match="value"):
+        Project.concat([a, b])
+
+
+def test_merge_fill_values():
+    a = _small_project("a", [0, 1], {"weight": np.array([1.0, 2.0])})
+    b = _small_project("b", [0], {"label": np.array(["x"], dtype=object)})
+
+    merged = a.merge(b, fill_values={"weight": -1.0, "label": ""})
+
+    np.testing.assert_array_equal(merged.nodes_data.get_attribute("weight"), [1.0, 2.0, -1.0])
+    assert merged.nodes_data.get_attribute("label").tolist() == ["", "", "x"]
+
+
+def test_concat_id_overflow():
+    a = _small_project("a", [0, 2**31 - 2], {})
+    b = _small_project("b", [0, 1], {})
+
+    with pytest.raises(IdOverflowError):
+        Project.concat([a, b])
+
+
+def test_concat_unknown_strategy():
+    with pytest.raises(UnknownIdStrategyError):
+        Project.concat([], id_strategy="bogus")
+
+
+def _selection(name, node_ids):
+    return Selection(
+        name=name, label_color=(0, 0, 0, 255), nodes=SelectionNodes(node_ids=node_ids, create_clusternode=False)
+    )
+
+
+def test_selection_set_operations():
+    a = _selection("a", [5, 1, 3, 3])
+    b = _selection("b", [3, 4, 5])
+
+    assert a.node_ids.tolist() == [1, 3, 5]
+    assert a.union(b, name="u").node_ids.tolist() == [1, 3, 4, 5]
+    assert a.intersection(b).node_ids.tolist() == [3, 5]
+    assert a.difference(b).node_ids.tolist() == [1]
+    assert a.model_dump()["nodes"]["node_ids"] == [1, 3, 5]
+
+
+def test_selection_masks():
+    ids = np.array([10, 20, 30, 40])
+    selection = _selection("s", [20, 40, 99])
+
+    mask = selection.to_mask(ids)
+    np.testing.assert_array_equal(mask, [False, True, False, True])
+    assert Selection.from_mask("s", mask, ids, label_color=(0, 0, 0, 255)) == _selection("s", [20, 40])
+
+
+def test_selections_binary_roundtrip(sample_project, tmp_path):
+    sample_project.selections = [_selection("s", [1, 2, 3])]
+    path = tmp_path / "project.bin"
+    sample_project.save_to_binary_file(path)
+
+    loaded = Project.load_from_binary_file(path)
+
+    assert loaded.get_selection("s").node_ids.tolist() == [1, 2, 3]
+    assert loaded.get_selection("s").node_ids.dtype == np.int32
+
+
+def test_load_array_unpickles_only_when_allowed(tmp_path):
+    path = tmp_path / "objects.npy"
+    np.save(path, np.array(["a", "b"], dtype=object))
+
+    with pytest.raises(ValueError, match="allow_pickle"):
+        _load_array(path, "r")
+    assert _load_array(path, "r", allow_pickle=True).tolist() == ["a", "b"]
+
+
+def test_resident_nbytes_estimates_object_arrays():
+    values = np.array(["x" * 100] * 10_000, dtype=object)
+
+    exact = values.nbytes + sum(sys.getsizeof(value) for value in values)
+
+    assert _resident_nbytes(values) == pytest.approx(exact, rel=0.01)
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from datadivr.transport.queues import CoalescingQueue
+
+
+@pytest.mark.asyncio
+async def test_coalescing_replaces_pending_item_in_place():
+    queue = CoalescingQueue()
+    await queue.put("a")
+    await queue.put("pos 1", key="pos", coalesce=True)
+    await queue.put("b")
+    await queue.put("pos 2", key="pos", coalesce=True)
+    await queue.put("pos 3", key="pos")  # without coalesce the item is queued
+
+    assert [queue.popleft() for _ in range(len(queue))] == ["a", "pos 2", "b", "pos 3"]
+
+
+@pytest.mark.asyncio
+async def test_coalescing_after_item_was_taken():
+    queue = CoalescingQueue()
+    await queue.put("pos 1", key="pos", coalesce=True)
+    assert await queue.get() == "pos 1"
+    await queue.put("pos 2", key="pos", coalesce=True)
+    assert len(queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_put_waits_while_full_but_coalesces():
+    queue = CoalescingQueue(maxsize=2)
+    await queue.put("a")
+    await queue.put("pos 1", key="pos")
+    await asyncio.wait_for(queue.put("pos 2", key="pos", coalesce=True), 1)  # no room needed
+
+    blocked = asyncio.create_task(queue.put("b"))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    assert await queue.get() == "a"
+    await blocked
+    assert [queue.popleft() for _ in range(len(queue))] == ["pos 2", "b"]
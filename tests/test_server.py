@@ -1,19 +1,36 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 from structlog.testing import capture_logs
 
 from datadivr.exceptions import InvalidMessageFormat
+from datadivr.handlers.registry import coalesce_event, get_handlers, websocket_handler
+from datadivr.transport.broker import LocalBroker
+from datadivr.transport.codec import decode_message, encode_batch, encode_json, encode_message
 from datadivr.transport.models import WebSocketMessage
 from datadivr.transport.server import (
     add_client,
     app,
     broadcast,
+    client_ids,
     clients,
+    deliver_published,
+    flush_queues,
+    get_client_id,
+    get_client_state,
+    get_room_members,
     handle_connection,
     handle_msg,
+    join_room,
+    leave_room,
+    queue_metrics,
+    remove_client,
+    set_broker,
+    update_client_state,
     websocket_endpoint,
 )
 
@@ -26,26 +43,39 @@ def test_client():
 @pytest.fixture
 def websocket_mock():
     mock = AsyncMock(spec=WebSocket)
-    mock.receive_json = AsyncMock()
-    mock.send_json = AsyncMock()
+    mock.receive = AsyncMock()
+    mock.send_text = AsyncMock()
+    mock.query_params = {}
     return mock
 
 
+def _frame(data):
+    """An ASGI receive event carrying `data` as JSON text."""
+    return {"type": "websocket.receive", "text": orjson.dumps(data).decode()}
+
+
+def _text(message):
+    """The JSON text frame sent for `message`."""
+    return orjson.dumps(message.model_dump()).decode()
+
+
 @pytest.fixture
 def clear_clients():
     # Clear the global clients dict before and after each test
     clients.clear()
+    client_ids.clear()
     yield
     clients.clear()
+    client_ids.clear()
 
 
 @pytest.mark.asyncio
 async def test_websocket_connection(websocket_mock, clear_clients):
     """Test basic WebSocket connection and disconnection"""
     # Mock a valid message response
-    websocket_mock.receive_json.side_effect = [
+    websocket_mock.receive.side_effect = [
         # First call returns valid message
-        {"event_name": "test_event", "payload": {"data": "test"}, "to": "all"},
+        _frame({"event_name": "test_event", "payload": {"data": "test"}, "to": "all"}),
         # Second call raises WebSocketDisconnect
         WebSocketDisconnect(),
     ]
@@ -91,7 +121,8 @@ async def test_broadcast_to_all(websocket_mock, clear_clients):
     message = WebSocketMessage(event_name="test_event", payload={"data": "test"}, to="all")
 
     await broadcast(message, websocket_mock)
-    websocket_mock.send_json.assert_called_once_with(message.model_dump())
+    await flush_queues()
+    websocket_mock.send_text.assert_called_once_with(_text(message))
 
 
 @pytest.mark.asyncio
@@ -106,8 +137,9 @@ async def test_broadcast_to_others(websocket_mock, clear_clients):
     message = WebSocketMessage(event_name="test_event", payload={"data": "test"}, to="others")
 
     await broadcast(message, sender_socket)
-    receiver_socket.send_json.assert_called_once_with(message.model_dump())
-    sender_socket.send_json.assert_not_called()
+    await flush_queues()
+    receiver_socket.send_text.assert_called_once_with(_text(message))
+    sender_socket.send_text.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -122,15 +154,16 @@ async def test_broadcast_to_specific_client(websocket_mock, clear_clients):
     message = WebSocketMessage(event_name="test_event", payload={"data": "test"}, to=target_id)
 
     await broadcast(message, other_socket)
-    target_socket.send_json.assert_called_once_with(message.model_dump())
-    other_socket.send_json.assert_not_called()
+    await flush_queues()
+    target_socket.send_text.assert_called_once_with(_text(message))
+    other_socket.send_text.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_invalid_message_format():
     """Test handling of invalid message format."""
     mock_websocket = AsyncMock(spec=WebSocket)
-    mock_websocket.receive_json.return_value = {"invalid": "message"}
+    mock_websocket.receive.return_value = _frame({"invalid": "message"})
 
     with (
         pytest.raises(InvalidMessageFormat),
@@ -146,13 +179,14 @@ async def test_invalid_message_format():
 async def test_broadcast_error_handling():
     """Test error handling during broadcast."""
     mock_websocket = AsyncMock(spec=WebSocket)
-    mock_websocket.send_json.side_effect = Exception("Test error")
+    mock_websocket.send_text.side_effect = Exception("Test error")
 
     add_client(mock_websocket)
     message = WebSocketMessage(event_name="test", to="all")
 
     with capture_logs() as captured:
         await broadcast(message, mock_websocket)
+        await flush_queues()
 
     assert any(log["event"] == "broadcast_error" for log in captured)
 
@@ -169,8 +203,8 @@ async def test_multiple_clients_broadcasting(clear_clients):
 
     # Set up each mock with basic async methods and add to clients
     for _, mock in enumerate(clients_mocks):
-        mock.send_json = AsyncMock()
-        mock.receive_json = AsyncMock()
+        mock.send_text = AsyncMock()
+        mock.receive = AsyncMock()
         client_id = add_client(mock)
         client_ids.append(client_id)
 
@@ -179,12 +213,13 @@ async def test_multiple_clients_broadcasting(clear_clients):
 
     # Broadcast from client_0 to all
     await broadcast(message_to_all, clients_mocks[0])
+    await flush_queues()
 
     # Verify all clients received the message
-    message_data = message_to_all.model_dump()
+    message_data = _text(message_to_all)
     for client in clients_mocks:
-        client.send_json.assert_called_once_with(message_data)
-        client.send_json.reset_mock()
+        client.send_text.assert_called_once_with(message_data)
+        client.send_text.reset_mock()
 
     # Test broadcasting to 'others'
     message_to_others = WebSocketMessage(event_name="test_event", payload={"data": "test_others"}, to="others")
@@ -192,15 +227,217 @@ async def test_multiple_clients_broadcasting(clear_clients):
     # Broadcast from client_1 to others
     sender = clients_mocks[1]
     await broadcast(message_to_others, sender)
+    await flush_queues()
 
     # Verify all clients except sender received the message
-    message_data = message_to_others.model_dump()
+    message_data = _text(message_to_others)
     for _, client in enumerate(clients_mocks):
         if client == sender:
-            client.send_json.assert_not_called()
+            client.send_text.assert_not_called()
         else:
-            client.send_json.assert_called_once_with(message_data)
-        client.send_json.reset_mock()
+            client.send_text.assert_called_once_with(message_data)
+        client.send_text.reset_mock()
 
     # Verify client count
     assert len(clients) == 4
+
+
+def test_binary_encoding_connection(test_client):
+    with test_client, test_client.websocket_connect("/ws?encoding=binary") as websocket:
+        websocket.send_bytes(encode_message({"event_name": "sum_event", "payload": {"numbers": [1, 2, 3]}}))
+        response = decode_message(websocket.receive_bytes())
+        assert response["event_name"] == "sum_handler_result"
+        assert response["payload"] == 6.0
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once(clear_clients):
+    sockets = [AsyncMock(spec=WebSocket) for _ in range(3)]
+    for socket in sockets:
+        add_client(socket)
+    message = WebSocketMessage(event_name="test_event", payload={"data": list(range(10))}, to="all")
+
+    with patch("datadivr.transport.server.encode_json", wraps=encode_json) as mock_encode:
+        await broadcast(message)
+        await flush_queues()
+
+    mock_encode.assert_called_once()
+    frames = {socket.send_text.await_args.args[0] for socket in sockets}
+    assert frames == {_text(message)}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_clients(clear_clients):
+    release, fast_sent = asyncio.Event(), asyncio.Event()
+    slow, fast = AsyncMock(spec=WebSocket), AsyncMock(spec=WebSocket)
+
+    async def send_slowly(_):
+        await release.wait()
+
+    slow.send_text.side_effect = send_slowly
+    fast.send_text.side_effect = lambda _: fast_sent.set()
+    slow_id = add_client(slow)
+    fast_id = add_client(fast)
+    assert get_client_id(fast) == fast_id
+
+    for _ in range(3):
+        await broadcast(WebSocketMessage(event_name="test_event", to="all"))
+    await asyncio.wait_for(fast_sent.wait(), 1)  # not held back by the slow connection
+    assert queue_metrics()[slow_id]["depth"] == 2
+
+    release.set()
+    await flush_queues()
+    assert queue_metrics()[slow_id]["sent"] == 3
+    await remove_client(fast_id)
+    assert get_client_id(fast) is None
+
+
+@pytest.mark.asyncio
+async def test_inbound_state_updates_coalesce(websocket_mock, clear_clients):
+    handled = []
+
+    @websocket_handler("test_state_update", coalesce=True)
+    async def state_handler(message):
+        handled.append(message.payload)
+
+    websocket_mock.receive.side_effect = [
+        *(_frame({"event_name": "test_state_update", "payload": i}) for i in range(4)),
+        _frame({"event_name": "test_event", "payload": "after"}),
+        WebSocketDisconnect(),
+    ]
+    try:
+        await handle_connection(websocket_mock)
+    finally:
+        get_handlers().pop("test_state_update")
+        coalesce_event("test_state_update", False)
+
+    # the handler only sees the newest update that was pending
+    assert handled == [3]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_to_room(clear_clients):
+    sockets = [AsyncMock(spec=WebSocket) for _ in range(3)]
+    ids = [add_client(socket) for socket in sockets]
+    join_room(ids[0], "project_a")
+    join_room(ids[1], "project_a")
+    assert get_room_members("project_a") == {ids[0], ids[1]}
+
+    message = WebSocketMessage(event_name="selection_changed", payload=[1, 2], to="room:project_a")
+    await broadcast(message, sockets[0])
+    await flush_queues()
+    sockets[0].send_text.assert_not_called()  # the sender
+    sockets[1].send_text.assert_awaited_once_with(_text(message))
+    sockets[2].send_text.assert_not_called()  # not a member
+
+    leave_room(ids[1], "project_a")
+    await remove_client(ids[0])
+    assert get_room_members("project_a") == set()
+
+
+def test_join_room_event(test_client):
+    with test_client, test_client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"event_name": "join_room", "payload": {"room": "project_a"}})
+        response = websocket.receive_json()
+        assert response["event_name"] == "room_joined"
+        assert response["payload"]["room"] == "project_a"
+        assert len(response["payload"]["members"]) == 1
+
+        websocket.send_json({"event_name": "leave_room", "payload": {"room": "project_a"}})
+        assert websocket.receive_json()["event_name"] == "room_left"
+        assert get_room_members("project_a") == set()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_through_broker(clear_clients):
+    worker, other_worker = LocalBroker("test_server"), LocalBroker("test_server")
+    published = []
+
+    async def on_published(message_data):
+        published.append(message_data)
+
+    await worker.start(deliver_published)
+    await other_worker.start(on_published)
+    set_broker(worker)
+    try:
+        socket = AsyncMock(spec=WebSocket)
+        client_id = add_client(socket)
+        await broadcast(WebSocketMessage(event_name="direct", to=client_id))  # local client only
+        await broadcast(WebSocketMessage(event_name="announcement", to="all"))
+        assert [message["event_name"] for message in published] == ["announcement"]
+
+        # messages published by another worker reach the local clients
+        remote = WebSocketMessage(event_name="remote", to="others", from_id="client_elsewhere")
+        await other_worker.publish(remote.model_dump())
+        await flush_queues()
+        assert socket.send_text.await_count == 3
+        socket.send_text.assert_awaited_with(_text(remote))
+    finally:
+        set_broker(None)
+        await worker.stop()
+        await other_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_handler_timeout_reports_error(websocket_mock, clear_clients):
+    @websocket_handler("test_slow_event", timeout=0.01)
+    async def slow_handler(message):
+        await asyncio.sleep(1)
+
+    websocket_mock.receive.side_effect = [
+        _frame({"event_name": "test_slow_event"}),
+        _frame({"event_name": "test_event", "payload": "after"}),
+        WebSocketDisconnect(),
+    ]
+    try:
+        await handle_connection(websocket_mock)
+    finally:
+        get_handlers().pop("test_slow_event")
+
+    sent = [orjson.loads(call.args[0]) for call in websocket_mock.send_text.await_args_list]
+    assert sent[0]["event_name"] == "error"
+    assert "timed out" in sent[0]["message"]
+
+
+def test_responses_echo_correlation_id(test_client):
+    with test_client, test_client.websocket_connect("/ws") as websocket:
+        request = {"event_name": "sum_event", "payload": {"numbers": [1, 2]}, "correlation_id": "request_1"}
+        websocket.send_json(request)
+        response = websocket.receive_json()
+        assert response["event_name"] == "sum_handler_result"
+        assert response["correlation_id"] == "request_1"
+
+
+def test_batch_frames_are_handled_in_order(test_client):
+    batch = [{"event_name": "sum_event", "payload": {"numbers": [i, i]}, "correlation_id": str(i)} for i in range(3)]
+    with test_client, test_client.websocket_connect("/ws") as websocket:
+        websocket.send_json(batch)
+        assert [websocket.receive_json()["payload"] for _ in batch] == [0.0, 2.0, 4.0]
+
+    with test_client, test_client.websocket_connect("/ws?encoding=binary") as websocket:
+        websocket.send_bytes(encode_batch(batch))
+        assert [decode_message(websocket.receive_bytes())["correlation_id"] for _ in batch] == ["0", "1", "2"]
+
+
+def test_session_resume(test_client):
+    with test_client:
+        with test_client.websocket_connect("/ws?session=new") as websocket:
+            session = websocket.receive_json()
+            assert session["event_name"] == "session"
+            assert not session["payload"]["resumed"]
+            client_id, token = session["payload"]["client_id"], session["payload"]["token"]
+            websocket.send_json({"event_name": "join_room", "payload": {"room": "project_a"}})
+            websocket.receive_json()
+            update_client_state(client_id, name="Timmey")
+
+        with test_client.websocket_connect(f"/ws?session={token}") as websocket:
+            session = websocket.receive_json()["payload"]
+            assert session == {"client_id": client_id, "token": token, "resumed": True}
+            assert get_client_state(client_id) == {"name": "Timmey"}
+            assert get_room_members("project_a") == {client_id}
+
+        # a session is resumed only once, unknown tokens get a new session
+        with test_client.websocket_connect("/ws?session=unknown") as websocket:
+            session = websocket.receive_json()["payload"]
+            assert not session["resumed"]
+            assert session["client_id"] != client_id
@@ -0,0 +1,44 @@
+from datadivr.core.snapshots import SnapshotDelta, SnapshotTracker
+
+
+def test_deltas_hold_entered_changed_and_left_entities():
+    tracker = SnapshotTracker()
+
+    first = tracker.update("client", {"a": {"x": 1}, "b": {"x": 2}})
+    assert first.entered == {"a": {"x": 1}, "b": {"x": 2}}
+    assert not first.full
+
+    second = tracker.update("client", {"a": {"x": 1}, "b": {"x": 3}, "c": {"x": 4}})
+    assert second.to_payload() == {"entered": {"c": {"x": 4}}, "changed": {"b": {"x": 3}}, "left": [], "full": False}
+
+    third = tracker.update("client", {"c": {"x": 4}})
+    assert third.left == ["a", "b"]
+    assert not third.entered
+    assert not third.changed
+
+
+def test_unchanged_snapshots_give_empty_deltas():
+    tracker = SnapshotTracker()
+    tracker.update("client", {"a": 1})
+    assert not tracker.update("client", {"a": 1})
+    assert not tracker.update("other", {})
+    assert not SnapshotDelta()
+
+
+def test_diff_does_not_acknowledge():
+    tracker = SnapshotTracker()
+    tracker.acknowledge("client", {"a": 1})
+    assert tracker.diff("client", {"a": 2}).changed == {"a": 2}
+    assert tracker.diff("client", {"a": 2}).changed == {"a": 2}
+
+
+def test_keyframes_and_forgotten_recipients():
+    tracker = SnapshotTracker(keyframe_interval=2)
+    tracker.update("client", {"a": 1})
+    keyframe = tracker.update("client", {"a": 1})
+    assert keyframe.full
+    assert keyframe.entered == {"a": 1}
+    assert not tracker.update("client", {"a": 1})
+
+    tracker.retain({"other"})
+    assert tracker.update("client", {"a": 1}).entered == {"a": 1}
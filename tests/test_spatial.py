@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from datadivr.calc.spatial import SpatialGrid, haversine_km
+
+
+def _brute_force(ids, latitudes, longitudes, radius_km):
+    distances = haversine_km(latitudes[:, None], longitudes[:, None], latitudes[None, :], longitudes[None, :])
+    return {
+        entity_id: sorted(ids[j] for j in np.flatnonzero(distances[i] <= radius_km) if j != i)
+        for i, entity_id in enumerate(ids)
+    }
+
+
+def test_haversine_km():
+    # Vienna - Berlin, about 524 km
+    assert haversine_km(48.2082, 16.3738, 52.52, 13.405) == pytest.approx(523.8, abs=1.0)
+    assert haversine_km([0, 0], [0, 90], 0, 0).tolist() == pytest.approx([0.0, 10007.5], abs=0.1)
+
+
+@pytest.mark.parametrize(
+    ("radius_km", "lat_range"),
+    [(100.0, (47.0, 49.0)), (500.0, (-90.0, 90.0)), (50.0, (85.0, 90.0))],
+)
+def test_neighbors_match_brute_force(radius_km, lat_range):
+    rng = np.random.default_rng(42)
+    ids = [f"client_{i}" for i in range(400)]
+    latitudes = rng.uniform(*lat_range, len(ids))
+    longitudes = rng.uniform(-180.0, 180.0, len(ids)) if lat_range[0] < 0 else rng.uniform(-180.0, -170.0, len(ids))
+    longitudes[:20] = rng.uniform(179.0, 180.0, 20)  # across the antimeridian
+
+    grid = SpatialGrid(radius_km)
+    grid.update(ids, latitudes, longitudes)
+    neighbors = {entity_id: sorted(others) for entity_id, others in grid.neighbors().items()}
+
+    assert neighbors == _brute_force(ids, latitudes, longitudes, radius_km)
+    assert sorted(grid.within(latitudes[0], longitudes[0])) == sorted([ids[0], *neighbors[ids[0]]])
+
+
+def test_empty_grid():
+    grid = SpatialGrid()
+    grid.update([], [], [])
+    assert grid.neighbors() == {}
+    assert grid.within(0.0, 0.0) == []
@@ -0,0 +1,137 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from datadivr.exceptions import IncompleteStreamError, InvalidStreamAckError, InvalidStreamFrameError
+from datadivr.project.model import Project
+from datadivr.project.project_manager import ProjectManager
+from datadivr.transport.models import WebSocketMessage
+from datadivr.transport.server import app
+from datadivr.transport.streaming import ArrayStream, StreamAssembler, decode_chunk, encode_chunk
+
+
+def test_chunk_roundtrip():
+    array = np.arange(30, dtype=">f4").reshape(10, 3)
+
+    frame = encode_chunk(7, array, 4, 3)
+    header, data = decode_chunk(frame)
+
+    assert (header.stream_id, header.offset, header.rows, header.shape) == (7, 4, 3, (10, 3))
+    assert header.dtype == np.dtype("<f4")
+    assert (len(frame) - data.nbytes) % 8 == 0
+    np.testing.assert_array_equal(data, array[4:7])
+
+
+def test_decode_rejects_other_frames():
+    with pytest.raises(InvalidStreamFrameError):
+        decode_chunk(b"not a frame")
+
+
+@pytest.mark.asyncio
+async def test_stream_respects_credit_window():
+    array = np.arange(1000, dtype=np.int32)
+    assembler = StreamAssembler()
+    result = assembler.expect(1)
+    wire: asyncio.Queue = asyncio.Queue()
+    in_flight = max_in_flight = 0
+
+    async def send_bytes(frame):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await wire.put(frame)
+
+    stream = ArrayStream(1, array, send_bytes, wire.put, chunk_bytes=400, window=2)
+    task = asyncio.create_task(stream.run())
+
+    while not result.done():
+        item = await wire.get()
+        if isinstance(item, bytes):
+            assembler.feed(item)
+            in_flight -= 1
+            stream.ack()
+        else:
+            assembler.handle_message(item)
+    await task
+
+    assert max_in_flight == 2
+    np.testing.assert_array_equal(result.result(), array)
+
+
+@pytest.mark.asyncio
+async def test_stream_ack_is_validated_and_capped():
+    sent: list[bytes] = []
+
+    async def send_bytes(frame):
+        sent.append(frame)
+
+    async def send_message(message):
+        pass
+
+    stream = ArrayStream(1, np.arange(100, dtype=np.int32), send_bytes, send_message, chunk_bytes=40, window=2)
+    for chunks in (0, -1, "2", 1.5, True):
+        with pytest.raises(InvalidStreamAckError):
+            stream.ack(chunks)
+
+    stream.ack(1_000_000)  # nothing sent yet, so no credits are granted
+    task = asyncio.create_task(stream.run())
+    await asyncio.sleep(0.01)
+    assert len(sent) == 2
+
+    stream.ack(1_000_000)  # capped at the two unacknowledged chunks
+    await asyncio.sleep(0.01)
+    assert len(sent) == 4
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_assembler_detects_missing_chunks():
+    assembler = StreamAssembler()
+    result = assembler.expect(3)
+    assembler.handle_message(
+        WebSocketMessage(event_name="stream_start", payload={"stream_id": 3, "dtype": "<i4", "shape": [4], "chunks": 2})
+    )
+    assembler.feed(encode_chunk(3, np.arange(4, dtype=np.int32), 0, 2))
+    assembler.handle_message(WebSocketMessage(event_name="stream_end", payload={"stream_id": 3}))
+
+    with pytest.raises(IncompleteStreamError):
+        await result
+
+
+def test_stream_array_over_websocket():
+    project = Project(name="stream")
+    ids = np.arange(5000, dtype=np.int32)
+    positions = np.random.default_rng(0).random((5000, 3), dtype=np.float32)
+    project.add_layout_bulk("default", ids, positions, np.zeros((5000, 4), dtype=np.uint8))
+    ProjectManager.set_current_project(project)
+
+    try:
+        with TestClient(app) as client, client.websocket_connect("/ws") as websocket:
+            websocket.send_json({
+                "event_name": "stream_array",
+                "payload": {"stream_id": 1, "array": "layouts/default/positions", "start": 1000, "chunk_bytes": 4096},
+            })
+            start = websocket.receive_json()
+            assert start["event_name"] == "stream_start"
+            assert start["payload"]["shape"] == [4000, 3]
+
+            received = np.empty((4000, 3), dtype=np.float32)
+            for _ in range(start["payload"]["chunks"]):
+                header, data = decode_chunk(websocket.receive_bytes())
+                received[header.offset : header.offset + header.rows] = data
+                websocket.send_json({"event_name": "stream_ack", "payload": {"stream_id": 1, "chunks": 1}})
+
+            assert websocket.receive_json()["event_name"] == "stream_end"
+            np.testing.assert_array_equal(received, positions[1000:])
+
+            websocket.send_json({"event_name": "stream_array", "payload": {"stream_id": 2, "array": "links/colors"}})
+            assert websocket.receive_json()["event_name"] == "stream_error"
+
+            for invalid in ({"start": "a"}, {"stop": 1.5}, {"chunk_bytes": "big"}, {"chunk_bytes": 0}):
+                payload = {"stream_id": 3, "array": "layouts/default/positions", **invalid}
+                websocket.send_json({"event_name": "stream_array", "payload": payload})
+                assert websocket.receive_json()["event_name"] == "stream_error"
+    finally:
+        ProjectManager.clear()
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from datadivr.calc.sample_data import generate_cube_project
+from datadivr.project.textures import make_layout_tex, make_link_tex, texture_tiles
+
+
+def test_texture_tiles_near_square():
+    tiles = texture_tiles("layout_default_XYZ", "bmp", 1_000_000)
+    assert len(tiles) == 1
+    assert tiles[0].file == "layout_default_XYZ.bmp"
+    assert (tiles[0].width, tiles[0].height) == (1000, 1000)
+    assert tiles[0].count == 1_000_000
+
+
+def test_texture_tiles_sharded_above_max_size():
+    tiles = texture_tiles("links_XYZ", "bmp", 10_001, max_size=64, align=2)
+    assert [tile.file for tile in tiles] == ["links_XYZ_0.bmp", "links_XYZ_1.bmp", "links_XYZ_2.bmp"]
+    assert all(tile.width == 64 and tile.height <= 64 for tile in tiles)
+    assert [tile.offset for tile in tiles] == [0, 4096, 8192]
+    assert sum(tile.count for tile in tiles) == 10_001
+
+
+def test_texture_tiles_alignment():
+    tiles = texture_tiles("links_XYZ", "bmp", 18, align=2)
+    assert tiles[0].width % 2 == 0
+    assert tiles[0].width * tiles[0].height >= 18
+
+
+@pytest.mark.parametrize("max_size", [4096, 4])
+def test_layout_texture_roundtrip(tmp_path, max_size):
+    positions = np.random.rand(50, 3).astype(np.float32)
+    colors = np.random.randint(0, 255, (50, 4), dtype=np.uint8)
+
+    textures = make_layout_tex("p", "default", np.arange(50), positions, colors, str(tmp_path), max_size)
+
+    tiles = textures["layout_default_RGB"]
+    pixels = np.concatenate([
+        np.asarray(Image.open(tmp_path / tile.file)).reshape(-1, 4)[: tile.count] for tile in tiles
+    ])
+    np.testing.assert_array_equal(pixels, colors)
+    assert all(tile.width <= max_size and tile.height <= max_size for tile in tiles)
+
+
+def test_link_texture_pairs(tmp_path):
+    start_ids = np.array([1, 70000, 3], dtype=np.int32)
+    end_ids = np.array([2, 4, 65536], dtype=np.int32)
+    colors = np.full((3, 4), 7, dtype=np.uint8)
+
+    textures = make_link_tex("p", start_ids, end_ids, colors, str(tmp_path))
+
+    tile = textures["links_XYZ"][0]
+    data = np.asarray(Image.open(tmp_path / tile.file)).reshape(-1, 3)[: tile.count].astype(np.int64)
+    decoded = data[:, 0] + data[:, 1] * 256 + data[:, 2] * 256 * 256
+    np.testing.assert_array_equal(decoded[::2], start_ids)
+    np.testing.assert_array_equal(decoded[1::2], end_ids)
+
+
+def test_project_summary_lists_tiles(tmp_path):
+    project = generate_cube_project()
+    project.create_all_assets(str(tmp_path), max_texture_size=4)
+
+    summary = json.loads((tmp_path / project.name / "project.json").read_text())
+    tiles = summary["textures"]["tiles"]
+    assert summary["textures"]["maxSize"] == 4
+    assert len(tiles["links_XYZ"]) == 2
+    for entries in tiles.values():
+        for tile in entries:
+            assert (tmp_path / project.name / "textures" / tile["file"]).exists()